@@ -0,0 +1,101 @@
+'''
+Cold-start benchmark for the desktop app.\n
+Starts src/main.py under `python -X importtime` a few times and records:
+- time to first paint (window with placeholder values on screen)\n
+- time until the charts are built\n
+- time until the first sample is drawn\n
+- total import time and the slowest top-level imports\n
+
+The app quits on its own after the first sample (WINSTATZ_STARTUP_BENCH).
+Needs a display, on a headless Linux box run it under xvfb-run.
+
+### Usage
+    python benchmarks/startup.py --runs 5 --budget-ms 1500
+Exits with status 1 when the median time to first paint is over budget.
+'''
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MAIN = os.path.join(ROOT, "src", "main.py")
+STAGES = {"first_paint": "firstPaintMs", "charts_ready": "chartsReadyMs", "first_data": "firstDataMs"}
+
+def parse_importtime(stderr):
+    '''Return {top-level module: cumulative microseconds} from -X importtime output.'''
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        try:
+            _, cumulative, name = line[len("import time:"):].split("|")
+            cumulative = int(cumulative)
+        except ValueError:
+            continue  # the column header line
+        # nested imports are indented under the module that imported them
+        if not name.startswith("  "):
+            modules[name.strip()] = cumulative
+    return modules
+
+def run_once(timeout):
+    with tempfile.TemporaryDirectory() as tmp:
+        stages_file = os.path.join(tmp, "stages.txt")
+        env = dict(os.environ, WINSTATZ_STARTUP_BENCH=stages_file)
+        start = time.time()
+        proc = subprocess.run([sys.executable, "-X", "importtime", MAIN], env=env, capture_output=True,
+                              text=True, timeout=timeout, cwd=ROOT)
+        stages = {}
+        if os.path.exists(stages_file):
+            with open(stages_file) as f:
+                for line in f:
+                    stage, t = line.split()
+                    stages.setdefault(stage, (float(t) - start) * 1000)
+    if "first_paint" not in stages:
+        raise RuntimeError(f"app did not start (exit code {proc.returncode}):\n{proc.stderr[-2000:]}")
+    imports = parse_importtime(proc.stderr)
+    return stages, imports
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--budget-ms", type=float, default=1500, help="max median time to first paint")
+    parser.add_argument("--timeout", type=float, default=60)
+    parser.add_argument("--output", default=None, help="JSON file to write (default benchmarks/results/startup-<time>.json)")
+    args = parser.parse_args(argv)
+
+    runs = [run_once(args.timeout) for _ in range(args.runs)]
+    result = {
+        "benchmark": "startup",
+        "time": time.time(),
+        "python": sys.version.split()[0],
+        "platform": sys.platform,
+        "runs": args.runs,
+        "budgetMs": args.budget_ms,
+    }
+    for stage, key in STAGES.items():
+        values = [stages[stage] for stages, _ in runs if stage in stages]
+        result[key] = round(statistics.median(values), 1) if values else None
+
+    imports = runs[-1][1]
+    result["importTotalMs"] = round(sum(imports.values()) / 1000, 1)
+    result["slowestImportsMs"] = {name: round(us / 1000, 1) for name, us in
+                                  sorted(imports.items(), key=lambda item: -item[1])[:10]}
+
+    output = args.output or os.path.join(ROOT, "benchmarks", "results", f"startup-{int(result['time'])}.json")
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(result, f, indent=2)
+    print(json.dumps(result, indent=2))
+
+    if result["firstPaintMs"] > args.budget_ms:
+        print(f"time to first paint {result['firstPaintMs']} ms is over the {args.budget_ms} ms budget", file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,256 @@
+'''
+Micro-benchmarks for the sampler, spec collection and chart rendering.\n
+Runs anywhere (no display, no WMI): usage comes from the fake collector
+backend unless --backend says otherwise, specs from fake_wmi with simulated
+slow classes, and the charts are drawn with the Agg backend. Records:
+- get_snapshot latency, new list-of-dicts sample vs refilled in place (p50/p95/max)\n
+- steady-state CPU overhead of the sampler at a fixed interval\n
+- get_specs refresh time with slow WMI, cold (new connections) and warm\n
+- Agg frame time, full redraw vs blit, of the main figure and of the core heatmap
+  and devices views (the classes the windows use) at several core and disk counts,
+  drawing only: samples are taken first\n
+
+### Usage
+    python benchmarks/suite.py
+    python benchmarks/suite.py --only sample,frame --compare benchmarks/results/suite-1790000000.json
+Results are saved as JSON under benchmarks/results/ so runs can be compared.
+'''
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+# keep the spec cache of the benchmark away from the real one
+os.environ["XDG_DATA_HOME"] = tempfile.mkdtemp(prefix="winstatz-bench-")
+
+import stats
+import fake_wmi
+import spec_cache
+from backends import FakeBackend, create_backend
+
+BENCHMARKS = ("sample", "overhead", "specs", "frame")
+# (cores, disks) combinations for the frame benchmark: the core heatmap draws
+# cores x COLUMNS cells and the devices view 2 bars per disk
+FRAME_SIZES = ((4, 1), (16, 4), (64, 8))
+# simulated WMI latency per class, roughly what a busy laptop shows
+SLOW_WMI = {
+    "Win32_Processor": 0.15,
+    "Win32_VideoController": 0.3,
+    "Win32_PhysicalMemory": 0.1,
+    "Win32_DiskDrive": 0.2,
+    "Win32_NetworkAdapter": 0.6,
+    "Win32_Battery": 0.1,
+}
+SLOW_WMI_CONNECT = 0.2
+
+def _summary(samples):
+    '''p50/p95/max of a list of seconds, in milliseconds.'''
+    samples = sorted(samples)
+    return {
+        "p50Ms": round(samples[len(samples) // 2] * 1000, 4),
+        "p95Ms": round(samples[min(int(len(samples) * 0.95), len(samples) - 1)] * 1000, 4),
+        "maxMs": round(samples[-1] * 1000, 4),
+    }
+
+def _backend(name, cores=4, disks=2):
+    if name == "fake":
+        return FakeBackend(cores=cores, disks=tuple(f"PhysicalDrive{i}" for i in range(disks)))
+    return create_backend(name)
+
+def bench_sample(backend, iterations=2000):
+    stats.set_backend(_backend(backend))
+    stats.get_snapshot()  # the first call has no deltas yet
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        stats.get_snapshot().as_usage()
+        samples.append(time.perf_counter() - start)
+    # the typed form, refilled in place like the dashboard does
+    snap = stats.get_snapshot()
+    snapshot_samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        stats.get_snapshot(out=snap)
+        snapshot_samples.append(time.perf_counter() - start)
+    return dict(_summary(samples), iterations=iterations, snapshot=_summary(snapshot_samples))
+
+def bench_overhead(backend, interval=0.1, duration=5.0):
+    '''CPU time the sampling loop itself uses, as a percent of one core.'''
+    stats.set_backend(_backend(backend))
+    stats.get_snapshot()
+    samples = 0
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+    deadline = wall_start + duration
+    next_tick = wall_start
+    while next_tick < deadline:
+        stats.get_snapshot()
+        samples += 1
+        next_tick += interval
+        time.sleep(max(next_tick - time.perf_counter(), 0))
+    wall, cpu = time.perf_counter() - wall_start, time.process_time() - cpu_start
+    return {
+        "intervalS": interval,
+        "samples": samples,
+        "cpuPercent": round(cpu / wall * 100, 3),
+        "cpuPerSampleUs": round(cpu / samples * 1e6, 1),
+    }
+
+def bench_specs(rounds=3):
+    fake_wmi.DELAYS.update(SLOW_WMI)
+    fake_wmi.CONNECT_DELAY = SLOW_WMI_CONNECT
+    cold, warm = [], []
+    try:
+        for _ in range(rounds):
+            # new backend: empty caches and a new WMI pool, so connections are opened again
+            if os.path.exists(spec_cache.cache_path()):
+                os.remove(spec_cache.cache_path())
+            stats.set_backend(FakeBackend())
+            start = time.perf_counter()
+            stats.get_specs()
+            cold.append(time.perf_counter() - start)
+
+            # same pool, every category out of date (what a hardware change does)
+            stats._specs_valid_since = time.time()
+            stats._hardware_cache_time["battery"] = 0
+            start = time.perf_counter()
+            stats.get_specs()
+            warm.append(time.perf_counter() - start)
+    finally:
+        fake_wmi.DELAYS.clear()
+        fake_wmi.CONNECT_DELAY = 0.0
+    return {
+        "rounds": rounds,
+        "slowestClassMs": round(max(SLOW_WMI.values()) * 1000),
+        "sumOfClassesMs": round(sum(SLOW_WMI.values()) * 1000),
+        "connectMs": round(SLOW_WMI_CONNECT * 1000),
+        "coldMs": round(statistics.median(cold) * 1000, 1),
+        "warmMs": round(statistics.median(warm) * 1000, 1),
+    }
+
+def _time_frames(samples, draw, renderer):
+    '''
+    Draw every sample with a full redraw, then again blitted. draw(sample) ends in
+    renderer.update(), as the views do. Only drawing is timed.
+    '''
+    draw(samples[0])  # first layout and background, not part of a steady-state frame
+    timings = {"full": [], "blit": []}
+    for mode in timings:
+        for sample in samples:
+            start = time.perf_counter()
+            if mode == "full":
+                renderer.invalidate()
+            draw(sample)
+            timings[mode].append(time.perf_counter() - start)
+    return {"fullDraw": _summary(timings["full"]), "blit": _summary(timings["blit"])}
+
+def bench_frame(frames=100):
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from core_view import CoreHeatmap
+    from devices_view import DevicesChart
+    from usage_view import UsageChart
+    plt.style.use("dark_background")
+
+    # the real views, drawn on Agg canvases instead of their Tk windows
+    # the main figure always draws the same 7 bars, it is timed once
+    stats.set_backend(_backend("fake"))
+    samples = [stats.get_snapshot() for _ in range(frames)]
+    chart = UsageChart(FigureCanvasAgg)
+
+    def draw_main(snap):
+        chart.show(snap)
+        chart.renderer.update()
+
+    result = {"frames": frames, "main": _time_frames(samples, draw_main, chart.renderer), "sizes": []}
+    plt.close(chart.fig)
+
+    for cores, disks in FRAME_SIZES:
+        stats.set_backend(_backend("fake", cores, disks))
+        # sampled up front, so only drawing is timed
+        samples = [stats.get_snapshot() for _ in range(frames)]
+        devices = [stats.get_device_usage() for _ in range(frames)]
+        heatmap = CoreHeatmap(FigureCanvasAgg)
+        devices_chart = DevicesChart(FigureCanvasAgg)
+        result["sizes"].append({
+            "cores": cores,
+            "disks": disks,
+            "coreHeatmap": _time_frames([snap.cpu for snap in samples], heatmap.push, heatmap.renderer),
+            "devices": _time_frames(devices, devices_chart.show, devices_chart.renderer),
+        })
+        heatmap.close()
+        devices_chart.close()
+    return result
+
+def _flatten(value, prefix=""):
+    if isinstance(value, dict):
+        for key, item in value.items():
+            yield from _flatten(item, f"{prefix}.{key}" if prefix else key)
+    elif isinstance(value, list):
+        for i, item in enumerate(value):
+            yield from _flatten(item, f"{prefix}[{i}]")
+    elif isinstance(value, (int, float)) and not isinstance(value, bool):
+        yield prefix, value
+
+def compare(result, path):
+    '''Print every Ms/Percent/Us number that moved by more than 5% against an earlier result file.'''
+    with open(path) as f:
+        before = dict(_flatten(json.load(f)))
+    for key, value in _flatten(result):
+        if not key.endswith(("Ms", "Percent", "Us")) or not before.get(key):
+            continue
+        change = (value - before[key]) / before[key] * 100
+        if abs(change) >= 5:
+            print(f"{key}: {before[key]} -> {value} ({change:+.0f}%)")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--only", default=",".join(BENCHMARKS), help=f"comma separated subset of {','.join(BENCHMARKS)}")
+    parser.add_argument("--backend", choices=("psutil", "proc", "fake"), default="fake",
+                        help="collector backend for the sample and overhead benchmarks (default fake)")
+    parser.add_argument("--iterations", type=int, default=2000, help="get_snapshot calls for the sample benchmark")
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds to run the overhead benchmark")
+    parser.add_argument("--interval", type=float, default=0.1, help="sampling interval of the overhead benchmark")
+    parser.add_argument("--frames", type=int, default=100, help="frames per mode and size for the frame benchmark")
+    parser.add_argument("--output", default=None, help="JSON file to write (default benchmarks/results/suite-<time>.json)")
+    parser.add_argument("--compare", default=None, help="earlier result file to print changes against")
+    args = parser.parse_args(argv)
+
+    only = [name.strip() for name in args.only.split(",") if name.strip()]
+    unknown = set(only) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"unknown benchmark: {', '.join(sorted(unknown))}")
+
+    result = {
+        "benchmark": "suite",
+        "time": time.time(),
+        "python": sys.version.split()[0],
+        "platform": sys.platform,
+        "backend": args.backend,
+    }
+    if "sample" in only:
+        result["sample"] = bench_sample(args.backend, args.iterations)
+    if "overhead" in only:
+        result["overhead"] = bench_overhead(args.backend, args.interval, args.duration)
+    if "specs" in only:
+        result["specs"] = bench_specs()
+    if "frame" in only:
+        result["frame"] = bench_frame(args.frames)
+
+    output = args.output or os.path.join(ROOT, "benchmarks", "results", f"suite-{int(result['time'])}.json")
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(result, f, indent=2)
+    print(json.dumps(result, indent=2))
+    if args.compare:
+        compare(result, args.compare)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
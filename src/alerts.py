@@ -0,0 +1,220 @@
+'''
+Threshold rules evaluated on every sample.\n
+A rule is written as text over the values of a usage Snapshot:
+
+    cpu > 90 for 30s          every sample of the last 30 s was above 90 %
+    avg(cpu) > 90 over 30s    the average of the last 30 s is above 90 %
+    ram.free < 500            the latest sample has less than 500 MB free
+    max(disk.write) > 200 over 10s
+
+Values: cpu (average of all cores, %), cpu.max (busiest core), ram.used,
+ram.free (MB), ram.percent, disk.read, disk.write (MBps, all disks), net.up,
+net.down (Mbps), battery (%). Aggregates: avg, sum, min, max.
+
+Each rule keeps its window in a SlidingWindow, so checking a rule costs the
+same for a 1 s window as for a 1 hour one.
+'''
+import re
+import time
+from collections import deque
+
+# value name -> (get_snapshot metric it comes from, how to read it from a Snapshot)
+QUANTITIES = {
+    "cpu": ("cpu", lambda snap: snap.cpu_average),
+    "cpu.max": ("cpu", lambda snap: max(snap.cpu)),
+    "ram.used": ("ram", lambda snap: snap.ram_used),
+    "ram.free": ("ram", lambda snap: snap.ram_free),
+    "ram.percent": ("ram", lambda snap: snap.ram_percent),
+    "disk.read": ("disk", lambda snap: sum(snap.disk_read)),
+    "disk.write": ("disk", lambda snap: sum(snap.disk_write)),
+    "net.up": ("net", lambda snap: snap.net_up),
+    "net.down": ("net", lambda snap: snap.net_down),
+    "battery": ("battery", lambda snap: snap.battery_percent),
+}
+AGGREGATES = ("avg", "sum", "min", "max")
+OPERATORS = {
+    ">": lambda a, b: a > b,
+    ">=": lambda a, b: a >= b,
+    "<": lambda a, b: a < b,
+    "<=": lambda a, b: a <= b,
+}
+
+_RULE = re.compile(
+    r"^\s*(?:(?P<agg>\w+)\(\s*(?P<aggname>[\w.]+)\s*\)|(?P<name>[\w.]+))"
+    r"\s*(?P<op>>=|<=|>|<)\s*(?P<threshold>-?\d+(?:\.\d+)?)\s*%?"
+    r"(?:\s+(?P<mode>for|over)\s+(?P<window>\d+(?:\.\d+)?)\s*(?P<unit>ms|s|m|h)?)?\s*$",
+    re.I,
+)
+_UNITS = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+
+class SlidingWindow:
+    '''
+    Sum, min and max of the samples of the last `seconds`, in O(1) per sample.\n
+    The sum is updated as samples come in and fall out. Min and max use monotonic
+    deques: a new sample removes every older sample it beats from the back, so
+    the front is always the answer and each sample is pushed and popped once.
+    '''
+    __slots__ = ("seconds", "samples", "total", "_mins", "_maxes")
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.samples = deque()  # (t, value), oldest first
+        self.total = 0.0
+        self._mins = deque()  # increasing values
+        self._maxes = deque()  # decreasing values
+
+    def push(self, t, value):
+        self.samples.append((t, value))
+        self.total += value
+        while self._mins and self._mins[-1][1] >= value:
+            self._mins.pop()
+        self._mins.append((t, value))
+        while self._maxes and self._maxes[-1][1] <= value:
+            self._maxes.pop()
+        self._maxes.append((t, value))
+        self._expire(t)
+
+    def _expire(self, now):
+        cutoff = now - self.seconds
+        while self.samples and self.samples[0][0] < cutoff:
+            _, value = self.samples.popleft()
+            self.total -= value
+        if not self.samples:
+            self.total = 0.0  # don't let rounding errors pile up
+        while self._mins and self._mins[0][0] < cutoff:
+            self._mins.popleft()
+        while self._maxes and self._maxes[0][0] < cutoff:
+            self._maxes.popleft()
+
+    def __len__(self):
+        return len(self.samples)
+
+    def sum(self):
+        return self.total
+
+    def avg(self):
+        return self.total / len(self.samples) if self.samples else None
+
+    def min(self):
+        return self._mins[0][1] if self._mins else None
+
+    def max(self):
+        return self._maxes[0][1] if self._maxes else None
+
+class Rule:
+    '''
+    One parsed rule, with its window and whether it is firing.\n
+    "for" rules hold the condition over the whole window (min for >, max for <)
+    and, like "over" rules, only fire once the window is full of samples.
+    '''
+
+    def __init__(self, text, name=None):
+        match = _RULE.match(text)
+        if match is None:
+            raise ValueError(f"can't parse alert rule {text!r}, expected e.g. 'cpu > 90 for 30s'")
+        quantity = match["aggname"] or match["name"]
+        if quantity not in QUANTITIES:
+            raise ValueError(f"unknown value {quantity!r} in {text!r}, expected one of {', '.join(QUANTITIES)}")
+        agg = (match["agg"] or "").lower() or None
+        if agg is not None and agg not in AGGREGATES:
+            raise ValueError(f"unknown aggregate {agg!r} in {text!r}, expected one of {', '.join(AGGREGATES)}")
+
+        self.text = text.strip()
+        self.name = name or self.text
+        self.quantity = quantity
+        self.metric, self._read = QUANTITIES[quantity]
+        self.op = match["op"]
+        self.threshold = float(match["threshold"])
+        self.window = float(match["window"]) * _UNITS[(match["unit"] or "s").lower()] if match["window"] else 0.0
+        if agg is None and match["mode"] and match["mode"].lower() == "for":
+            # held for the whole window: the smallest value was still above (or the largest still below)
+            agg = "min" if self.op.startswith(">") else "max"
+        elif agg is None and self.window:
+            agg = "avg"
+        self.agg = agg
+        self.samples = SlidingWindow(self.window) if self.window else None
+        self.firing = False
+        self.value = None
+        self.started = None
+
+    def __repr__(self):
+        return f"Rule({self.text!r})"
+
+    def update(self, snap, t):
+        '''Add a sample, returns True if the rule started or stopped firing.'''
+        value = self._read(snap)
+        if value is None:
+            return False
+        if self.samples is None:
+            self.value, full = value, True
+        else:
+            self.samples.push(t, value)
+            self.value = getattr(self.samples, self.agg)()
+            if len(self.samples) == 1:
+                # first sample, or everything before it fell out of the window
+                # (a gap longer than the window): start watching again from here
+                self.started = t
+            # watched for a whole window (a few percent of slack, samples don't land exactly on the edges)
+            full = t - self.started >= self.window * 0.95
+        firing = full and OPERATORS[self.op](self.value, self.threshold)
+        changed = firing != self.firing
+        self.firing = firing
+        return changed
+
+class Alert:
+    '''A rule that started (firing=True) or stopped firing.'''
+    __slots__ = ("rule", "firing", "value", "time")
+
+    def __init__(self, rule, firing, value, t):
+        self.rule, self.firing, self.value, self.time = rule, firing, value, t
+
+    def __repr__(self):
+        return f"Alert({self.rule.name!r}, firing={self.firing}, value={self.value:.1f})"
+
+    def as_dict(self):
+        return {"time": round(self.time, 3), "alert": self.rule.name,
+                "state": "firing" if self.firing else "resolved", "value": round(self.value, 2)}
+
+class AlertEngine:
+    '''
+    Evaluates rules on every sample and reports the ones that change state.\n
+    Only rules on the metrics that were actually collected are updated, so with
+    adaptive sampling a metric that wasn't due doesn't count its old value again.
+
+    ### Usage
+    - engine = AlertEngine(["cpu > 90 for 30s", "ram.free < 500"], on_alert=print)\n
+    - alerts = engine.observe(snapshot, collected)  # after each get_snapshot()\n
+    - engine.firing_metrics()  # {"cpu", ...} for highlighting\n
+    '''
+
+    def __init__(self, rules=(), on_alert=None):
+        self.rules = [rule if isinstance(rule, Rule) else Rule(rule) for rule in rules]
+        self.on_alert = on_alert
+        self._by_metric = {}
+        for rule in self.rules:
+            self._by_metric.setdefault(rule.metric, []).append(rule)
+
+    def observe(self, snap, collected=None, t=None):
+        '''Update the rules with a Snapshot; collected is the metrics it holds fresh values for (default all).'''
+        t = (snap.time or time.time()) if t is None else t
+        alerts = []
+        for metric in self._by_metric if collected is None else collected:
+            if not snap.has(metric):
+                continue
+            for rule in self._by_metric.get(metric, ()):
+                if rule.update(snap, t):
+                    alert = Alert(rule, rule.firing, rule.value, t)
+                    alerts.append(alert)
+                    if self.on_alert is not None:
+                        self.on_alert(alert)
+        return alerts
+
+    def firing(self):
+        return [rule for rule in self.rules if rule.firing]
+
+    def firing_metrics(self):
+        return {rule.metric for rule in self.rules if rule.firing}
+
+def parse_rules(text):
+    '''Rules separated by ";" (as in WINSTATZ_ALERTS), as Rule objects.'''
+    return [Rule(part) for part in text.split(";") if part.strip()]
@@ -0,0 +1,347 @@
+import os
+import re
+import sys
+import time
+
+# Battery "seconds left" sentinels, same values psutil uses
+TIME_UNKNOWN = -1
+TIME_UNLIMITED = -2
+
+# Fallback device filters, for when the OS can't tell us directly (see ProcBackend)
+_VIRTUAL_DISK = re.compile(r"^(loop|ram|zram|dm-|md|sr|fd|nbd)\d")
+_PARTITION = re.compile(r"^((sd|hd|vd|xvd)[a-z]+\d+|(nvme\d+n\d+|mmcblk\d+)p\d+)$")
+_VIRTUAL_NIC = re.compile(r"^(lo|docker|veth|br-|virbr|vmnet|vboxnet|tun|tap|wg|zt|ifb|dummy|bond)|"
+                          r"Loopback|Pseudo-Interface|vEthernet|isatap|Teredo|VirtualBox|VMware|Hyper-V", re.I)
+
+class CollectorBackend:
+    '''
+    Where stats.py gets its raw numbers from.\n
+    A backend only returns raw counters, all of the rate and percentage math
+    lives in stats.py so every backend behaves the same way.
+
+    ### Methods
+    - monotonic(): the clock used to time counter deltas\n
+    - cpu_times(): list of (busy_seconds, total_seconds), one per logical cpu\n
+    - memory(): (total, used, available, percent) with sizes in bytes\n
+    - disk_counters(): { device_name: (read_bytes, write_bytes) }\n
+    - net_counters(): (bytes_sent, bytes_recv) summed over all adapters\n
+    - nic_counters(): { adapter_name: (bytes_sent, bytes_recv) }\n
+    - is_physical_disk(name), is_physical_nic(name): False for partitions and virtual devices\n
+    - battery(): (percent, plugged_in, secs_left) or None if there is no battery\n
+    - wmi(): a WMI connection for get_specs, or None where WMI does not exist\n
+    - boot_time(): when the machine booted, in seconds since the epoch\n
+    '''
+    name = "base"
+
+    def monotonic(self):
+        return time.monotonic()
+
+    def cpu_times(self):
+        raise NotImplementedError
+
+    def memory(self):
+        raise NotImplementedError
+
+    def disk_counters(self):
+        raise NotImplementedError
+
+    def net_counters(self):
+        raise NotImplementedError
+
+    def nic_counters(self):
+        raise NotImplementedError
+
+    def is_physical_disk(self, name):
+        return not _VIRTUAL_DISK.match(name) and not _PARTITION.match(name)
+
+    def is_physical_nic(self, name):
+        return not _VIRTUAL_NIC.search(name)
+
+    def battery(self):
+        return None
+
+    def wmi(self):
+        return None
+
+    def boot_time(self):
+        return 0.0
+
+    def close(self):
+        pass
+
+class PsutilBackend(CollectorBackend):
+    '''The original psutil + WMI collector.'''
+    name = "psutil"
+
+    def __init__(self):
+        import psutil
+        self._psutil = psutil
+
+    def cpu_times(self):
+        result = []
+        for t in self._psutil.cpu_times(percpu=True):
+            total = sum(t)
+            # guest time is already counted in user time on Linux
+            total -= getattr(t, "guest", 0) + getattr(t, "guest_nice", 0)
+            idle = t.idle + getattr(t, "iowait", 0)
+            result.append((total - idle, total))
+        return result
+
+    def memory(self):
+        ram = self._psutil.virtual_memory()
+        return (ram.total, ram.used, ram.available, ram.percent)
+
+    def disk_counters(self):
+        counters = self._psutil.disk_io_counters(perdisk=True)
+        if not counters:
+            return {}
+        return {device: (c.read_bytes, c.write_bytes) for device, c in counters.items()}
+
+    def net_counters(self):
+        net = self._psutil.net_io_counters()
+        if not net:
+            return None
+        return (net.bytes_sent, net.bytes_recv)
+
+    def nic_counters(self):
+        counters = self._psutil.net_io_counters(pernic=True)
+        return {nic: (c.bytes_sent, c.bytes_recv) for nic, c in counters.items()}
+
+    def battery(self):
+        battery = self._psutil.sensors_battery()
+        if battery is None:
+            return None
+        secs_left = battery.secsleft
+        if secs_left == self._psutil.POWER_TIME_UNLIMITED:
+            secs_left = TIME_UNLIMITED
+        elif secs_left == self._psutil.POWER_TIME_UNKNOWN:
+            secs_left = TIME_UNKNOWN
+        return (battery.percent, battery.power_plugged, secs_left)
+
+    def wmi(self):
+        try:
+            import wmi
+        except ImportError:
+            return None
+        return wmi.WMI()
+
+    def boot_time(self):
+        return self._psutil.boot_time()
+
+class ProcBackend(CollectorBackend):
+    '''
+    Linux collector that reads /proc directly.\n
+    The files are opened once and re-read with preadv into buffers that are
+    kept between calls, so a sample does no open/close and no per-call
+    object churn beyond parsing.
+    '''
+    name = "proc"
+
+    def __init__(self, proc_root="/proc", sys_root="/sys"):
+        self._proc_root = proc_root
+        self._sys_root = sys_root
+        self._files = {}
+        self._clk_tck = os.sysconf("SC_CLK_TCK")
+
+    def _read(self, path):
+        entry = self._files.get(path)
+        if entry is None:
+            entry = [os.open(path, os.O_RDONLY), bytearray(4096)]
+            self._files[path] = entry
+        fd, buf = entry
+        while True:
+            n = os.preadv(fd, [buf], 0)
+            if n < len(buf):
+                return bytes(memoryview(buf)[:n])
+            # file grew past the buffer, double it and read again
+            buf = entry[1] = bytearray(len(buf) * 2)
+
+    def _proc(self, name):
+        return self._read(os.path.join(self._proc_root, name))
+
+    def cpu_times(self):
+        result = []
+        for line in self._proc("stat").split(b"\n"):
+            if not line.startswith(b"cpu") or line.startswith(b"cpu "):
+                continue
+            # user nice system idle iowait irq softirq steal (guest is part of user)
+            fields = [int(x) for x in line.split()[1:9]]
+            total = sum(fields) / self._clk_tck
+            idle = (fields[3] + fields[4]) / self._clk_tck
+            result.append((total - idle, total))
+        return result
+
+    def memory(self):
+        info = {}
+        for line in self._proc("meminfo").split(b"\n"):
+            parts = line.split()
+            if len(parts) >= 2:
+                info[parts[0].rstrip(b":")] = int(parts[1]) * 1024
+        total = info[b"MemTotal"]
+        free = info.get(b"MemFree", 0)
+        if b"MemAvailable" in info:
+            # same as psutil: whatever isn't available counts as used
+            available = info[b"MemAvailable"]
+            used = total - available
+        else:
+            # kernels before 3.14 don't report MemAvailable
+            available = free
+            cached = info.get(b"Cached", 0) + info.get(b"SReclaimable", 0)
+            used = total - free - info.get(b"Buffers", 0) - cached
+            if used < 0:
+                used = total - free
+        percent = round((total - available) / total * 100, 1) if total else 0.0
+        return (total, used, available, percent)
+
+    def disk_counters(self):
+        counters = {}
+        for line in self._proc("diskstats").split(b"\n"):
+            fields = line.split()
+            if len(fields) < 10:
+                continue
+            # sectors are always 512 bytes in diskstats
+            counters[fields[2].decode()] = (int(fields[5]) * 512, int(fields[9]) * 512)
+        return counters
+
+    def net_counters(self):
+        sent = recv = 0
+        # the first two lines are column headers
+        for line in self._proc("net/dev").split(b"\n")[2:]:
+            if b":" not in line:
+                continue
+            fields = line.split(b":", 1)[1].split()
+            recv += int(fields[0])
+            sent += int(fields[8])
+        return (sent, recv)
+
+    def nic_counters(self):
+        counters = {}
+        for line in self._proc("net/dev").split(b"\n")[2:]:
+            if b":" not in line:
+                continue
+            name, fields = line.split(b":", 1)
+            fields = fields.split()
+            counters[name.strip().decode()] = (int(fields[8]), int(fields[0]))
+        return counters
+
+    def is_physical_disk(self, name):
+        block = os.path.join(self._sys_root, "block")
+        if not os.path.isdir(block):
+            return super().is_physical_disk(name)
+        # partitions aren't listed in /sys/block, virtual devices (loop, dm, zram) have no device link
+        return os.path.exists(os.path.join(block, name, "device"))
+
+    def is_physical_nic(self, name):
+        net = os.path.join(self._sys_root, "class", "net")
+        if not os.path.isdir(net):
+            return super().is_physical_nic(name)
+        return os.path.exists(os.path.join(net, name, "device"))
+
+    def battery(self):
+        supply_dir = os.path.join(self._sys_root, "class", "power_supply")
+        try:
+            supplies = sorted(os.listdir(supply_dir))
+        except OSError:
+            return None
+        for supply in supplies:
+            path = os.path.join(supply_dir, supply)
+            try:
+                if self._read(os.path.join(path, "type")).strip() != b"Battery":
+                    continue
+                percent = int(self._read(os.path.join(path, "capacity")))
+                status = self._read(os.path.join(path, "status")).strip()
+            except (OSError, ValueError):
+                continue
+            plugged = status != b"Discharging"
+            return (percent, plugged, TIME_UNLIMITED if plugged else TIME_UNKNOWN)
+        return None
+
+    def boot_time(self):
+        for line in self._proc("stat").split(b"\n"):
+            if line.startswith(b"btime "):
+                return float(line.split()[1])
+        return 0.0
+
+    def close(self):
+        for fd, _ in self._files.values():
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+        self._files.clear()
+
+class FakeBackend(CollectorBackend):
+    '''
+    Deterministic backend for tests and CI machines that are not Windows.\n
+    Every counter grows at a fixed rate on a fake clock, so any two samples
+    give the same rates no matter how far apart they are. Each monotonic()
+    call moves the fake clock forward by `step` seconds.
+    '''
+    name = "fake"
+
+    def __init__(self, cores=4, disks=("PhysicalDrive0", "PhysicalDrive1"), step=1.0,
+                 nics=("Ethernet", "Wi-Fi", "Loopback Pseudo-Interface 1")):
+        self.now = 0.0
+        self.step = step
+        self.cores = cores
+        self.disks = tuple(disks)
+        self.nics = tuple(nics)
+
+    def monotonic(self):
+        self.now += self.step
+        return self.now
+
+    def cpu_times(self):
+        # core i is busy (10 + 20 * i) % 100 percent of the time
+        return [(self.now * ((10 + 20 * i) % 100) / 100, self.now) for i in range(self.cores)]
+
+    def memory(self):
+        total = 16 * 1024 ** 3
+        used = 6 * 1024 ** 3
+        return (total, used, total - used, 37.5)
+
+    def disk_counters(self):
+        # disk i reads (i + 1) MB/s and writes (i + 1) / 2 MB/s
+        mb = 1024 ** 2
+        return {name: (int(self.now * (i + 1) * mb), int(self.now * (i + 1) * mb / 2))
+                for i, name in enumerate(self.disks)}
+
+    def net_counters(self):
+        mb = 1024 ** 2
+        return (int(self.now * 0.5 * mb), int(self.now * 2 * mb))
+
+    def nic_counters(self):
+        # adapter i sends (i + 1) / 4 MB/s and receives (i + 1) MB/s
+        mb = 1024 ** 2
+        return {name: (int(self.now * (i + 1) * mb / 4), int(self.now * (i + 1) * mb))
+                for i, name in enumerate(self.nics)}
+
+    def battery(self):
+        return (80, True, TIME_UNLIMITED)
+
+    def wmi(self):
+        import fake_wmi
+        return fake_wmi.WMI(cores=self.cores, disks=self.disks)
+
+    def boot_time(self):
+        return 1700000000.0
+
+BACKENDS = {
+    "psutil": PsutilBackend,
+    "proc": ProcBackend,
+    "fake": FakeBackend,
+}
+
+def create_backend(name=None):
+    '''
+    Create a collector backend by name ("psutil", "proc" or "fake").\n
+    Without a name the WINSTATZ_BACKEND environment variable is used, and
+    failing that /proc on Linux and psutil everywhere else.
+    '''
+    name = name or os.environ.get("WINSTATZ_BACKEND")
+    if not name:
+        name = "proc" if sys.platform.startswith("linux") and os.path.exists("/proc/stat") else "psutil"
+    try:
+        return BACKENDS[name]()
+    except KeyError:
+        raise ValueError(f"Unknown backend {name!r}, expected one of {', '.join(BACKENDS)}")
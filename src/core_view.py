@@ -0,0 +1,138 @@
+import time
+import numpy as np
+from customtkinter import CTkToplevel, CTkLabel
+import matplotlib.pyplot as plt
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from matplotlib.ticker import MaxNLocator
+from render import BlitRenderer
+
+# how many cpu samples the heatmap keeps (one column each, newest on the right)
+COLUMNS = 120
+
+class CoreHeatmap:
+    '''
+    Per-core CPU usage as one heatmap, cores by time.\n
+    The samples go into a (cores x COLUMNS) float32 ring buffer and the image is
+    updated in place and blitted, so a frame costs about the same for 4 or 256
+    logical CPUs: it is one image resampled to the plot size, not an artist per core.
+    make_canvas(figure) gives the canvas to draw on: FigureCanvasTkAgg in the
+    window, FigureCanvasAgg in the benchmarks.
+    '''
+
+    def __init__(self, make_canvas, bg_color="#242424", text_color="white"):
+        self.fig, self.ax = plt.subplots(figsize=(9, 7))
+        self.ax.set_title("CPU Usage per Core (%)")
+        self.ax.set_xlabel("samples (newest on the right)")
+        self.ax.set_ylabel("core")
+        self.ax.yaxis.set_major_locator(MaxNLocator(integer=True))
+        self.cores = 0
+        self.image = None
+        self.renderer = None
+        self._setup(1)
+        self.colorbar = self.fig.colorbar(self.image, ax=self.ax, fraction=0.04, pad=0.02)
+
+        self.canvas = make_canvas(self.fig)
+        self.renderer = BlitRenderer(self.canvas, [self.image])
+        self.set_theme(bg_color, text_color)
+
+    def _setup(self, cores):
+        # (re)size the buffers, only on the first sample or if the core count changes
+        self.cores = cores
+        self.buffer = np.zeros((cores, COLUMNS), dtype=np.float32)
+        self.times = np.full(COLUMNS, np.nan)
+        self.view = np.zeros((cores, COLUMNS), dtype=np.float32)
+        self.head = 0  # next column to write
+        extent = (-0.5, COLUMNS - 0.5, cores + 0.5, 0.5)  # core 1 at the top
+        if self.image is None:
+            self.image = self.ax.imshow(self.view, cmap="inferno", vmin=0, vmax=100, aspect="auto",
+                                        interpolation="nearest", extent=extent)
+        else:
+            self.image.set_data(self.view)
+            self.image.set_extent(extent)
+            self.renderer.invalidate()
+
+    def push(self, cpu, t=None):
+        '''Add one sample: per-core percents (array('f') from a Snapshot, or any sequence).'''
+        if not cpu:
+            return
+        if len(cpu) != self.cores:
+            self._setup(len(cpu))
+        # an array('f') goes in through the buffer protocol, without a copy
+        self.buffer[:, self.head] = np.asarray(cpu, dtype=np.float32)
+        self.times[self.head] = time.time() if t is None else t
+        self.head = (self.head + 1) % COLUMNS
+        # oldest column first, written into the same view array every time
+        split = COLUMNS - self.head
+        self.view[:, :split] = self.buffer[:, self.head:]
+        self.view[:, split:] = self.buffer[:, :self.head]
+        self.image.set_data(self.view)
+        self.renderer.update()
+
+    def describe(self, x, y):
+        '''Text for the cell at data coordinates (x, y), None outside the heatmap.'''
+        column, core = int(round(x)), int(round(y))
+        if not (0 <= column < COLUMNS and 1 <= core <= self.cores):
+            return None
+        sampled = self.times[(self.head + column) % COLUMNS]
+        if np.isnan(sampled):
+            return f"Core {core}: no data yet"
+        value = self.view[core - 1, column]
+        return f"Core {core}: {value:.1f}%  ({time.time() - sampled:.1f} s ago)"
+
+    def set_theme(self, bg_color, text_color):
+        self.fig.patch.set_facecolor(bg_color)
+        self.ax.set_facecolor(bg_color)
+        self.ax.tick_params(colors=text_color)
+        self.ax.xaxis.label.set_color(text_color)
+        self.ax.yaxis.label.set_color(text_color)
+        self.ax.title.set_color(text_color)
+        self.colorbar.ax.tick_params(colors=text_color)
+        self.renderer.invalidate()
+
+    def close(self):
+        plt.close(self.fig)
+
+class CoreHeatmapWindow:
+    '''
+    The CoreHeatmap in its own window.\n
+    Hovering a cell shows the core, its usage and how long ago it was sampled.
+    '''
+
+    def __init__(self, root, bg_color="#242424", text_color="white"):
+        self.window = CTkToplevel(root)
+        self.window.title("CPU Cores")
+        self.window.geometry("900x760")
+        self.window.resizable(False, False)
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+
+        self.hoverLabel = CTkLabel(self.window, text="Hover a cell to see a core's usage")
+        self.hoverLabel.place(relx=0.5, rely=0.03, anchor="center")
+
+        self.heatmap = CoreHeatmap(lambda fig: FigureCanvasTkAgg(fig, master=self.window), bg_color, text_color)
+        self.renderer = self.heatmap.renderer
+        self.heatmap.canvas.get_tk_widget().place(relx=0.5, rely=0.53, anchor="center")
+        self.heatmap.canvas.mpl_connect("motion_notify_event", self._on_hover)
+        self.renderer.update()
+
+    def is_open(self):
+        return self.window is not None
+
+    def push(self, cpu, t=None):
+        if self.window is not None:
+            self.heatmap.push(cpu, t)
+
+    def _on_hover(self, event):
+        if event.inaxes is not self.heatmap.ax or event.xdata is None:
+            return
+        text = self.heatmap.describe(event.xdata, event.ydata)
+        if text is not None:
+            self.hoverLabel.configure(text=text)
+
+    def set_theme(self, bg_color, text_color):
+        self.heatmap.set_theme(bg_color, text_color)
+
+    def close(self):
+        if self.window is not None:
+            self.window.destroy()
+            self.window = None
+            self.heatmap.close()
@@ -0,0 +1,59 @@
+import numpy as np
+
+class CounterRates:
+    '''
+    Per-device rates from cumulative (a, b) byte counters, as one vectorized difference.\n
+    Each update() turns the counters into an (n, 2) float64 array and subtracts
+    the previous one in a single operation. The previous array is only realigned
+    (by name) when the set of devices changes. A counter that went backwards
+    (device reset, driver reload, 32-bit wrap) gives 0 for that tick instead of
+    a huge negative or positive spike, and so does a device seen for the first time.
+
+    ### Usage
+    - rates = CounterRates(backend.is_physical_disk)\n
+    - names, mbps = rates.update(backend.disk_counters(), backend.monotonic())\n
+    '''
+
+    def __init__(self, keep=None):
+        self.keep = keep  # name -> bool filter, None keeps every device
+        self.names = ()
+        self._all_names = None
+        self._kept = None
+        self._previous = None
+        self._time = None
+
+    def _select(self, counters):
+        # the filter only runs again when the device list changes
+        all_names = tuple(counters)
+        if all_names != self._all_names:
+            self._all_names = all_names
+            self._kept = [name for name in all_names if self.keep is None or self.keep(name)]
+        return self._kept
+
+    def update(self, counters, now):
+        '''Return (names, (n, 2) array of MB/s) for { name: (a_bytes, b_bytes) } counters read at time now.'''
+        names = tuple(self._select(counters))
+        values = np.array([counters[name] for name in names], dtype=np.float64).reshape(-1, 2)
+        previous, elapsed = self._previous, (now - self._time) if self._time is not None else 0.0
+
+        if previous is not None and names != self.names:
+            # devices came or went: line the old counters up with the new names, NaN for new devices
+            index = {name: i for i, name in enumerate(self.names)}
+            aligned = np.full_like(values, np.nan)
+            for i, name in enumerate(names):
+                j = index.get(name)
+                if j is not None:
+                    aligned[i] = previous[j]
+            previous = aligned
+
+        if previous is None or elapsed <= 0:
+            rates = np.zeros_like(values)
+        else:
+            delta = values - previous
+            # resets (negative deltas) and new devices (NaN) count as idle
+            np.nan_to_num(delta, copy=False, nan=0.0)
+            np.maximum(delta, 0.0, out=delta)
+            rates = delta / (elapsed * 1024 ** 2)
+
+        self.names, self._previous, self._time = names, values, now
+        return names, rates
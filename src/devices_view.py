@@ -0,0 +1,120 @@
+import numpy as np
+from customtkinter import CTkToplevel
+import matplotlib.pyplot as plt
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from matplotlib.collections import PolyCollection
+from matplotlib.patches import Patch
+from render import BlitRenderer, nice_limit
+
+# usage key, title, bar labels, bar colors, y axis unit
+GROUPS = (
+    ("disks", "Disks", ("Read", "Write"), ("#9b59b6", "#e67e22"), "MBps"),
+    ("nics", "Network Adapters", ("Up", "Down"), ("#e74c3c", "#1abc9c"), "Mbps"),
+)
+BAR_WIDTH = 0.38
+
+class DevicesChart:
+    '''
+    Every physical disk and network adapter side by side.\n
+    Each device type gets one panel with a pair of bars per device on a shared y
+    axis, so a busy device stands out at a glance. All the bars of a panel are a
+    single PolyCollection whose heights are written straight from the speeds
+    array, so a tick is one vectorized assignment and one draw per panel,
+    whether there are 2 devices or 60. The panels are only rebuilt when devices
+    come or go. make_canvas(figure) gives the canvas, as in core_view.CoreHeatmap.
+    '''
+
+    def __init__(self, make_canvas, bg_color="#242424", text_color="white"):
+        self.bg_color, self.text_color = bg_color, text_color
+        self.fig = plt.figure(figsize=(10, 8.2))
+        self.canvas = make_canvas(self.fig)
+        self.renderer = BlitRenderer(self.canvas)
+        self.names = None
+        self.panels = []  # per group: (axes, bar collection, bar vertices)
+
+    def _layout(self, names):
+        self.names = names
+        self.fig.clear()
+        self.fig.patch.set_facecolor(self.bg_color)
+        axs = self.fig.subplots(len(GROUPS), 1)
+        self.panels = []
+        for ax, group_names, (_, title, labels, colors, unit) in zip(axs, names, GROUPS):
+            ax.set_facecolor(self.bg_color)
+            ax.set_title(f"{title} ({unit})", color=self.text_color)
+            ax.tick_params(colors=self.text_color)
+            count = len(group_names)
+            if not count:
+                ax.text(0.5, 0.5, f"No {title.lower()} found", color=self.text_color,
+                        ha="center", va="center", transform=ax.transAxes)
+                ax.set_xticks([])
+                self.panels.append((ax, None, None))
+                continue
+
+            # two bars per device: left edges at x - width and x, four corners each
+            lefts = np.repeat(np.arange(count, dtype=float), 2) + np.tile([-BAR_WIDTH, 0.0], count)
+            verts = np.zeros((2 * count, 4, 2))
+            verts[:, 0:2, 0] = lefts[:, None]
+            verts[:, 2:4, 0] = (lefts + BAR_WIDTH)[:, None]
+            bars = PolyCollection(verts, facecolors=list(colors) * count, edgecolors="none")
+            ax.add_collection(bars)
+            ax.set_xlim(-0.6, count - 0.4)
+            many = count > 8
+            ax.set_xticks(range(count), group_names, rotation=45 if many else 0,
+                          ha="right" if many else "center", fontsize=8 if many else 10)
+            ax.legend(handles=[Patch(color=color, label=label) for label, color in zip(labels, colors)],
+                      loc="upper right", fontsize=8, facecolor=self.bg_color, labelcolor=self.text_color)
+            self.panels.append((ax, bars, verts))
+        self.fig.tight_layout(pad=2.0)
+        self.renderer.set_artists([bars for _, bars, _ in self.panels if bars is not None])
+
+    def show(self, usage):
+        '''Draw a stats.get_device_usage() result.'''
+        names = tuple(usage[key][0] for key, *_ in GROUPS)
+        if names != self.names:
+            self._layout(names)
+        for (ax, bars, verts), (key, *_) in zip(self.panels, GROUPS):
+            if bars is None:
+                continue
+            speeds = usage[key][1]
+            # the top corners of every bar, read/write (or up/down) interleaved like the bars
+            verts[:, 1:3, 1] = speeds.reshape(-1, 1)
+            bars.set_verts(verts)
+            self.renderer.set_ylim(ax, 0, nice_limit(speeds.max(), minimum=10))
+        self.renderer.update()
+
+    def set_theme(self, bg_color, text_color):
+        self.bg_color, self.text_color = bg_color, text_color
+        if self.names is not None:
+            self._layout(self.names)
+            self.renderer.update()
+
+    def close(self):
+        plt.close(self.fig)
+
+class DevicesWindow:
+    '''The DevicesChart in its own window.'''
+
+    def __init__(self, root, bg_color="#242424", text_color="white"):
+        self.window = CTkToplevel(root)
+        self.window.title("All Disks and Network Adapters")
+        self.window.geometry("1000x850")
+        self.window.resizable(False, False)
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+        self.chart = DevicesChart(lambda fig: FigureCanvasTkAgg(fig, master=self.window), bg_color, text_color)
+        self.chart.canvas.get_tk_widget().place(relx=0.5, rely=0.5, anchor="center")
+
+    def is_open(self):
+        return self.window is not None
+
+    def show(self, usage):
+        if self.window is not None:
+            self.chart.show(usage)
+
+    def set_theme(self, bg_color, text_color):
+        self.chart.set_theme(bg_color, text_color)
+
+    def close(self):
+        if self.window is not None:
+            self.window.destroy()
+            self.window = None
+            self.chart.close()
@@ -0,0 +1,221 @@
+'''
+Export samples to CSV or Parquet files for offline analysis.\n
+ExportWriter buffers rows in memory and hands them to its own thread in
+batches (every batch_rows rows or flush_interval seconds), so the sampler
+only ever appends to a list. Files are rotated by size and/or age and named
+after the time they were started. Parquet needs pyarrow; rows are kept in
+the sink until there are batch_rows of them, and each such batch is written
+as one row group.
+
+### Usage
+    writer = ExportWriter(directory, fmt="csv", max_bytes=64 * 1024 ** 2)\n
+    writer.append_snapshot(snapshot)  # after each sample\n
+    writer.close()\n
+    write_file("history.parquet", columns, rows, fmt="parquet")  # one-shot
+'''
+import logging
+import os
+import threading
+import time
+from history_file import FIELDS, record_from_snapshot
+
+logger = logging.getLogger("winstatz.export")
+
+COLUMNS = ("time",) + FIELDS
+EXTENSIONS = {"csv": ".csv", "parquet": ".parquet"}
+
+def available_formats():
+    '''"csv", plus "parquet" when pyarrow is installed.'''
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return ("csv",)
+    return ("csv", "parquet")
+
+class _CsvSink:
+    def __init__(self, path, columns, batch_rows=None):
+        self.file = open(path, "w", newline="", buffering=256 * 1024)
+        self.file.write(",".join(columns) + "\n")
+
+    def write(self, rows):
+        # times to the millisecond, values to 2 decimals and missing ones as nan, like the headless csv
+        self.file.write("".join(
+            f"{row[0]:.3f}," + ",".join(f"{value:.2f}" for value in row[1:]) + "\n"
+            for row in rows))
+        self.file.flush()
+
+    def size(self):
+        return self.file.tell()
+
+    def close(self):
+        self.file.close()
+
+class _ParquetSink:
+    # timed flushes hand over a few rows at a time, row groups that small make
+    # poor Parquet files, so rows wait here until there are batch_rows of them
+    def __init__(self, path, columns, batch_rows=None):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("Parquet export needs pyarrow (pip install pyarrow)")
+        self._pa = pa
+        self.columns = columns
+        self.schema = pa.schema([(columns[0], pa.float64())] + [(name, pa.float32()) for name in columns[1:]])
+        self.file = open(path, "wb")
+        self.writer = pq.ParquetWriter(self.file, self.schema, compression="zstd")
+        self.batch_rows = batch_rows
+        self._rows = []
+
+    def write(self, rows):
+        self._rows.extend(rows)
+        if self.batch_rows is not None and len(self._rows) >= self.batch_rows:
+            self._write_group()
+
+    def _write_group(self):
+        # rows -> columns, one row group
+        arrays = [self._pa.array(column, type=field.type)
+                  for column, field in zip(zip(*self._rows), self.schema)]
+        self.writer.write_table(self._pa.Table.from_arrays(arrays, schema=self.schema))
+        self._rows = []
+
+    def size(self):
+        return self.file.tell()
+
+    def close(self):
+        if self._rows:
+            self._write_group()
+        self.writer.close()
+        self.file.close()
+
+SINKS = {"csv": _CsvSink, "parquet": _ParquetSink}
+
+def write_file(path, columns, rows, fmt="csv"):
+    '''Write rows (tuples in columns order) to one file in one go.'''
+    sink = SINKS[fmt](path, columns)
+    try:
+        if rows:
+            sink.write(rows)
+    finally:
+        sink.close()
+
+class ExportWriter:
+    '''
+    Batched, rotating export of samples on a background thread.\n
+    A new file is started once the current one reaches max_bytes or is
+    max_age seconds old (None turns either off); only the newest `keep` files
+    this writer made are kept (None keeps all). Write errors are
+    logged and the batch is dropped, sampling never sees them.
+    '''
+
+    def __init__(self, directory, fmt="csv", batch_rows=500, flush_interval=5.0,
+                 max_bytes=64 * 1024 ** 2, max_age=None, keep=None, prefix="winstatz", columns=COLUMNS):
+        if fmt not in SINKS:
+            raise ValueError(f"Unknown export format {fmt!r}, expected one of {', '.join(SINKS)}")
+        if fmt == "parquet" and "parquet" not in available_formats():
+            raise ImportError("Parquet export needs pyarrow (pip install pyarrow)")
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.fmt = fmt
+        self.batch_rows = batch_rows
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.keep = keep
+        self.prefix = prefix
+        self.columns = tuple(columns)
+        self.rows_written = 0
+        self.files = []  # paths this writer made, oldest first
+        self._rows = []
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closing = False
+        self._sink = None
+        self._opened = 0.0
+        self._thread = threading.Thread(target=self._run, daemon=True, name="export")
+        self._thread.start()
+
+    def append(self, row):
+        '''Queue one row (a tuple in columns order). Only touches memory.'''
+        with self._lock:
+            self._rows.append(row)
+            full = len(self._rows) >= self.batch_rows
+        if full:
+            self._wake.set()
+
+    def append_snapshot(self, snap, t=None):
+        self.append(record_from_snapshot(snap, t))
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            with self._lock:
+                rows, self._rows = self._rows, []
+                closing = self._closing
+            if rows:
+                try:
+                    self._write(rows)
+                except Exception as e:
+                    logger.warning("export of %d rows failed: %s", len(rows), e)
+            if closing:
+                break
+        if self._sink is not None:
+            self._sink.close()
+            self._sink = None
+
+    def _write(self, rows):
+        if self._sink is not None and self._should_rotate():
+            self._sink.close()
+            self._sink = None
+        if self._sink is None:
+            self._open()
+        self._sink.write(rows)
+        self.rows_written += len(rows)
+
+    def _should_rotate(self):
+        if self.max_bytes is not None and self._sink.size() >= self.max_bytes:
+            return True
+        return self.max_age is not None and time.time() - self._opened >= self.max_age
+
+    def _open(self):
+        self._opened = time.time()
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(self._opened))
+        path = os.path.join(self.directory, f"{self.prefix}-{stamp}{EXTENSIONS[self.fmt]}")
+        # two files in the same second get a counter instead of overwriting each other
+        n = 1
+        while os.path.exists(path):
+            path = os.path.join(self.directory, f"{self.prefix}-{stamp}-{n}{EXTENSIONS[self.fmt]}")
+            n += 1
+        self._sink = SINKS[self.fmt](path, self.columns, self.batch_rows)
+        self.files.append(path)
+        while self.keep is not None and len(self.files) > self.keep:
+            try:
+                os.remove(self.files.pop(0))
+            except OSError as e:
+                logger.warning("could not remove old export: %s", e)
+
+    def flush(self):
+        '''Hand the buffered rows to the writer thread now.'''
+        self._wake.set()
+
+    def close(self):
+        '''Write whatever is buffered, close the file and stop the thread.'''
+        with self._lock:
+            self._closing = True
+        self._wake.set()
+        self._thread.join()
+
+def store_rows(store, start=float("-inf")):
+    '''
+    The raw samples of a history.MetricStore as (columns, rows), copied out.\n
+    Call it from the thread that appends to the store, then write the rows anywhere.
+    '''
+    times = None
+    columns = []
+    for metric in store.metrics:
+        metric_times, values = store.query(metric, start, resolution=store.tiers[0].resolution)
+        times = metric_times if times is None else times
+        columns.append(values)
+    rows = list(zip(times, *columns)) if times is not None else []
+    return ("time",) + store.metrics, rows
@@ -0,0 +1,83 @@
+'''
+A local stand-in for the `wmi` package, for running get_specs and the WMI
+pool on machines without WMI (Linux CI, benchmarks).\n
+Mirrors the parts of the real API WinStatz uses: WMI() connections whose
+Win32_* attributes are callable with an optional property list (projection)
+and keyword filters, e.g. c.Win32_NetworkAdapter(["Name"], NetEnabled=True).
+
+### Knobs for tests and benchmarks
+- DELAYS: { "Win32_NetworkAdapter": 2.0 } makes that class slow\n
+- CONNECT_DELAY: seconds every WMI() call takes\n
+- connections_created: how many WMI() connections were opened\n
+'''
+import threading
+import time
+
+DELAYS = {}
+CONNECT_DELAY = 0.0
+connections_created = 0
+_lock = threading.Lock()
+
+class FakeInstance:
+    '''One WMI object. Only the projected properties exist, like the real thing.'''
+
+    def __init__(self, wmi_class, properties):
+        self._wmi_class = wmi_class
+        self.__dict__.update(properties)
+
+    def __repr__(self):
+        return f"<fake {self._wmi_class}>"
+
+class _FakeClass:
+    def __init__(self, name, rows):
+        self._name = name
+        self._rows = rows
+
+    def __call__(self, fields=(), **where):
+        delay = DELAYS.get(self._name, 0)
+        if delay:
+            time.sleep(delay)
+        result = []
+        for row in self._rows:
+            if any(row.get(key) != value for key, value in where.items()):
+                continue
+            properties = {key: row[key] for key in fields if key in row} if fields else dict(row)
+            result.append(FakeInstance(self._name, properties))
+        return result
+
+class WMI:
+    '''Fake wmi.WMI() connection with a small made-up machine behind it.'''
+
+    def __init__(self, cores=4, disks=("PhysicalDrive0", "PhysicalDrive1"), nics=1, virtual_nics=0):
+        global connections_created
+        if CONNECT_DELAY:
+            time.sleep(CONNECT_DELAY)
+        with _lock:
+            connections_created += 1
+        self._classes = {
+            "Win32_Processor": [dict(Name="WinStatz Fake CPU @ 3.00GHz", Manufacturer="GenuineFake",
+                                     Description="Fake64 Family 6 Model 1 Stepping 1",
+                                     NumberOfCores=cores, MaxClockSpeed=3000)],
+            "Win32_VideoController": [dict(Name="Fake Graphics 1000", DriverVersion="1.0.0.0",
+                                           Description="Fake Graphics 1000", VideoModeDescription="1920 x 1080",
+                                           AdapterRAM=str(2048 * 1024 ** 2))],
+            "Win32_PhysicalMemory": [dict(Capacity=str(8 * 1024 ** 3), Speed=3200, Manufacturer="Fake ",
+                                          PartNumber="FAKE-8G ") for _ in range(2)],
+            "Win32_DiskDrive": [dict(Model=f"Fake SSD {i}", InterfaceType="SCSI", MediaType="Fixed hard disk media",
+                                     Size=str(512 * 1024 ** 3), SerialNumber=f"FAKE000{i} ")
+                                for i, _ in enumerate(disks)],
+            "Win32_NetworkAdapter": [dict(Name=f"Fake Ethernet {i}", MACAddress=f"00:11:22:33:44:{i:02X}",
+                                          Manufacturer="Fake Corp", AdapterType="Ethernet 802.3", Speed="1000000000",
+                                          PhysicalAdapter=True, NetEnabled=True) for i in range(nics)] +
+                                    [dict(Name=f"Fake Virtual Adapter {i}", MACAddress=None, Manufacturer="Fake Corp",
+                                          AdapterType=None, Speed=None, PhysicalAdapter=False, NetEnabled=False)
+                                     for i in range(virtual_nics)],
+            "Win32_Battery": [dict(Name="Fake Battery", EstimatedChargeRemaining=80, BatteryStatus=2,
+                                   DesignCapacity=50000, FullChargeCapacity=48000)],
+        }
+
+    def __getattr__(self, name):
+        try:
+            return _FakeClass(name, self._classes[name])
+        except KeyError:
+            raise AttributeError(name)
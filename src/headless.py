@@ -0,0 +1,294 @@
+'''
+Headless entry point for running the sampler without the GUI.\n
+Only imports stats (and through it the collector backend), never
+customtkinter, tkinter, matplotlib or PIL. The one exception is the
+dashboard command without --text, which opens a window.
+
+### Usage
+    python src/main.py stream --interval 0.5 --format jsonl
+    python src/main.py stream --count 10 --metrics cpu,ram --output usage.jsonl
+    python src/main.py stream --alert "cpu > 90 for 30s" --alert "ram.free < 500"
+    python src/main.py agent --listen 0.0.0.0:7781
+    python src/main.py dashboard pc1:7781 pc2:7781 unix:/tmp/winstatz.sock
+    python src/main.py metrics --listen 127.0.0.1:9779
+    python src/main.py record --dir exports --format parquet --max-minutes 60
+'''
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+import openmetrics
+import remote
+import stats
+from alerts import AlertEngine, Rule
+from export import ExportWriter
+from history_file import FIELDS, record_from_usage
+from snapshot import Snapshot
+
+METRICS = ("cpu", "ram", "disk", "net", "battery")
+
+# which flat history fields belong to which metric, used by the csv format
+_CSV_FIELDS = {
+    "cpu": ("cpu",),
+    "ram": ("ramUsed", "ramFree", "ramPercent"),
+    "disk": ("diskRead", "diskWrite"),
+    "net": ("netUp", "netDown"),
+    "battery": ("battery",),
+}
+
+def parse_metrics(text):
+    metrics = tuple(m.strip() for m in text.split(",") if m.strip())
+    unknown = [m for m in metrics if m not in METRICS]
+    if unknown:
+        raise argparse.ArgumentTypeError(f"unknown metric(s) {', '.join(unknown)}, expected some of {','.join(METRICS)}")
+    return metrics
+
+def parse_rule(text):
+    try:
+        return Rule(text)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+def snapshot(metrics, t=None, out=None):
+    '''One sample as a dict with a timestamp and the requested metrics, in Snapshot.as_usage() form. out is refilled like in stats.get_snapshot.'''
+    # only the requested collectors run
+    usage = stats.get_snapshot(metrics, out).as_usage()
+    snap = {"time": round(time.time() if t is None else t, 3)}
+    for name, value in zip(METRICS, usage):
+        if name in metrics:
+            snap[name] = value
+    return snap, usage
+
+class _JsonlFormatter:
+    header = None
+
+    def __init__(self, metrics):
+        self.metrics = metrics
+
+    def format(self, snap, usage):
+        return json.dumps(snap, separators=(",", ":")) + "\n"
+
+    def format_alert(self, alert):
+        return json.dumps(alert.as_dict(), separators=(",", ":")) + "\n"
+
+class _CsvFormatter:
+    def __init__(self, metrics):
+        wanted = {field for m in metrics for field in _CSV_FIELDS[m]}
+        self.indexes = [i for i, field in enumerate(FIELDS, 1) if field in wanted]
+        self.header = ",".join(["time"] + [FIELDS[i - 1] for i in self.indexes]) + "\n"
+
+    def format(self, snap, usage):
+        record = record_from_usage(snap["time"], usage)
+        return ",".join([f"{record[0]:.3f}"] + [f"{record[i]:.2f}" for i in self.indexes]) + "\n"
+
+    def format_alert(self, alert):
+        # a comment line, so csv readers can skip it (e.g. pandas comment="#")
+        state = "firing" if alert.firing else "resolved"
+        return f"# {alert.time:.3f} alert {state}: {alert.rule.name} ({alert.value:.2f})\n"
+
+FORMATS = {"jsonl": _JsonlFormatter, "csv": _CsvFormatter}
+
+def _uncollected(rules, metrics):
+    '''The metrics the rules read that aren't collected, in METRICS order.'''
+    needed = {rule.metric for rule in rules}
+    return [m for m in METRICS if m in needed and m not in metrics]
+
+def stream(out, interval=1.0, count=None, metrics=METRICS, fmt="jsonl", flush_interval=1.0, rules=()):
+    '''
+    Write one snapshot per line to out until count samples were written (or forever).\n
+    Writes are buffered and flushed at most every flush_interval seconds, and
+    samples are taken on a fixed schedule so the interval does not drift.
+    When one of the alert rules starts or stops firing, a line for it follows the sample.
+    Every rule must be on one of the metrics, else it could never fire (ValueError).
+    '''
+    uncollected = _uncollected(rules, metrics)
+    if uncollected:
+        raise ValueError(f"alert rules need {', '.join(uncollected)}, which is not in the metrics")
+    formatter = FORMATS[fmt](metrics)
+    engine = AlertEngine(rules)
+    sample = Snapshot()
+    if formatter.header:
+        out.write(formatter.header)
+
+    written = 0
+    next_sample = time.monotonic()
+    last_flush = next_sample
+    while count is None or written < count:
+        snap, usage = snapshot(metrics, out=sample)
+        out.write(formatter.format(snap, usage))
+        for alert in engine.observe(sample, metrics):
+            out.write(formatter.format_alert(alert))
+        written += 1
+
+        now = time.monotonic()
+        if now - last_flush >= flush_interval:
+            out.flush()
+            last_flush = now
+
+        if count is not None and written >= count:
+            break
+        next_sample += interval
+        delay = next_sample - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        else:
+            # fell behind, don't try to catch up with a burst of samples
+            next_sample = time.monotonic()
+    out.flush()
+    return written
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="winstatz", description="WinStatz headless mode")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    stream_parser = commands.add_parser("stream", help="write usage snapshots to stdout or a file, one per line")
+    stream_parser.add_argument("--interval", type=float, default=1.0, help="seconds between samples (default 1.0)")
+    stream_parser.add_argument("--count", type=int, default=None, help="stop after this many samples")
+    stream_parser.add_argument("--metrics", type=parse_metrics, default=METRICS, help=f"comma separated subset of {','.join(METRICS)}")
+    stream_parser.add_argument("--format", choices=sorted(FORMATS), default="jsonl")
+    stream_parser.add_argument("--output", "-o", default="-", help="file to write to, - for stdout (default)")
+    stream_parser.add_argument("--flush-interval", type=float, default=1.0, help="seconds between flushes (default 1.0)")
+    stream_parser.add_argument("--backend", choices=("psutil", "proc", "fake"), default=None, help="collector backend")
+    stream_parser.add_argument("--alert", type=parse_rule, action="append", default=[], metavar="RULE",
+                               help="write a line when a rule like 'cpu > 90 for 30s' starts or stops firing (repeatable)")
+
+    agent_parser = commands.add_parser("agent", help="serve this machine's usage to dashboards")
+    agent_parser.add_argument("--listen", default=f"127.0.0.1:{remote.DEFAULT_PORT}",
+                              help=f"host:port or unix:/path (default 127.0.0.1:{remote.DEFAULT_PORT})")
+    agent_parser.add_argument("--interval", type=float, default=1.0, help="seconds between samples (default 1.0)")
+    agent_parser.add_argument("--name", default=None, help="host name shown on dashboards (default: this machine's)")
+    agent_parser.add_argument("--backend", choices=("psutil", "proc", "fake"), default=None, help="collector backend")
+
+    dashboard_parser = commands.add_parser("dashboard", help="show several agents side by side")
+    dashboard_parser.add_argument("agents", nargs="+", help="host:port or unix:/path of each agent")
+    dashboard_parser.add_argument("--text", action="store_true", help="print a table instead of opening a window")
+    dashboard_parser.add_argument("--interval", type=float, default=1.0, help="seconds between tables with --text (default 1.0)")
+    dashboard_parser.add_argument("--count", type=int, default=None, help="stop after this many tables with --text")
+    dashboard_parser.set_defaults(backend=None)
+
+    record_parser = commands.add_parser("record", help="record samples to rotating CSV or Parquet files")
+    record_parser.add_argument("--dir", default=".", help="folder to write the files to (default: current folder)")
+    record_parser.add_argument("--format", choices=("csv", "parquet"), default="csv", help="parquet needs pyarrow")
+    record_parser.add_argument("--interval", type=float, default=1.0, help="seconds between samples (default 1.0)")
+    record_parser.add_argument("--count", type=int, default=None, help="stop after this many samples")
+    record_parser.add_argument("--batch", type=int, default=500, help="rows written per batch (default 500)")
+    record_parser.add_argument("--flush-interval", type=float, default=5.0, help="write at least every this many seconds (default 5)")
+    record_parser.add_argument("--max-mb", type=float, default=64, help="start a new file after this many MB (default 64)")
+    record_parser.add_argument("--max-minutes", type=float, default=None, help="start a new file after this many minutes")
+    record_parser.add_argument("--keep", type=int, default=None, help="only keep this many files")
+    record_parser.add_argument("--backend", choices=("psutil", "proc", "fake"), default=None, help="collector backend")
+
+    metrics_parser = commands.add_parser("metrics", help="serve usage and specs in OpenMetrics format for Prometheus")
+    metrics_parser.add_argument("--listen", default=f"127.0.0.1:{openmetrics.DEFAULT_PORT}",
+                                help=f"host:port to serve /metrics on (default 127.0.0.1:{openmetrics.DEFAULT_PORT})")
+    metrics_parser.add_argument("--interval", type=float, default=1.0, help="seconds between samples (default 1.0)")
+    metrics_parser.add_argument("--backend", choices=("psutil", "proc", "fake"), default=None, help="collector backend")
+    return parser
+
+def record(directory, fmt="csv", interval=1.0, count=None, **options):
+    '''Sample every interval into a rotating export.ExportWriter; the files are written on its own thread.'''
+    writer = ExportWriter(directory, fmt, **options)
+    snap = Snapshot()
+    next_sample = time.monotonic()
+    sampled = 0
+    try:
+        while count is None or sampled < count:
+            stats.get_snapshot(out=snap)
+            writer.append_snapshot(snap)
+            sampled += 1
+            if count is not None and sampled >= count:
+                break
+            next_sample += interval
+            time.sleep(max(next_sample - time.monotonic(), 0))
+    finally:
+        writer.close()
+    return writer
+
+def serve_metrics(listen, interval=1.0, count=None):
+    '''Sample every interval and publish to an OpenMetrics endpoint; scrapes only read the last sample.'''
+    kind, where = remote.parse_address(listen)
+    if kind != "tcp":
+        raise ValueError("the metrics endpoint is HTTP, --listen must be host:port")
+    host, port = where
+    exporter = openmetrics.MetricsExporter()
+    bound = exporter.serve(host, port)
+    print(f"serving http://{bound[0]}:{bound[1]}/metrics", file=sys.stderr)
+    stats.get_specs_async(callback=exporter.set_spec)
+    snap = Snapshot()
+    next_sample = time.monotonic()
+    sampled = 0
+    try:
+        while count is None or sampled < count:
+            stats.get_snapshot(out=snap)
+            exporter.publish(snap, stats.get_device_usage()["nics"])
+            sampled += 1
+            next_sample += interval
+            time.sleep(max(next_sample - time.monotonic(), 0))
+    finally:
+        exporter.close()
+
+async def run_agent(address, interval, name=None):
+    server = remote.AgentServer(address, interval, host=name)
+    bound = await server.start()
+    print(f"agent {server.encoder.host} listening on {remote.format_address(bound)}", file=sys.stderr)
+    try:
+        await server.run()
+    finally:
+        await server.close()
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command == "stream":
+        uncollected = _uncollected(args.alert, args.metrics)
+        if uncollected:
+            parser.error(f"--alert is on {', '.join(uncollected)}, add it to --metrics")
+    if args.backend:
+        stats.set_backend(args.backend)
+
+    if args.command == "stream":
+        out = sys.stdout if args.output == "-" else open(args.output, "a", buffering=64 * 1024)
+        try:
+            stream(out, args.interval, args.count, args.metrics, args.format, args.flush_interval, args.alert)
+        except KeyboardInterrupt:
+            pass
+        except BrokenPipeError:
+            # the reader went away (e.g. | head), silence the final flush
+            os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        finally:
+            if out is not sys.stdout:
+                out.close()
+    elif args.command == "agent":
+        try:
+            asyncio.run(run_agent(remote.parse_address(args.listen), args.interval, args.name))
+        except KeyboardInterrupt:
+            pass
+    elif args.command == "dashboard":
+        addresses = [remote.parse_address(agent) for agent in args.agents]
+        if not args.text:
+            from remote_view import DashboardWindow
+            DashboardWindow(addresses).run()
+            return 0
+        try:
+            asyncio.run(remote.text_dashboard(addresses, args.interval, args.count))
+        except KeyboardInterrupt:
+            pass
+    elif args.command == "record":
+        try:
+            record(args.dir, args.format, args.interval, args.count, batch_rows=args.batch,
+                   flush_interval=args.flush_interval, max_bytes=int(args.max_mb * 1024 ** 2),
+                   max_age=args.max_minutes * 60 if args.max_minutes else None, keep=args.keep)
+        except KeyboardInterrupt:
+            pass
+        except ImportError as e:
+            print(e, file=sys.stderr)
+            return 1
+    elif args.command == "metrics":
+        try:
+            serve_metrics(args.listen, args.interval)
+        except KeyboardInterrupt:
+            pass
+    return 0
@@ -0,0 +1,161 @@
+import math
+from array import array
+
+# (resolution in seconds, number of points) for each tier.
+# The first tier keeps raw samples, the others hold averages of the samples
+# that fell into each bucket:
+# ~1 hour at 1 s, 1 day at 10 s and 30 days at 1 min.
+DEFAULT_TIERS = ((1, 3600), (10, 8640), (60, 43200))
+
+# Metrics the dashboard keeps history for
+DEFAULT_METRICS = ("cpu", "ram", "disk", "net")
+
+class _Tier:
+    '''One fixed-size ring of timestamps plus one value ring per metric.'''
+    __slots__ = ("resolution", "capacity", "times", "columns", "head", "count",
+                 "bucket", "sums", "counts")
+
+    def __init__(self, resolution, capacity, metrics):
+        self.resolution = resolution
+        self.capacity = capacity
+        # preallocated up front, nothing grows after this
+        self.times = array("d", bytes(8 * capacity))
+        self.columns = {name: array("d", bytes(8 * capacity)) for name in metrics}
+        self.head = 0
+        self.count = 0
+        # rollup accumulator for the bucket currently being filled
+        self.bucket = None
+        self.sums = {name: 0.0 for name in metrics}
+        self.counts = {name: 0 for name in metrics}
+
+    def push(self, t, values):
+        i = self.head
+        self.times[i] = t
+        for name, column in self.columns.items():
+            column[i] = values.get(name, math.nan)
+        self.head = (i + 1) % self.capacity
+        if self.count < self.capacity:
+            self.count += 1
+
+    def accumulate(self, t, values):
+        '''Add a raw sample to the current bucket, flushing the previous bucket if it is done.'''
+        bucket = int(t // self.resolution)
+        if bucket != self.bucket:
+            self.flush()
+            self.bucket = bucket
+        for name, value in values.items():
+            if name in self.sums and value == value:  # skip NaN
+                self.sums[name] += value
+                self.counts[name] += 1
+
+    def flush(self):
+        if self.bucket is None:
+            return
+        averages = {}
+        for name in self.sums:
+            n = self.counts[name]
+            averages[name] = self.sums[name] / n if n else math.nan
+            self.sums[name] = 0.0
+            self.counts[name] = 0
+        self.push(self.bucket * self.resolution, averages)
+        self.bucket = None
+
+    def _physical(self, i):
+        return (self.head - self.count + i) % self.capacity
+
+    def oldest(self):
+        return self.times[self._physical(0)] if self.count else math.inf
+
+    def bisect(self, t):
+        '''Logical index of the first point with timestamp >= t, O(log n).'''
+        lo, hi = 0, self.count
+        times = self.times
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if times[self._physical(mid)] < t:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def slice(self, column, lo, hi):
+        '''Copy logical points [lo, hi) out of the ring, at most two array slices.'''
+        if lo >= hi:
+            return array("d")
+        a = self._physical(lo)
+        b = a + (hi - lo)
+        if b <= self.capacity:
+            return column[a:b]
+        return column[a:] + column[:b - self.capacity]
+
+class MetricStore:
+    '''
+    Fixed-memory, multi-resolution time-series store.\n
+    Every tier is allocated when the store is created, so memory use is known
+    in advance (see nbytes) and never grows. Samples go into the raw tier and
+    are rolled up into the coarser tiers as they arrive.
+
+    ### Usage
+    - store.append(time.time(), {"cpu": 12.5, "ram": 4096.0})\n
+    - store.query("cpu", start, end): (timestamps, values) as array('d'), from
+      the finest tier that still covers start. Costs O(log n + points returned).\n
+    - store.latest("cpu", 50): the last 50 raw points\n
+    '''
+
+    def __init__(self, metrics=DEFAULT_METRICS, tiers=DEFAULT_TIERS):
+        self.metrics = tuple(metrics)
+        self.tiers = [_Tier(resolution, capacity, self.metrics) for resolution, capacity in tiers]
+
+    @staticmethod
+    def size_for(metrics=DEFAULT_METRICS, tiers=DEFAULT_TIERS):
+        '''Bytes of ring storage a store with these metrics and tiers will use.'''
+        return sum(8 * capacity * (len(metrics) + 1) for _, capacity in tiers)
+
+    @property
+    def nbytes(self):
+        return sum(tier.times.itemsize * tier.capacity * (len(tier.columns) + 1) for tier in self.tiers)
+
+    def __len__(self):
+        return self.tiers[0].count
+
+    def append(self, t, values):
+        '''Store one sample. Metrics missing from values are stored as NaN.'''
+        raw = self.tiers[0]
+        raw.push(t, values)
+        for tier in self.tiers[1:]:
+            tier.accumulate(t, values)
+
+    def _pick_tier(self, start, resolution):
+        if resolution is not None:
+            for tier in self.tiers:
+                if tier.resolution >= resolution:
+                    return tier
+            return self.tiers[-1]
+        for tier in self.tiers:
+            if tier.oldest() <= start:
+                return tier
+        # nothing goes back that far, use the tier with the longest reach
+        return max(self.tiers, key=lambda tier: tier.count * tier.resolution if tier.count else -1)
+
+    def query(self, metric, start=-math.inf, end=math.inf, resolution=None):
+        '''
+        Return (timestamps, values) for start <= t <= end.\n
+        Pass resolution (seconds) to force a tier, otherwise the finest tier
+        that reaches back to start is used.
+        '''
+        tier = self._pick_tier(start, resolution)
+        lo = tier.bisect(start)
+        hi = tier.bisect(math.nextafter(end, math.inf)) if end != math.inf else tier.count
+        return tier.slice(tier.times, lo, hi), tier.slice(tier.columns[metric], lo, hi)
+
+    def latest(self, metric, n=1):
+        '''Return (timestamps, values) of the last n raw samples.'''
+        raw = self.tiers[0]
+        lo = max(0, raw.count - n)
+        return raw.slice(raw.times, lo, raw.count), raw.slice(raw.columns[metric], lo, raw.count)
+
+    def last_value(self, metric, default=0.0):
+        raw = self.tiers[0]
+        if not raw.count:
+            return default
+        return raw.columns[metric][raw._physical(raw.count - 1)]
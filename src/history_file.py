@@ -0,0 +1,223 @@
+import math
+import mmap
+import os
+import struct
+import time
+
+# On-disk layout
+# header: magic, version, record size, record count (padded to 64 bytes)
+# records: timestamp (float64) followed by the usage fields as float32
+MAGIC = b"WSTZHIST"
+VERSION = 1
+HEADER = struct.Struct("<8sIIQ")
+HEADER_SIZE = 64
+FIELDS = ("cpu", "ramUsed", "ramFree", "ramPercent", "diskRead", "diskWrite", "netUp", "netDown", "battery")
+RECORD = struct.Struct("<d" + "f" * len(FIELDS))
+
+GROW_BYTES = 1024 * 1024  # grow the file 1 MB at a time
+MAX_BYTES = 64 * 1024 * 1024  # rotate after 64 MB (~1.5M samples)
+KEEP_FILES = 4  # history.bin.1 ... history.bin.4
+
+def record_from_usage(t, usage):
+    '''Flatten a Snapshot.as_usage() list into one history record tuple. Missing values become NaN.'''
+    nan = float("nan")
+    cpu, ram, disks, net, battery = usage
+    return (
+        t,
+        sum(cpu.values()) / len(cpu) if cpu else nan,
+        ram["used"] if ram else nan,
+        ram["free"] if ram else nan,
+        ram["percent"] if ram else nan,
+        sum(d["readSpeed"] for d in disks) if disks else nan,
+        sum(d["writeSpeed"] for d in disks) if disks else nan,
+        net["up"] if net else nan,
+        net["down"] if net else nan,
+        battery["percent"] if battery else nan,
+    )
+
+def record_from_snapshot(snap, t=None):
+    '''Flatten a stats.get_snapshot() result into one history record tuple. Missing values become NaN.'''
+    nan = float("nan")
+    has_ram, has_disk, has_net = snap.has("ram"), snap.has("disk"), snap.has("net")
+    return (
+        snap.time if t is None else t,
+        snap.cpu_average if snap.cpu else nan,
+        snap.ram_used if has_ram else nan,
+        snap.ram_free if has_ram else nan,
+        snap.ram_percent if has_ram else nan,
+        sum(snap.disk_read) if has_disk else nan,
+        sum(snap.disk_write) if has_disk else nan,
+        snap.net_up if has_net else nan,
+        snap.net_down if has_net else nan,
+        snap.battery_percent if snap.has("battery") else nan,
+    )
+
+class HistoryWriter:
+    '''
+    Append-only, memory-mapped history file.\n
+    Records are written straight into the mapping, so an append is a memory
+    copy and the OS writes the pages back on its own. The file grows in
+    GROW_BYTES steps and is rotated to path.1, path.2, ... once it would go
+    past max_bytes.
+    '''
+
+    def __init__(self, path, max_bytes=MAX_BYTES, keep=KEEP_FILES):
+        self.path = path
+        self.max_bytes = max(max_bytes, HEADER_SIZE + RECORD.size)
+        self.keep = keep
+        self._file = None
+        self._mm = None
+        self.count = 0
+        self._open()
+
+    def _open(self):
+        new = not os.path.exists(self.path) or os.path.getsize(self.path) < HEADER_SIZE
+        self._file = open(self.path, "w+b" if new else "r+b")
+        if new:
+            self._file.truncate(min(HEADER_SIZE + GROW_BYTES, self.max_bytes))
+        self._mm = mmap.mmap(self._file.fileno(), 0)
+        magic, version, record_size, count = HEADER.unpack_from(self._mm, 0)
+        if new or magic != MAGIC or version != VERSION or record_size != RECORD.size:
+            # fresh file, or a layout we don't understand: start over
+            count = 0
+            HEADER.pack_into(self._mm, 0, MAGIC, VERSION, RECORD.size, count)
+        self.count = count
+
+    def _close(self):
+        if self._mm is not None:
+            self._mm.flush()
+            self._mm.close()
+            self._mm = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _grow(self):
+        size = len(self._mm)
+        if size + RECORD.size > self.max_bytes:
+            self._rotate()
+            return
+        self._mm.close()
+        self._file.truncate(min(size + GROW_BYTES, self.max_bytes))
+        self._mm = mmap.mmap(self._file.fileno(), 0)
+
+    def _rotate(self):
+        self._close()
+        for i in range(self.keep - 1, 0, -1):
+            older = f"{self.path}.{i}"
+            if os.path.exists(older):
+                os.replace(older, f"{self.path}.{i + 1}")
+        if self.keep > 0:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+        self._open()
+
+    def append(self, record):
+        '''Append one record: (timestamp, *FIELDS).'''
+        offset = HEADER_SIZE + self.count * RECORD.size
+        if offset + RECORD.size > len(self._mm):
+            self._grow()
+            offset = HEADER_SIZE + self.count * RECORD.size
+        RECORD.pack_into(self._mm, offset, *record)
+        self.count += 1
+        # publish the record only after it is fully written
+        struct.pack_into("<Q", self._mm, 16, self.count)
+
+    def append_snapshot(self, snap, t=None):
+        self.append(record_from_snapshot(snap, t))
+
+    def close(self):
+        self._close()
+
+class HistoryReader:
+    '''
+    Read-only view of a history file.\n
+    Uses its own mapping, so it can be open while a HistoryWriter keeps
+    appending; call refresh() to see records written since it was opened.
+    '''
+
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+        self._mm = None
+        self.count = 0
+        self.refresh()
+
+    def refresh(self):
+        self.close()
+        self._file = open(self.path, "rb")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, record_size, count = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION or record_size != RECORD.size:
+            raise ValueError(f"{self.path} is not a WinStatz history file")
+        self.count = min(count, (len(self._mm) - HEADER_SIZE) // RECORD.size)
+
+    def timestamp(self, i):
+        return struct.unpack_from("<d", self._mm, HEADER_SIZE + i * RECORD.size)[0]
+
+    def bisect(self, t):
+        '''Index of the first record with timestamp >= t, O(log n).'''
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.timestamp(mid) < t:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def view(self, start=float("-inf"), end=float("inf")):
+        '''
+        Zero-copy memoryview of the raw records with start <= timestamp <= end.\n
+        Release it (or leave the with block) before calling refresh() or close().
+        '''
+        lo = self.bisect(start)
+        # first record after end; nextafter is exact at any magnitude (inf stays inf)
+        hi = self.bisect(math.nextafter(end, math.inf))
+        hi = max(hi, lo)
+        return memoryview(self._mm)[HEADER_SIZE + lo * RECORD.size:HEADER_SIZE + hi * RECORD.size]
+
+    def records(self, start=float("-inf"), end=float("inf")):
+        '''Yield (timestamp, *FIELDS) tuples for start <= timestamp <= end.'''
+        with self.view(start, end) as view:
+            yield from RECORD.iter_unpack(view)
+
+    def close(self):
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def read_history(path, start=float("-inf"), end=float("inf"), keep=KEEP_FILES):
+    '''Yield records in [start, end] from path and its rotated files, oldest first.'''
+    files = [f"{path}.{i}" for i in range(keep, 0, -1)] + [path]
+    for file in files:
+        if not os.path.exists(file):
+            continue
+        with HistoryReader(file) as reader:
+            if reader.count == 0 or reader.timestamp(reader.count - 1) < start:
+                continue
+            if reader.timestamp(0) > end:
+                break
+            yield from reader.records(start, end)
+
+def default_path():
+    from paths import get_app_dir
+    return os.path.join(get_app_dir(), "history.bin")
+
+if __name__ == "__main__":
+    # print the last N minutes of history as CSV, e.g. python history_file.py 60
+    import sys
+    minutes = float(sys.argv[1]) if len(sys.argv) > 1 else 60
+    print(",".join(("time",) + FIELDS))
+    for record in read_history(default_path(), time.time() - minutes * 60):
+        print(",".join([time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(record[0]))] + [f"{v:.2f}" for v in record[1:]]))
@@ -0,0 +1,113 @@
+import time
+from customtkinter import CTkToplevel, CTkLabel, CTkOptionMenu
+import matplotlib.pyplot as plt
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from render import BlitRenderer, StreamingLTTB, nice_limit
+
+# window length options: label -> (seconds, x axis unit in seconds, unit name)
+SPANS = {
+    "1 minute": (60, 1, "seconds"),
+    "10 minutes": (600, 60, "minutes"),
+    "1 hour": (3600, 60, "minutes"),
+    "1 day": (86400, 3600, "hours"),
+    "30 days": (30 * 86400, 86400, "days"),
+}
+
+# metric, title, color, fixed y limit (None = scale to the data)
+LINES = (
+    ("cpu", "CPU Usage (%)", "#3498db", 100),
+    ("ram", "RAM Used (MB)", "#27ae60", None),
+    ("disk", "Disk Usage (MBps)", "#9b59b6", None),
+    ("net", "Network Usage (Mbps)", "#e74c3c", None),
+)
+
+class HistoryWindow:
+    '''
+    Scrolling line charts of the dashboard history.\n
+    Reads from a MetricStore, decimates each line to the pixel width of the
+    plot with StreamingLTTB and only updates the Line2D data, so a frame costs
+    the same whether the window shows a minute or a month.
+    '''
+
+    def __init__(self, root, store, bg_color="#242424", text_color="white", span="10 minutes"):
+        self.store = store
+        self.window = CTkToplevel(root)
+        self.window.title("Usage History")
+        self.window.geometry("900x850")
+        self.window.resizable(False, False)
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+
+        spanLabel = CTkLabel(self.window, text="Show the last:")
+        spanLabel.place(relx=0.35, rely=0.03, anchor="center")
+        spanOption = CTkOptionMenu(self.window, values=list(SPANS), command=self.set_span)
+        spanOption.set(span)
+        spanOption.place(relx=0.55, rely=0.03, anchor="center")
+
+        self.fig, self.axs = plt.subplots(len(LINES), 1, figsize=(9, 8), sharex=True)
+        self.lines = []
+        for ax, (metric, title, color, _) in zip(self.axs, LINES):
+            ax.set_title(title)
+            self.lines.append(ax.plot([], [], color=color, linewidth=1.2)[0])
+        self.fig.tight_layout(pad=2.5)
+
+        self.canvas = FigureCanvasTkAgg(self.fig, master=self.window)
+        self.canvas.get_tk_widget().place(relx=0.5, rely=0.53, anchor="center")
+        # the lines are redrawn every tick, the axes only when a limit moves
+        self.renderer = BlitRenderer(self.canvas, self.lines)
+        self.set_theme(bg_color, text_color)
+        self.set_span(span)
+
+    def is_open(self):
+        return self.window is not None
+
+    def set_span(self, span):
+        self.span, self.unit, unit_name = SPANS[span]
+        # the coarsest detail the plot can show is one point per pixel
+        pixels = max(int(self.axs[0].bbox.width), 10)
+        self.decimators = [StreamingLTTB(self.span / pixels) for _ in LINES]
+        # the finest tier of the store that still covers the whole window
+        self.resolution = next((tier.resolution for tier in self.store.tiers
+                                if tier.resolution * tier.capacity >= self.span), self.store.tiers[-1].resolution)
+        self.axs[-1].set_xlim(-self.span / self.unit, 0)
+        self.axs[-1].set_xlabel(f"{unit_name} ago")
+        self.renderer.invalidate()
+        self.refresh()
+
+    def set_theme(self, bg_color, text_color):
+        self.fig.patch.set_facecolor(bg_color)
+        for ax in self.axs:
+            ax.set_facecolor(bg_color)
+            ax.tick_params(colors=text_color)
+            ax.xaxis.label.set_color(text_color)
+            ax.title.set_color(text_color)
+        self.renderer.invalidate()
+
+    def set_line_color(self, metric, color):
+        for (line_metric, *_), line in zip(LINES, self.lines):
+            if line_metric == metric:
+                line.set_color(color)
+        self.renderer.update()
+
+    def refresh(self):
+        if self.window is None:
+            return
+        now = time.time()
+        start = now - self.span
+        for (metric, _, _, fixed_top), ax, line, decimator in zip(LINES, self.axs, self.lines, self.decimators):
+            times, values = self.store.query(metric, decimator.resume_time(start), now, resolution=self.resolution)
+            points = decimator.update(times, values, start, now)
+            if points:
+                xs, ys = zip(*points)
+                line.set_data([(x - now) / self.unit for x in xs], ys)
+                top = fixed_top or nice_limit(max(ys))
+            else:
+                line.set_data([], [])
+                top = fixed_top or 100
+            self.renderer.set_ylim(ax, 0, top)
+        self.renderer.update()
+
+    def close(self):
+        if self.window is not None:
+            self.window.destroy()
+            self.window = None
+            plt.close(self.fig)
@@ -0,0 +1,94 @@
+import threading
+from bisect import bisect_left
+
+# Bucket upper bounds in seconds: 10 µs to ~170 s, four buckets per doubling,
+# so a percentile read from the histogram is within ~19% of the real value.
+BUCKET_BOUNDS = tuple(1e-5 * 2 ** (i / 4) for i in range(97))
+
+class LatencyHistogram:
+    '''
+    Call count, error count and a fixed log-bucket latency histogram for one collector.\n
+    record() is a bisect and a few additions, cheap enough for every sample;
+    percentiles are only worked out when someone reads them.
+    '''
+
+    __slots__ = ("calls", "errors", "max", "total", "buckets", "last_error")
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.max = 0.0
+        self.total = 0.0
+        self.buckets = [0] * (len(BUCKET_BOUNDS) + 1)  # the last one is "slower than everything"
+        self.last_error = None
+
+    def record(self, seconds, error=None):
+        self.calls += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+        self.buckets[bisect_left(BUCKET_BOUNDS, seconds)] += 1
+        if error is not None:
+            self.errors += 1
+            self.last_error = f"{type(error).__name__}: {error}"
+
+    def percentile(self, p):
+        '''Latency in seconds that p percent of the calls stayed under (bucket upper bound, capped at max).'''
+        if not self.calls:
+            return 0.0
+        target = self.calls * p / 100
+        seen = 0
+        for i, count in enumerate(self.buckets):
+            seen += count
+            if seen >= target:
+                return min(BUCKET_BOUNDS[i], self.max) if i < len(BUCKET_BOUNDS) else self.max
+        return self.max
+
+    def as_dict(self):
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "p50Ms": round(self.percentile(50) * 1000, 3),
+            "p95Ms": round(self.percentile(95) * 1000, 3),
+            "maxMs": round(self.max * 1000, 3),
+            "meanMs": round(self.total / self.calls * 1000, 3) if self.calls else 0.0,
+            "lastError": self.last_error,
+        }
+
+class LatencyRegistry:
+    '''
+    One LatencyHistogram per collector name ("cpu", "ram", "Win32_Processor", ...).\n
+    Safe to record from the sampler and the WMI worker threads at the same time.
+
+    ### Usage
+    - registry.record("cpu", 0.0004)\n
+    - registry.record("Win32_Battery", 15.0, error=TimeoutError(...))\n
+    - registry.snapshot()  # { "cpu": { "calls": 1, "errors": 0, "p50Ms": ..., ... }, ... }\n
+    '''
+
+    def __init__(self):
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def record(self, name, seconds, error=None):
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = LatencyHistogram()
+            histogram.record(seconds, error)
+
+    def snapshot(self):
+        with self._lock:
+            return {name: histogram.as_dict() for name, histogram in self._histograms.items()}
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+
+def format_table(snapshot):
+    '''Render a snapshot() as a fixed width text table, for the debug overlay.'''
+    lines = [f"{'collector':<24}{'calls':>7}{'errors':>7}{'p50 ms':>9}{'p95 ms':>9}{'max ms':>9}"]
+    for name, row in snapshot.items():
+        lines.append(f"{name[:23]:<24}{row['calls']:>7}{row['errors']:>7}"
+                     f"{row['p50Ms']:>9.2f}{row['p95Ms']:>9.2f}{row['maxMs']:>9.2f}")
+    return "\n".join(lines)
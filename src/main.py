@@ -1,4 +1,6 @@
-from ui import build_main_ui
+import logging
+import os
+import sys
 
 # TODO
 # - check if i can make something in c or c++ that can get gpu usage for all gpu types
@@ -6,4 +8,15 @@ from ui import build_main_ui
 # - add an app icon
 
 if __name__ == "__main__":
-    build_main_ui()
\ No newline at end of file
+    # logging is off unless asked for, e.g. WINSTATZ_LOG=debug (goes to stderr)
+    if os.environ.get("WINSTATZ_LOG"):
+        logging.basicConfig(level=os.environ["WINSTATZ_LOG"].upper(),
+                            format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    if len(sys.argv) > 1:
+        # headless mode (e.g. "stream"), never loads the GUI stack
+        from headless import main
+        sys.exit(main(sys.argv[1:]))
+
+    from ui import build_main_ui
+    build_main_ui()
@@ -0,0 +1,174 @@
+'''
+OpenMetrics (Prometheus) endpoint for the latest usage sample.\n
+Whoever samples (the UI's fetch thread, or the headless "metrics" command)
+calls publish() with the snapshot it already has; the text is encoded right
+there and kept as one bytes object. A scrape only sends that buffer, it never
+collects anything, so scraping every second costs a socket write.
+
+### Usage
+    exporter = MetricsExporter()\n
+    exporter.serve("127.0.0.1", 9779)\n
+    exporter.publish(snapshot, nics)  # after each sample\n
+    curl http://127.0.0.1:9779/metrics
+'''
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from snapshot import UNLIMITED_MINS
+
+DEFAULT_PORT = 9779
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+MB = 1024 ** 2
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+def _labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+def _family(lines, name, kind, help_text, samples, unit=None):
+    '''Append one metric family; samples is a list of (labels dict, value).'''
+    if not samples:
+        return
+    lines.append(f"# TYPE {name} {kind}")
+    if unit:
+        lines.append(f"# UNIT {name} {unit}")
+    lines.append(f"# HELP {name} {help_text}")
+    sample_name = name + "_info" if kind == "info" else name
+    for labels, value in samples:
+        lines.append(f"{sample_name}{_labels(labels)} {value!r}")
+
+def encode_snapshot(snap, nics=None):
+    '''
+    OpenMetrics text for one Snapshot (without the # EOF line).\n
+    nics is the "nics" pair of stats.get_device_usage(), (names, (n, 2) MB/s array), or None.
+    '''
+    lines = []
+    _family(lines, "winstatz_sample_timestamp_seconds", "gauge", "When the sample was collected.",
+            [({}, float(snap.time))], "seconds")
+    if snap.has("cpu"):
+        # cores count from 1, like core1.. in Snapshot.as_usage() and the heatmap
+        _family(lines, "winstatz_cpu_usage_percent", "gauge", "CPU usage per logical core.",
+                [({"core": str(i)}, float(value)) for i, value in enumerate(snap.cpu, 1)], "percent")
+    if snap.has("ram"):
+        _family(lines, "winstatz_memory_total_bytes", "gauge", "Installed RAM.", [({}, float(snap.ram_total * MB))], "bytes")
+        _family(lines, "winstatz_memory_used_bytes", "gauge", "RAM in use.", [({}, float(snap.ram_used * MB))], "bytes")
+        _family(lines, "winstatz_memory_available_bytes", "gauge", "RAM available.", [({}, float(snap.ram_free * MB))], "bytes")
+        _family(lines, "winstatz_memory_usage_percent", "gauge", "RAM usage.", [({}, float(snap.ram_percent))], "percent")
+    if snap.has("disk"):
+        _family(lines, "winstatz_disk_read_bytes_per_second", "gauge", "Disk read speed.",
+                [({"disk": name}, float(value * MB)) for name, value in zip(snap.disk_names, snap.disk_read)])
+        _family(lines, "winstatz_disk_write_bytes_per_second", "gauge", "Disk write speed.",
+                [({"disk": name}, float(value * MB)) for name, value in zip(snap.disk_names, snap.disk_write)])
+    if nics is not None:
+        names, speeds = nics
+        _family(lines, "winstatz_network_transmit_bytes_per_second", "gauge", "Network upload speed per adapter.",
+                [({"interface": name}, float(speeds[i, 0] * MB)) for i, name in enumerate(names)])
+        _family(lines, "winstatz_network_receive_bytes_per_second", "gauge", "Network download speed per adapter.",
+                [({"interface": name}, float(speeds[i, 1] * MB)) for i, name in enumerate(names)])
+    elif snap.has("net"):
+        _family(lines, "winstatz_network_transmit_bytes_per_second", "gauge", "Network upload speed, all adapters.",
+                [({"interface": "all"}, float(snap.net_up * MB))])
+        _family(lines, "winstatz_network_receive_bytes_per_second", "gauge", "Network download speed, all adapters.",
+                [({"interface": "all"}, float(snap.net_down * MB))])
+    if snap.has("battery"):
+        _family(lines, "winstatz_battery_charge_percent", "gauge", "Battery charge.",
+                [({}, float(snap.battery_percent))], "percent")
+        _family(lines, "winstatz_battery_plugged_in", "gauge", "1 if the charger is plugged in.",
+                [({}, int(bool(snap.battery_plugged)))])
+        if snap.battery_mins != UNLIMITED_MINS and snap.battery_mins >= 0:
+            _family(lines, "winstatz_battery_time_left_seconds", "gauge", "Estimated battery time left.",
+                    [({}, float(snap.battery_mins * 60))], "seconds")
+    return "\n".join(lines) + "\n" if lines else ""
+
+# get_specs() category -> metric name, help text and the fields that become labels
+_SPEC_INFO = {
+    "cpu": ("winstatz_cpu", "CPU model.", ("name", "manufacturer", "description", "coreCount", "clockSpeed")),
+    "gpu": ("winstatz_gpu", "Graphics adapter.", ("name", "driverVersion", "videoProcessor", "VRAM")),
+    "ram": ("winstatz_memory_module", "Installed memory module (capacity in MB).", ("capacity", "speed", "manufacturer", "partNumber")),
+    "storage": ("winstatz_storage", "Disk drive (size in GB).", ("model", "interfaceType", "mediaType", "size")),
+    "network": ("winstatz_network_adapter", "Network adapter (speed in Mbps).", ("name", "manufacturer", "adapterType", "speed")),
+    "battery": ("winstatz_battery", "Battery model.", ("name", "designCapacity", "fullChargeCapacity")),
+}
+
+def encode_specs(specs):
+    '''OpenMetrics info metrics for { category: get_spec(category) result }, categories without data are left out.'''
+    lines = []
+    for category, (name, help_text, fields) in _SPEC_INFO.items():
+        data = specs.get(category)
+        if not data:
+            continue
+        # gpu, ram and storage are lists, one info sample per device told apart by index
+        items = data if isinstance(data, list) else [data]
+        samples = []
+        for i, item in enumerate(items):
+            labels = {"index": str(i)} if isinstance(data, list) else {}
+            labels.update((field, item.get(field)) for field in fields if item.get(field) is not None)
+            samples.append((labels, 1))
+        _family(lines, name, "info", help_text, samples)
+    return "\n".join(lines) + "\n" if lines else ""
+
+class MetricsExporter:
+    '''
+    Holds the encoded exposition and serves it over HTTP.\n
+    publish() and set_spec() rebuild the buffer; scrapes read self.body, which is
+    swapped in as a whole, so a scrape always gets one consistent sample.
+    '''
+
+    def __init__(self):
+        self.body = b"# EOF\n"
+        self.scrapes = 0
+        self._sample_text = ""
+        self._specs = {}
+        self._spec_text = ""
+        self._lock = threading.Lock()
+        self._server = None
+
+    def _rebuild(self):
+        self.body = (self._sample_text + self._spec_text + "# EOF\n").encode()
+
+    def publish(self, snap, nics=None):
+        '''Encode a new sample, call it from the sampling thread after each collection.'''
+        text = encode_snapshot(snap, nics)
+        with self._lock:
+            self._sample_text = text
+            self._rebuild()
+
+    def set_spec(self, category, data):
+        '''Add one get_specs() category, has the signature of a stats.get_specs_async() callback.'''
+        with self._lock:
+            self._specs[category] = data
+            self._spec_text = encode_specs(self._specs)
+            self._rebuild()
+
+    def serve(self, host="127.0.0.1", port=DEFAULT_PORT):
+        '''Start the HTTP server on a daemon thread, returns the bound (host, port).'''
+        exporter = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?", 1)[0] != "/metrics":
+                    self.send_error(404, "metrics are at /metrics")
+                    return
+                body = exporter.body
+                exporter.scrapes += 1
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True, name="openmetrics").start()
+        return self._server.server_address[:2]
+
+    def close(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
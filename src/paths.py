@@ -0,0 +1,15 @@
+import os
+import sys
+
+def get_app_dir():
+    '''
+    Folder WinStatz keeps its settings and data in, created if needed.\n
+    %LOCALAPPDATA%\\WinStatz on Windows, $XDG_DATA_HOME/WinStatz (or ~/.local/share/WinStatz) elsewhere.
+    '''
+    if sys.platform.startswith("win"):
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+    else:
+        base = os.environ.get("XDG_DATA_HOME") or os.path.join(os.path.expanduser("~"), ".local", "share")
+    path = os.path.join(base, "WinStatz")
+    os.makedirs(path, exist_ok=True)
+    return path
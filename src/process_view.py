@@ -0,0 +1,61 @@
+from customtkinter import CTkToplevel, CTkLabel, CTkOptionMenu, CTkTextbox
+
+# sort option label -> ProcessTable sort key
+SORTS = {
+    "CPU": "cpu",
+    "RAM": "rss",
+    "Disk I/O": "io",
+}
+
+ROWS = 20
+
+class ProcessWindow:
+    '''
+    Top processes by CPU, RAM or disk I/O.\n
+    The rows come from stats.get_top_processes on the dashboard's fetch thread;
+    this window only formats them, so opening it never blocks the UI.
+    '''
+
+    def __init__(self, root, sort="CPU"):
+        self.window = CTkToplevel(root)
+        self.window.title("Top Processes")
+        self.window.geometry("620x560")
+        self.window.resizable(False, False)
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+        self.sort_key = SORTS[sort]
+        self.rows = ROWS
+
+        sortLabel = CTkLabel(self.window, text="Sort by:")
+        sortLabel.place(relx=0.35, rely=0.05, anchor="center")
+        sortOption = CTkOptionMenu(self.window, values=list(SORTS), command=self.set_sort)
+        sortOption.set(sort)
+        sortOption.place(relx=0.55, rely=0.05, anchor="center")
+
+        self.table = CTkTextbox(self.window, width=580, height=480, font=("Courier", 13))
+        self.table.place(relx=0.5, rely=0.54, anchor="center")
+        self.show([])
+
+    def is_open(self):
+        return self.window is not None
+
+    def set_sort(self, sort):
+        self.sort_key = SORTS[sort]
+
+    def show(self, processes):
+        if self.window is None:
+            return
+        lines = [f"{'PID':>7}  {'Name':<28}{'CPU %':>8}{'RAM MB':>10}{'I/O MBps':>10}"]
+        for process in processes:
+            lines.append(f"{process['pid']:>7}  {process['name'][:27]:<28}{process['cpu']:>8.1f}"
+                         f"{process['rssMB']:>10.1f}{process['ioMBps']:>10.2f}")
+        if not processes:
+            lines.append("Loading...")
+        self.table.configure(state="normal")
+        self.table.delete("1.0", "end")
+        self.table.insert("1.0", "\n".join(lines))
+        self.table.configure(state="disabled")
+
+    def close(self):
+        if self.window is not None:
+            self.window.destroy()
+            self.window = None
@@ -0,0 +1,438 @@
+'''
+Agent and aggregator for watching several machines from one dashboard.\n
+An agent samples its own machine (stats.get_snapshot) on a fixed interval and
+streams it to every subscriber over TCP or a Unix socket. The dashboard side
+keeps one connection per agent, all on a single asyncio event loop, and
+reconnects on its own when an agent goes away.
+
+### Wire format
+Every frame is a 5 byte header (type: u8, payload length: u32 little endian) and a payload:
+- SCHEMA: JSON {"version", "host", "cores", "disks"}, sent on connect and whenever the hardware changes\n
+- KEY: the full state, sent on connect and after every SCHEMA\n
+- DELTA: the change since the previous frame\n
+
+KEY and DELTA payloads are a u8 mask of the metrics present (cpu, ram, disk,
+net, battery bits), a u8 mask of the metrics that are gone (their collector
+failed, the dashboard clears them) and then zigzag varints: the time in ms
+followed by the quantized values of each present metric (cpu 0.1 %, RAM 0.1
+MB, speeds 0.01 MB/s, battery time left in minutes with -1 for unknown and -2
+for unlimited). KEY values are absolute, DELTA values are differences to the
+last frame, so a quiet machine costs a few bytes per sample.
+
+### Usage
+    python src/main.py agent --listen 127.0.0.1:7781 --backend fake
+    python src/main.py dashboard 127.0.0.1:7781 127.0.0.1:7782 --text
+'''
+import asyncio
+import json
+import socket
+import struct
+import sys
+import threading
+import time
+from array import array
+from snapshot import Snapshot, UNLIMITED_MINS
+
+PROTOCOL_VERSION = 2
+DEFAULT_PORT = 7781
+FRAME = struct.Struct("<BI")
+SCHEMA, KEY, DELTA = 1, 2, 3
+MAX_FRAME = 1024 * 1024
+MAX_BUFFERED = 256 * 1024  # subscribers that fall this far behind are dropped
+METRICS = ("cpu", "ram", "disk", "net", "battery")
+# battery minutes on the wire; a Snapshot uses -1 and UNLIMITED_MINS
+MINS_UNKNOWN, MINS_UNLIMITED = -1, -2
+
+def parse_address(text):
+    '''"host:port", "host" (default port) or "unix:/path" -> ("tcp", (host, port)) or ("unix", path).'''
+    if text.startswith("unix:"):
+        return ("unix", text[len("unix:"):])
+    host, sep, port = text.rpartition(":")
+    if not sep:
+        return ("tcp", (text or "127.0.0.1", DEFAULT_PORT))
+    return ("tcp", (host.strip("[]") or "127.0.0.1", int(port)))
+
+def format_address(address):
+    kind, where = address
+    return f"unix:{where}" if kind == "unix" else f"{where[0]}:{where[1]}"
+
+def _write_varint(out, value):
+    value = (value << 1) ^ (value >> 63)  # zigzag, so small negative numbers stay small
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+def _read_varints(data, offset, count):
+    values = []
+    shift = result = 0
+    while len(values) < count:
+        byte = data[offset]
+        offset += 1
+        result |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+            continue
+        values.append((result >> 1) ^ -(result & 1))
+        shift = result = 0
+    return values, offset
+
+def _quantize(snap):
+    '''{metric: list of ints} for the metrics the snapshot has.'''
+    values = {}
+    if snap.has("cpu"):
+        values["cpu"] = [round(v * 10) for v in snap.cpu]
+    if snap.has("ram"):
+        values["ram"] = [round(snap.ram_total * 10), round(snap.ram_used * 10),
+                         round(snap.ram_free * 10), round(snap.ram_percent * 10)]
+    if snap.has("disk"):
+        values["disk"] = [round(v * 100) for v in snap.disk_read] + [round(v * 100) for v in snap.disk_write]
+    if snap.has("net"):
+        values["net"] = [round(snap.net_up * 100), round(snap.net_down * 100)]
+    if snap.has("battery"):
+        values["battery"] = [round(snap.battery_percent), int(bool(snap.battery_plugged)),
+                             MINS_UNLIMITED if snap.battery_mins == UNLIMITED_MINS
+                             else max(int(snap.battery_mins), MINS_UNKNOWN)]
+    return values
+
+def _mask(metrics):
+    return sum(1 << bit for bit, metric in enumerate(METRICS) if metric in metrics)
+
+def _frame(kind, payload):
+    return FRAME.pack(kind, len(payload)) + payload
+
+class FrameEncoder:
+    '''Turns successive snapshots into SCHEMA/KEY/DELTA frames, keeping the last state as the delta base.'''
+
+    def __init__(self, host=None):
+        self.host = host or socket.gethostname()
+        self.schema = None
+        self.time = 0
+        self.state = {}  # metric -> quantized values of the last frame
+
+    def _payload(self, t, values, base, cleared=()):
+        out = bytearray([_mask(values), _mask(cleared)])
+        _write_varint(out, t - base.get("time", 0))
+        for metric in METRICS:
+            if metric in values:
+                previous = base.get(metric)
+                for i, value in enumerate(values[metric]):
+                    _write_varint(out, value - previous[i] if previous else value)
+        return bytes(out)
+
+    def keyframes(self):
+        '''SCHEMA + KEY frames that bring a new subscriber up to the current state.'''
+        if self.schema is None:
+            return b""
+        return _frame(SCHEMA, json.dumps(self.schema).encode()) + \
+            _frame(KEY, self._payload(self.time, self.state, {}))
+
+    def encode(self, snap):
+        '''Frames for one snapshot: a DELTA, or SCHEMA + KEY if the cores or disks changed.'''
+        schema = {
+            "version": PROTOCOL_VERSION,
+            "host": self.host,
+            "cores": len(snap.cpu) if snap.cpu else self.schema and self.schema["cores"] or 0,
+            "disks": list(snap.disk_names) if snap.disk_names is not None else self.schema and self.schema["disks"] or [],
+        }
+        values = _quantize(snap)
+        t = round(snap.time * 1000)
+        if schema != self.schema:
+            self.schema = schema
+            self.state, self.time = values, t
+            return self.keyframes()
+        # a metric that was sent before but is missing now failed to collect, say so
+        # instead of letting the dashboard show its last value forever
+        cleared = [metric for metric in self.state if metric not in values]
+        payload = self._payload(t, values, dict(self.state, time=self.time), cleared)
+        self.state = values
+        self.time = t
+        return _frame(DELTA, payload)
+
+class FrameDecoder:
+    '''Rebuilds snapshots from the frames of one connection.'''
+
+    def __init__(self):
+        self.schema = None
+        self.snapshot = Snapshot()
+        self.time = 0
+        self.state = {}
+
+    @property
+    def host(self):
+        return self.schema["host"] if self.schema else None
+
+    def _sizes(self):
+        disks = len(self.schema["disks"])
+        return {"cpu": self.schema["cores"], "ram": 4, "disk": 2 * disks, "net": 2, "battery": 3}
+
+    def feed(self, kind, payload):
+        '''
+        Apply one frame. Returns the updated Snapshot for KEY and DELTA frames, None for SCHEMA.\n
+        Raises ValueError for a frame that can't be decoded.
+        '''
+        try:
+            return self._feed(kind, payload)
+        except (IndexError, KeyError, TypeError, AttributeError, struct.error) as e:
+            # truncated varints, a schema without its fields...
+            raise ValueError(f"malformed frame: {e!r}") from e
+
+    def _feed(self, kind, payload):
+        if kind == SCHEMA:
+            schema = json.loads(payload)
+            if schema.get("version") != PROTOCOL_VERSION:
+                raise ValueError(f"agent speaks protocol {schema.get('version')}, expected {PROTOCOL_VERSION}")
+            self.schema = schema
+            self.snapshot = Snapshot()
+            return None
+        if self.schema is None or kind not in (KEY, DELTA):
+            raise ValueError(f"unexpected frame type {kind}")
+        if kind == KEY:
+            self.state, self.time = {}, 0
+
+        mask, cleared = payload[0], payload[1]
+        (dt,), offset = _read_varints(payload, 2, 1)
+        self.time += dt
+        sizes = self._sizes()
+        for bit, metric in enumerate(METRICS):
+            if cleared & (1 << bit):
+                self.state.pop(metric, None)
+            if not mask & (1 << bit):
+                continue
+            values, offset = _read_varints(payload, offset, sizes[metric])
+            previous = self.state.get(metric)
+            if previous:
+                values = [a + b for a, b in zip(previous, values)]
+            self.state[metric] = values
+        self._fill()
+        return self.snapshot
+
+    def _fill(self):
+        snap, state = self.snapshot, self.state
+        snap.time = self.time / 1000
+        for metric in METRICS:
+            if metric not in state:
+                snap.clear(metric)
+        if "cpu" in state:
+            snap.cpu = array("f", [v / 10 for v in state["cpu"]])
+        if "ram" in state:
+            total, used, free, percent = state["ram"]
+            snap.ram_total, snap.ram_used, snap.ram_free, snap.ram_percent = total / 10, used / 10, free / 10, percent / 10
+        if "disk" in state:
+            disks = len(self.schema["disks"])
+            snap.disk_names = tuple(self.schema["disks"])
+            snap.disk_read = array("f", [v / 100 for v in state["disk"][:disks]])
+            snap.disk_write = array("f", [v / 100 for v in state["disk"][disks:]])
+        if "net" in state:
+            snap.net_up, snap.net_down = state["net"][0] / 100, state["net"][1] / 100
+        if "battery" in state:
+            percent, plugged, mins = state["battery"]
+            snap.battery_percent, snap.battery_plugged = percent, bool(plugged)
+            snap.battery_mins = UNLIMITED_MINS if mins == MINS_UNLIMITED else mins
+
+class AgentServer:
+    '''
+    Serves this machine's snapshots to any number of subscribers.\n
+    The snapshot is sampled and encoded once per interval and the same bytes
+    are written to every connection. A new subscriber gets SCHEMA + KEY first.
+    '''
+
+    def __init__(self, address, interval=1.0, sample=None, host=None):
+        self.address = address
+        self.interval = interval
+        if sample is None:
+            import stats
+            sample = stats.get_snapshot
+        self.sample = sample
+        self.encoder = FrameEncoder(host)
+        self.clients = set()
+        self.frames_sent = 0
+        self.bytes_sent = 0
+        self._server = None
+        self._snapshot = Snapshot()
+
+    async def start(self):
+        '''Start listening, returns the bound address (useful with port 0).'''
+        kind, where = self.address
+        if kind == "unix":
+            self._server = await asyncio.start_unix_server(self._on_client, path=where)
+            return self.address
+        self._server = await asyncio.start_server(self._on_client, where[0], where[1])
+        host, port = self._server.sockets[0].getsockname()[:2]
+        return ("tcp", (host, port))
+
+    async def _on_client(self, reader, writer):
+        sock = writer.get_extra_info("socket")
+        if sock is not None and sock.family in (socket.AF_INET, socket.AF_INET6):
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        writer.write(self.encoder.keyframes())
+        self.clients.add(writer)
+        try:
+            # subscribers don't send anything, this just waits for them to hang up
+            while await reader.read(1024):
+                pass
+        except (ConnectionError, OSError, asyncio.CancelledError):
+            pass
+        finally:
+            self.clients.discard(writer)
+            writer.close()
+
+    def _broadcast(self, data):
+        for writer in list(self.clients):
+            if writer.is_closing() or writer.transport.get_write_buffer_size() > MAX_BUFFERED:
+                # gone or not reading, don't let it hold frames in memory forever
+                self.clients.discard(writer)
+                writer.close()
+                continue
+            writer.write(data)
+            self.frames_sent += 1
+            self.bytes_sent += len(data)
+
+    async def run(self, count=None):
+        '''Sample and broadcast every interval, forever or count times.'''
+        if self._server is None:
+            await self.start()
+        next_sample = time.monotonic()
+        sent = 0
+        while count is None or sent < count:
+            self.sample(out=self._snapshot)
+            self._broadcast(self.encoder.encode(self._snapshot))
+            sent += 1
+            next_sample += self.interval
+            await asyncio.sleep(max(next_sample - time.monotonic(), 0))
+
+    async def close(self):
+        for writer in list(self.clients):
+            writer.close()
+        self.clients.clear()
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+class AgentConnection:
+    '''One persistent subscription to an agent, reconnecting with backoff when it drops.'''
+
+    def __init__(self, address, on_update=None, retry=1.0, max_retry=30.0):
+        self.address = address
+        self.name = format_address(address)
+        self.on_update = on_update
+        self.retry, self.max_retry = retry, max_retry
+        self.decoder = FrameDecoder()
+        self.connected = False
+        self.error = None
+        self.updated = 0.0  # time.monotonic() of the last snapshot
+
+    @property
+    def snapshot(self):
+        return self.decoder.snapshot if self.decoder.schema else None
+
+    @property
+    def host(self):
+        return self.decoder.host or self.name
+
+    async def _open(self):
+        kind, where = self.address
+        if kind == "unix":
+            return await asyncio.open_unix_connection(where)
+        return await asyncio.open_connection(where[0], where[1])
+
+    async def run(self):
+        delay = self.retry
+        while True:
+            try:
+                reader, writer = await self._open()
+            except OSError as e:
+                self.error = str(e)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.max_retry)
+                continue
+            self.connected, self.error, delay = True, None, self.retry
+            self.decoder = FrameDecoder()
+            try:
+                while True:
+                    kind, length = FRAME.unpack(await reader.readexactly(FRAME.size))
+                    if length > MAX_FRAME:
+                        raise ValueError(f"frame of {length} bytes is too large")
+                    snap = self.decoder.feed(kind, await reader.readexactly(length))
+                    if snap is not None:
+                        self.updated = time.monotonic()
+                        if self.on_update is not None:
+                            self.on_update(self)
+            except asyncio.IncompleteReadError:
+                self.error = "agent closed the connection"
+            except (ConnectionError, OSError, ValueError) as e:
+                self.error = str(e) or "disconnected"
+            finally:
+                self.connected = False
+                writer.close()
+            await asyncio.sleep(delay)
+
+class Aggregator:
+    '''
+    Subscribes to several agents on one asyncio event loop.\n
+    run() is a coroutine; start() runs the loop on a daemon thread for GUIs,
+    which then read `connections` (each has .host, .connected, .snapshot).
+    '''
+
+    def __init__(self, addresses, on_update=None):
+        self.connections = [AgentConnection(address, on_update) for address in addresses]
+        self._loop = None
+        self._task = None
+
+    async def run(self):
+        self._loop = asyncio.get_running_loop()
+        self._task = asyncio.current_task()
+        await asyncio.gather(*(self._run_connection(connection) for connection in self.connections))
+
+    async def _run_connection(self, connection):
+        # a connection that dies of something unexpected must not take the others with it
+        try:
+            await connection.run()
+        except Exception as e:
+            connection.connected = False
+            connection.error = f"stopped: {e!r}"
+
+    def start(self):
+        thread = threading.Thread(target=self._run_forever, daemon=True, name="aggregator")
+        thread.start()
+        return thread
+
+    def _run_forever(self):
+        try:
+            asyncio.run(self.run())
+        except asyncio.CancelledError:
+            pass
+
+    def stop(self):
+        if self._loop is not None and self._task is not None:
+            self._loop.call_soon_threadsafe(self._task.cancel)
+
+def summary_row(connection):
+    '''One line of text for a connection, for the text dashboard.'''
+    snap = connection.snapshot
+    if not connection.connected or snap is None:
+        return f"{connection.host[:20]:<20} {'offline' if connection.error else 'connecting'}: {connection.error or ''}"
+    ram = f"{snap.ram_used / 1024:.1f}/{snap.ram_total / 1024:.1f} GB" if snap.has("ram") else "-"
+    disk = f"{sum(snap.disk_read):.1f}/{sum(snap.disk_write):.1f}" if snap.has("disk") else "-"
+    net = f"{snap.net_up:.2f}/{snap.net_down:.2f}" if snap.has("net") else "-"
+    battery = f"{snap.battery_percent:.0f}%" if snap.has("battery") else "-"
+    return f"{connection.host[:20]:<20} {snap.cpu_average:>6.1f} {ram:>15} {disk:>13} {net:>13} {battery:>7}"
+
+SUMMARY_HEADER = f"{'host':<20} {'cpu %':>6} {'ram':>15} {'disk r/w MBps':>13} {'net up/down':>13} {'battery':>7}"
+
+async def text_dashboard(addresses, interval=1.0, count=None, out=sys.stdout):
+    '''Print one table of every agent per interval.'''
+    aggregator = Aggregator(addresses)
+    task = asyncio.ensure_future(aggregator.run())
+    printed = 0
+    try:
+        while count is None or printed < count:
+            await asyncio.sleep(interval)
+            out.write(SUMMARY_HEADER + "\n")
+            for connection in aggregator.connections:
+                out.write(summary_row(connection) + "\n")
+            out.write("\n")
+            out.flush()
+            printed += 1
+    finally:
+        task.cancel()
@@ -0,0 +1,75 @@
+from customtkinter import CTk, CTkFrame, CTkLabel, CTkProgressBar
+from remote import Aggregator, format_address
+
+# how often the window reads the latest snapshots, in ms
+REFRESH_MS = 500
+
+class DashboardWindow:
+    '''
+    Several agents side by side, one column each.\n
+    The agent connections run on the Aggregator's asyncio loop in a background
+    thread; the window only reads the latest snapshot of each connection every
+    REFRESH_MS, so a slow or dead agent never blocks the UI.
+    '''
+
+    def __init__(self, addresses):
+        self.aggregator = Aggregator(addresses)
+        self.root = CTk()
+        self.root.title("WinStatz Dashboard")
+        width = 260 * max(len(addresses), 1) + 40
+        self.root.geometry(f"{width}x360")
+        self.root.protocol("WM_DELETE_WINDOW", self.close)
+
+        self.columns = []
+        for i, address in enumerate(addresses):
+            frame = CTkFrame(self.root, width=240, height=320)
+            frame.grid(row=0, column=i, padx=10, pady=20)
+            frame.grid_propagate(False)
+            column = {
+                "host": CTkLabel(frame, text=format_address(address), font=("Poppins", 18, "bold")),
+                "state": CTkLabel(frame, text="connecting..."),
+                "cpuLabel": CTkLabel(frame, text="CPU --%"),
+                "cpuBar": CTkProgressBar(frame, width=200),
+                "ramLabel": CTkLabel(frame, text="RAM -- MB"),
+                "ramBar": CTkProgressBar(frame, width=200),
+                "disk": CTkLabel(frame, text="Disk -- MBps"),
+                "net": CTkLabel(frame, text="Network -- Mbps"),
+                "battery": CTkLabel(frame, text="Battery --"),
+            }
+            for row, widget in enumerate(column.values()):
+                widget.grid(row=row, column=0, padx=20, pady=4, sticky="w")
+            column["cpuBar"].set(0)
+            column["ramBar"].set(0)
+            self.columns.append(column)
+
+    def _refresh(self):
+        for connection, column in zip(self.aggregator.connections, self.columns):
+            snap = connection.snapshot
+            column["host"].configure(text=connection.host[:20])
+            if not connection.connected or snap is None:
+                column["state"].configure(text=f"offline: {connection.error}" if connection.error else "connecting...")
+                continue
+            column["state"].configure(text="online")
+            if snap.has("cpu"):
+                column["cpuLabel"].configure(text=f"CPU {snap.cpu_average:.1f}% ({len(snap.cpu)} cores)")
+                column["cpuBar"].set(snap.cpu_average / 100)
+            if snap.has("ram"):
+                column["ramLabel"].configure(text=f"RAM {snap.ram_used:.0f} / {snap.ram_total:.0f} MB")
+                column["ramBar"].set(snap.ram_percent / 100)
+            if snap.has("disk"):
+                column["disk"].configure(text=f"Disk R {sum(snap.disk_read):.1f} / W {sum(snap.disk_write):.1f} MBps")
+            if snap.has("net"):
+                column["net"].configure(text=f"Network ↑ {snap.net_up:.2f} / ↓ {snap.net_down:.2f} Mbps")
+            if snap.has("battery"):
+                plugged = " (plugged in)" if snap.battery_plugged else ""
+                column["battery"].configure(text=f"Battery {snap.battery_percent:.0f}%{plugged}")
+        self.root.after(REFRESH_MS, self._refresh)
+
+    def run(self):
+        self.aggregator.start()
+        self._refresh()
+        self.root.mainloop()
+
+    def close(self):
+        self.aggregator.stop()
+        self.root.destroy()
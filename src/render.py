@@ -0,0 +1,154 @@
+import math
+from collections import deque
+
+def nice_limit(value, minimum=100):
+    '''
+    Round an axis upper limit up to the next 1-2-5 step (100, 200, 500, 1000, ...).\n
+    Keeps the y-limit still while a value moves around inside a step, so the
+    axes don't have to be re-rendered every tick.
+    '''
+    if value <= minimum:
+        return minimum
+    magnitude = 10 ** math.floor(math.log10(value))
+    for step in (1, 2, 5, 10):
+        if value <= step * magnitude:
+            return step * magnitude
+    return 10 * magnitude
+
+class BlitRenderer:
+    '''
+    Redraws only the artists that change every tick.\n
+    The figure is rendered once with the given artists left out, that
+    background is cached, and each update() restores it and draws just the
+    animated artists on top. Anything that changes the static parts (limits,
+    titles, colors) has to call invalidate(), or go through set_ylim() and
+    set_title() which only invalidate when the value really changed.
+    '''
+
+    def __init__(self, canvas, artists=()):
+        self.canvas = canvas
+        self.figure = canvas.figure
+        self.artists = []
+        self._background = None
+        self._dirty = True
+        for artist in artists:
+            self.add_artist(artist)
+        # any full draw (resize, theme change, ...) refreshes the cached background
+        canvas.mpl_connect("draw_event", self._on_draw)
+
+    def add_artist(self, artist):
+        artist.set_animated(True)
+        self.artists.append(artist)
+
+    def set_artists(self, artists):
+        '''Replace the animated artists, e.g. after the figure was rebuilt.'''
+        self.artists = []
+        for artist in artists:
+            self.add_artist(artist)
+        self._dirty = True
+
+    def invalidate(self):
+        self._dirty = True
+
+    def set_ylim(self, ax, bottom, top):
+        if ax.get_ylim() != (bottom, top):
+            ax.set_ylim(bottom, top)
+            self._dirty = True
+
+    def set_title(self, ax, title):
+        if ax.get_title() != title:
+            ax.set_title(title)
+            self._dirty = True
+
+    def _on_draw(self, event):
+        self._background = self.canvas.copy_from_bbox(self.figure.bbox)
+        self._draw_artists()
+
+    def _draw_artists(self):
+        for artist in self.artists:
+            self.figure.draw_artist(artist)
+
+    def update(self):
+        if self._dirty or self._background is None:
+            self._dirty = False
+            # full render, _on_draw caches the new background and adds the artists
+            self.canvas.draw()
+            return
+        self.canvas.restore_region(self._background)
+        self._draw_artists()
+        self.canvas.blit(self.figure.bbox)
+
+def _largest_triangle(points, prev, nxt):
+    '''The point in points that makes the largest triangle with prev and nxt.'''
+    ax, ay = prev
+    cx, cy = nxt
+    best, best_area = points[0], -1.0
+    for point in points:
+        x, y = point
+        area = abs((ax - cx) * (y - ay) - (ax - x) * (cy - ay))
+        if area > best_area:
+            best, best_area = point, area
+    return best
+
+def _average(points):
+    n = len(points)
+    return (sum(p[0] for p in points) / n, sum(p[1] for p in points) / n)
+
+class StreamingLTTB:
+    '''
+    Largest-Triangle-Three-Buckets (LTTB) downsampling for a scrolling window, computed incrementally.\n
+    Buckets are fixed slices of time (bucket_width seconds, aligned to the
+    clock), so once a bucket and the one after it are complete its pick never
+    changes. Those picks are kept, and each update() only looks at points
+    newer than the last finished bucket. The per-frame cost depends on how
+    many samples arrived since the last frame, not on the window length.
+
+    ### Usage
+    - t, v = store.query(metric, decimator.resume_time(start), now)\n
+    - points = decimator.update(t, v, start, now)\n
+    '''
+
+    def __init__(self, bucket_width):
+        self.bucket_width = bucket_width
+        self.done = deque()
+        self.done_until = None  # first bucket id that is not finished yet
+
+    def resume_time(self, start):
+        '''Oldest timestamp the next update() needs.'''
+        if self.done_until is None:
+            return start
+        return max(start, self.done_until * self.bucket_width)
+
+    def update(self, times, values, start, now):
+        '''Feed points from resume_time() onwards and return the decimated (x, y) list for [start, now].'''
+        width = self.bucket_width
+        groups = {}
+        for t, v in zip(times, values):
+            if v == v:  # skip NaN
+                groups.setdefault(int(t // width), []).append((t, v))
+        keys = sorted(groups)
+        current = int(now // width)
+
+        prev = self.done[-1] if self.done else None
+        pending = []
+        for i, bucket in enumerate(keys):
+            points = groups[bucket]
+            last = i == len(keys) - 1
+            if prev is None:
+                # the very first point of the line is always kept
+                pick = points[0]
+            elif last:
+                pick = points[-1]
+            else:
+                pick = _largest_triangle(points, prev, _average(groups[keys[i + 1]]))
+            if not last and keys[i + 1] < current:
+                # this bucket and the next one are complete, the pick is final
+                self.done.append(pick)
+                self.done_until = bucket + 1
+            else:
+                pending.append(pick)
+            prev = pick
+
+        while self.done and self.done[0][0] < start:
+            self.done.popleft()
+        return list(self.done) + pending
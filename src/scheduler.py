@@ -0,0 +1,89 @@
+import time
+
+# metric: (starting interval, fastest, slowest) in seconds, None = the scheduler floor
+DEFAULT_INTERVALS = {
+    "cpu": (1.0, None, 5.0),
+    "ram": (2.0, None, 10.0),
+    "disk": (1.0, None, 5.0),
+    "net": (1.0, None, 5.0),
+    "battery": (10.0, 10.0, 60.0),
+}
+
+# Changes smaller than this (in the metric's own unit) count as noise, so an idle
+# disk going from 0.01 to 0.02 MBps isn't a 100% jump.
+NOISE = {
+    "cpu": 5.0,  # percent
+    "ram": 256.0,  # MB
+    "disk": 1.0,  # MBps
+    "net": 1.0,  # Mbps
+    "battery": 2.0,  # percent
+}
+
+class _Schedule:
+    __slots__ = ("interval", "fastest", "slowest", "due", "value")
+
+    def __init__(self, interval, fastest, slowest):
+        self.interval = interval
+        self.fastest = fastest
+        self.slowest = slowest
+        self.due = 0.0  # due right away
+        self.value = None
+
+class AdaptiveScheduler:
+    '''
+    Gives every metric its own sampling interval and adapts it to how fast the metric moves.\n
+    After each reading, observe() compares the new value with the last one. A jump
+    bigger than `fast_change` (relative, after the metric's noise floor) halves the
+    interval, down to `floor`; a reading that barely moved (under `slow_change`)
+    stretches it by `backoff`, up to the metric's slowest interval. So a busy
+    machine is sampled up to 10 times a second and an idle one only every few seconds,
+    and battery is read only when its own interval is up.
+
+    ### Usage
+    - scheduler = AdaptiveScheduler(floor=0.1)\n
+    - due = scheduler.due()  # e.g. ["cpu", "net"]\n
+    - scheduler.observe("cpu", snapshot.value("cpu")) for each collected metric\n
+    - sleep scheduler.sleep_time() and repeat\n
+    '''
+
+    def __init__(self, intervals=None, floor=0.1, fast_change=0.10, slow_change=0.02, backoff=1.5):
+        self.floor = floor
+        self.fast_change = fast_change
+        self.slow_change = slow_change
+        self.backoff = backoff
+        self._schedules = {}
+        for metric, (interval, fastest, slowest) in (intervals or DEFAULT_INTERVALS).items():
+            fastest = floor if fastest is None else max(fastest, floor)
+            self._schedules[metric] = _Schedule(min(max(interval, fastest), slowest), fastest, slowest)
+
+    @property
+    def metrics(self):
+        return tuple(self._schedules)
+
+    def interval(self, metric):
+        return self._schedules[metric].interval
+
+    def due(self, now=None):
+        '''The metrics whose interval is up, in the order they were configured.'''
+        now = time.monotonic() if now is None else now
+        return [metric for metric, schedule in self._schedules.items() if schedule.due <= now]
+
+    def observe(self, metric, value, now=None):
+        '''Record a reading (None if it failed) and schedule the next one.'''
+        now = time.monotonic() if now is None else now
+        schedule = self._schedules[metric]
+        if value is not None and schedule.value is not None:
+            scale = max(abs(schedule.value), abs(value), NOISE.get(metric, 0.0))
+            change = abs(value - schedule.value) / scale if scale else 0.0
+            if change >= self.fast_change:
+                schedule.interval = max(schedule.interval / 2, schedule.fastest)
+            elif change < self.slow_change:
+                schedule.interval = min(schedule.interval * self.backoff, schedule.slowest)
+        if value is not None:
+            schedule.value = value
+        schedule.due = now + schedule.interval
+
+    def sleep_time(self, now=None):
+        '''Seconds until the next metric is due (0 if one already is).'''
+        now = time.monotonic() if now is None else now
+        return max(min(schedule.due for schedule in self._schedules.values()) - now, 0.0)
@@ -0,0 +1,132 @@
+from array import array
+
+# battery "time left" in as_usage() form when it is plugged in
+UNLIMITED_MINS = 2147483640
+
+# the fields each metric fills in
+_FIELDS = {
+    "cpu": ("cpu",),
+    "ram": ("ram_total", "ram_used", "ram_free", "ram_percent"),
+    "disk": ("disk_names", "disk_read", "disk_write"),
+    "net": ("net_up", "net_down"),
+    "battery": ("battery_percent", "battery_plugged", "battery_mins"),
+}
+
+class Snapshot:
+    '''
+    One usage sample in flat, typed fields.\n
+    Per-core usage is an array('f') and the disks are parallel arrays (names,
+    read MBps, write MBps), so a sample costs the same few objects on a 4 core
+    laptop as on a 128 core server, and get_snapshot(out=snapshot) refills the
+    same arrays in place. Values are not rounded. A metric that wasn't collected
+    (or failed) has its fields set to None.
+
+    ### Fields
+    - time: when it was collected (time.time())\n
+    - cpu: array('f') of percent per core\n
+    - ram_total, ram_used, ram_free (MB), ram_percent\n
+    - disk_names (tuple of str), disk_read, disk_write (array('f') of MBps, same order)\n
+    - net_up, net_down (Mbps)\n
+    - battery_percent, battery_plugged, battery_mins (UNLIMITED_MINS when plugged in)\n
+
+    as_usage() gives the same sample as a list of dicts, for code that wants that form.
+    '''
+
+    __slots__ = ("time", "cpu", "ram_total", "ram_used", "ram_free", "ram_percent",
+                 "disk_names", "disk_read", "disk_write", "net_up", "net_down",
+                 "battery_percent", "battery_plugged", "battery_mins")
+
+    def __init__(self):
+        self.time = 0.0
+        for fields in _FIELDS.values():
+            for field in fields:
+                setattr(self, field, None)
+
+    def clear(self, metric):
+        for field in _FIELDS[metric]:
+            setattr(self, field, None)
+
+    def update(self, other, metrics):
+        '''Take the given metrics (and the time) from another Snapshot, the other metrics keep their values.'''
+        self.time = other.time
+        for metric in metrics:
+            for field in _FIELDS[metric]:
+                setattr(self, field, getattr(other, field))
+
+    def has(self, metric):
+        return getattr(self, _FIELDS[metric][0]) is not None
+
+    @property
+    def cpu_average(self):
+        return sum(self.cpu) / len(self.cpu) if self.cpu else 0.0
+
+    def value(self, metric):
+        '''One number that sums up a metric (average cpu, RAM used, total disk/network speed, battery percent), or None.'''
+        if not self.has(metric):
+            return None
+        if metric == "cpu":
+            return self.cpu_average
+        if metric == "ram":
+            return self.ram_used
+        if metric == "disk":
+            return sum(self.disk_read) + sum(self.disk_write)
+        if metric == "net":
+            return self.net_up + self.net_down
+        if metric == "battery":
+            return self.battery_percent
+        raise KeyError(metric)
+
+    def part(self, metric):
+        '''One metric in as_usage() form (dict, or list of dicts for disk), None if it wasn't collected.'''
+        if not self.has(metric):
+            return None
+        if metric == "cpu":
+            return {f"core{i}": round(value, 1) for i, value in enumerate(self.cpu, 1)}
+        if metric == "ram":
+            return {
+                "total": round(self.ram_total, 1),
+                "used": round(self.ram_used, 1),
+                "free": round(self.ram_free, 1),
+                "percent": self.ram_percent,
+            }
+        if metric == "disk":
+            return [{"device": name, "readSpeed": round(read, 2), "writeSpeed": round(write, 2)}
+                    for name, read, write in zip(self.disk_names, self.disk_read, self.disk_write)]
+        if metric == "net":
+            return {"up": round(self.net_up, 2), "down": round(self.net_down, 2)}
+        if metric == "battery":
+            return {"percent": self.battery_percent, "pluggedIn": self.battery_plugged, "timeLeftMins": self.battery_mins}
+        raise KeyError(metric)
+
+    def as_usage(self):
+        '''
+        The sample as a list of dicts, rounded:\n
+        [cpu_usage (dict), ram_usage (dict), disk_usages (list of dicts), network_usage (dict), battery_usage (dict)]\n
+        Metrics that weren't collected are None.
+
+        ### Structure of returned data:
+        - cpu_usage (dict):\n
+            { "core1": usage percent, "core2": usage percent, ... }\n
+        - ram_usage (dict):\n
+            { "total": MB, "used": MB, "free": MB, "percent": percent_used }\n
+        - disk_usages (list of dicts):\n
+            [\n
+                {\n
+                    "device": device_name,\n
+                    "readSpeed": current_read_speed_MBps,\n
+                    "writeSpeed": current_write_speed_MBps,\n
+                },\n
+                ...\n
+            ]\n
+        - network_usage (dict):\n
+            { "up": upload_speed_mbps, "down": download_speed_mbps }\n
+        - battery_usage (dict):\n
+            { "percent": percent_left, "pluggedIn": is_plugged_in, "timeLeftMins": minutes_left (2147483640 = unlimited, -1 = unknown) }\n
+        '''
+        return [self.part(metric) for metric in _FIELDS]
+
+def resize(values, length):
+    '''Return values if it already has length items, else a new zeroed array('f') of that length.'''
+    if values is not None and len(values) == length:
+        return values
+    return array("f", bytes(4 * length))
@@ -0,0 +1,51 @@
+import hashlib
+import json
+import os
+from paths import get_app_dir
+
+# bump when the layout of the cached specs changes
+CACHE_VERSION = 1
+
+# boot times computed from uptime can wobble by a second or so
+BOOT_TIME_TOLERANCE = 2
+
+def cache_path():
+    return os.path.join(get_app_dir(), "specs.json")
+
+def hardware_key(backend):
+    '''
+    Cheap identity of the current machine state: boot time plus a fingerprint
+    of the logical cpu count, total RAM and disk names.\n
+    Hardware and drivers only change across a reboot or when a device is
+    added or removed, so specs cached under the same key are still valid.
+    '''
+    fingerprint = repr((backend.name, len(backend.cpu_times()), backend.memory()[0], sorted(backend.disk_counters())))
+    return {
+        "bootTime": backend.boot_time(),
+        "fingerprint": hashlib.sha1(fingerprint.encode()).hexdigest(),
+    }
+
+def same_key(a, b):
+    if not a or not b:
+        return False
+    return a.get("fingerprint") == b.get("fingerprint") and \
+        abs(a.get("bootTime", 0) - b.get("bootTime", 0)) <= BOOT_TIME_TOLERANCE
+
+def load(path=None):
+    '''Return (key, {category: data}) from the cache file, or (None, {}) if there is none.'''
+    try:
+        with open(path or cache_path()) as f:
+            cached = json.load(f)
+        if cached.get("version") != CACHE_VERSION:
+            return None, {}
+        return cached.get("key"), cached.get("specs", {})
+    except (OSError, ValueError, AttributeError):
+        return None, {}
+
+def save(key, specs, path=None):
+    '''Write the specs under key, replacing the file in one step so a crash can't leave half of it.'''
+    path = path or cache_path()
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump({"version": CACHE_VERSION, "key": key, "specs": specs}, f)
+    os.replace(tmp, path)
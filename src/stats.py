@@ -1,163 +1,275 @@
-import psutil
-import wmi
+import logging
+import threading
 import time
-
-# Hardware specs caching to reduce WMI query frequency
-_hardware_cache = {}
-_cache_timestamp = 0
-CACHE_DURATION = 300  # 5 minutes
-
-# Persistent psutil objects to avoid recreation
-_last_cpu_call = 0
+from concurrent.futures import ThreadPoolExecutor
+from backends import create_backend, TIME_UNLIMITED
+from wmi_pool import WMIPool
+from processes import ProcessTable
+from snapshot import Snapshot, UNLIMITED_MINS, resize
+from latency import LatencyRegistry
+import spec_cache
+
+# Off unless the application configures logging (e.g. WINSTATZ_LOG=debug).
+# At DEBUG every collected value is logged, failures are logged as warnings.
+logger = logging.getLogger("winstatz.stats")
+logger.addHandler(logging.NullHandler())
+
+# Hardware specs caching to reduce WMI query frequency.
+# Specs are also kept on disk (spec_cache.py) and stay valid until the boot time
+# or the hardware fingerprint changes. Battery charge and status change all the
+# time, so that category gets a short TTL of its own.
+_hardware_cache = {}  # category -> data
+_hardware_cache_time = {}  # category -> when it was queried (0 = loaded from disk)
+_spec_key = None  # current boot time + fingerprint, None until the disk cache is loaded
+_spec_key_checked = 0
+_specs_valid_since = 0  # static specs queried (or cached) before this are out of date
+_specs_dirty = False  # something was queried that the disk cache doesn't have yet
+_spec_failed = {}  # category -> when its query last failed, never saved to disk
+SPEC_RETRY_INTERVAL = 30  # seconds before a failed query is tried again
+_spec_lock = threading.Lock()
+DYNAMIC_SPEC_TTL = {"battery": 30}  # seconds
+SPEC_KEY_CHECK_INTERVAL = 60  # how often to look for hot-plugged hardware
+
+# Calls, errors and latency of every collector and WMI class, see get_collector_stats()
+_latency = LatencyRegistry()
+
+# Worker threads for the per-category spec queries, created on first use
+_spec_executor = None
+
+# Collector backend (psutil/WMI, /proc or fake), created on first use
+_backend = None
+
+# Process table behind get_top_processes, created on first use
+_process_table = None
+
+# Per-device counter state of get_device_usage (disks, nics), created on first use
+_device_rates = None
+
+# Per-thread WMI connections for get_specs, created on first use
+_wmi_pool = None
+WMI_QUERY_TIMEOUT = 15  # seconds
+
+# Previous raw counter snapshots for the delta sampler.
+# Rates are computed against whatever time has actually passed since the
+# last call (monotonic clock), so get_snapshot never has to sleep.
+_last_cpu_times = None
 _last_disk_counters = None
+_last_disk_time = 0.0
 _last_net_counters = None
+_last_net_time = 0.0
 
-def get_usage():
-    '''
-    Get real-time usage data for most system components. \n
-    GPU Usage is **not** supported due to lack of a Python binding for AMD and Intel GPUs.\n
-
-    This function returns a list:\n
-    [cpu_usage (dict), ram_usage (dict), disk_usages (list of dicts), network_usage (dict), battery_usage (dict)]
-
-    ### Structure of returned data:
-    - cpu_usage (dict):\n
-        { "core1": usage percent, "core2": usage percent, ... }\n
-    - ram_usage (dict):\n
-        { "total": MB, "used": MB, "free": MB, "percent": percent_used }\n
-    - disk_usages (list of dicts):\n
-        [\n
-            {\n
-                "device": device_name,\n
-                "readSpeed": current_read_speed_MBps,\n
-                "writeSpeed": current_write_speed_MBps,\n
-            },\n
-            ...\n
-        ]\n
-    - network_usage (dict):\n
-        { "up": upload_speed_mbps, "down": download_speed_mbps }\n
-    - battery_usage (dict):\n
-        { "percent": percent_left, "pluggedIn": is_plugged_in, "timeLeftMins": minutes_left (2147483640 = unlimited) }\n
-    ''' 
-    try:
-        # cpu usage - use interval=None for non-blocking call after initial call
-        global _last_cpu_call
-        if _last_cpu_call == 0:
-            # First call needs to be blocking to initialize
-            psutil.cpu_percent(percpu=True)
-            time.sleep(0.1)
-            _last_cpu_call = time.time()
-        
-        cpu_usage_list = psutil.cpu_percent(percpu=True, interval=None)
-
-        cpu_usage = {}
-        for i, core in enumerate(cpu_usage_list, 1):
-            cpu_usage[f"core{i}"] = core
-
-        print("cpu_usage")
-        print(cpu_usage)
-    except:
-        cpu_usage = None
-    try:
-        # ram usage
-        ram = psutil.virtual_memory()
-
-        ram_usage = {
-            "total": round(ram.total / (1024 ** 2), 1),
-            "used": round(ram.used / (1024 ** 2), 1),
-            "free": round(ram.available / (1024 ** 2), 1),
-            "percent": ram.percent
-        }
-
-        print("ram usage")
-        print(ram_usage)
-    except:
-        ram_usage = None
-
-    try:
-        # disk usage - use persistent counters for better performance
-        global _last_disk_counters
-        disk_usages = []
-        
-        disk_counters_1 = _last_disk_counters if _last_disk_counters else psutil.disk_io_counters(perdisk=True)
-        if disk_counters_1:
-            time.sleep(1)
-            disk_counters_2 = psutil.disk_io_counters(perdisk=True)
-            _last_disk_counters = disk_counters_2  # Cache for next call
-
-            if disk_counters_2:
-                for device in disk_counters_1:
-                    # Check if device still exists in second measurement
-                    if device in disk_counters_2:
-                        try:
-                            read_bytes_1 = disk_counters_1[device].read_bytes
-                            write_bytes_1 = disk_counters_1[device].write_bytes
-                            read_bytes_2 = disk_counters_2[device].read_bytes
-                            write_bytes_2 = disk_counters_2[device].write_bytes
-
-                            read_speed = (read_bytes_2 - read_bytes_1) / (1024 * 1024)
-                            write_speed = (write_bytes_2 - write_bytes_1) / (1024 * 1024)
-
-                            disk_usages.append({
-                                "device": device,
-                                "readSpeed": round(read_speed, 2),
-                                "writeSpeed": round(write_speed, 2),
-                            })
-                        except (AttributeError, KeyError):
-                            # Skip this disk if we can't get proper data
-                            continue
-
-        print("disk usages")
-        for disk in disk_usages:
-            print(disk)
-    except:
-        disk_usages = None
+def get_backend():
+    '''Return the collector backend in use, creating the default one if needed.'''
+    global _backend
+    if _backend is None:
+        _backend = create_backend()
+    return _backend
 
-    try:
-        # network usage - use persistent counters for better performance
-        global _last_net_counters
-        net1 = _last_net_counters if _last_net_counters else psutil.net_io_counters()
-        if net1:
-            time.sleep(1)
-            net2 = psutil.net_io_counters()
-            _last_net_counters = net2  # Cache for next call
-            
-            if net2:
-                upload_speed = round((net2.bytes_sent - net1.bytes_sent) / 1024 ** 2, 2)
-                download_speed = round((net2.bytes_recv - net1.bytes_recv) / 1024 ** 2, 2)
-
-                network_usage = {
-                    "up": upload_speed,
-                    "down": download_speed
-                }
-            else:
-                network_usage = None
+def set_backend(backend):
+    '''
+    Switch to another collector backend (an instance or a name like "fake").\n
+    The delta sampler state and the specs cache are reset, since counters from
+    different backends can't be compared.
+    '''
+    global _backend, _last_cpu_times, _last_disk_counters, _last_net_counters, _hardware_cache, _hardware_cache_time, _spec_failed, _spec_key, _specs_valid_since, _wmi_pool, _device_rates
+    if isinstance(backend, str):
+        backend = create_backend(backend)
+    if _backend is not None and _backend is not backend:
+        _backend.close()
+    if _wmi_pool is not None:
+        _wmi_pool.close()
+        _wmi_pool = None
+    _backend = backend
+    _last_cpu_times = _last_disk_counters = _last_net_counters = None
+    _device_rates = None
+    _hardware_cache = {}
+    _hardware_cache_time = {}
+    _spec_failed = {}
+    _spec_key = None
+    _specs_valid_since = 0
+    return backend
+
+def _rate_mbps(bytes_now, bytes_before, elapsed):
+    # counters can go backwards when a device is reset, treat that as idle
+    if elapsed <= 0 or bytes_now < bytes_before:
+        return 0.0
+    return (bytes_now - bytes_before) / elapsed / (1024 ** 2)
+
+def _sample_cpu(snap):
+    global _last_cpu_times
+    times = get_backend().cpu_times()
+    previous, _last_cpu_times = _last_cpu_times, times
+    if previous is None or len(previous) != len(times):
+        # first sample, report the average since boot
+        previous = [(0, 0)] * len(times)
+
+    cpu = snap.cpu = resize(snap.cpu, len(times))
+    for i, ((busy, total), (busy_before, total_before)) in enumerate(zip(times, previous)):
+        elapsed = total - total_before
+        percent = (busy - busy_before) / elapsed * 100 if elapsed > 0 else 0.0
+        cpu[i] = min(max(percent, 0.0), 100.0)
+
+def _sample_ram(snap):
+    total, used, available, percent = get_backend().memory()
+    snap.ram_total = total / (1024 ** 2)
+    snap.ram_used = used / (1024 ** 2)
+    snap.ram_free = available / (1024 ** 2)
+    snap.ram_percent = percent
+
+def _sample_disk(snap):
+    global _last_disk_counters, _last_disk_time
+    backend = get_backend()
+    now = backend.monotonic()
+    counters = backend.disk_counters()
+    previous, elapsed = _last_disk_counters, now - _last_disk_time
+    _last_disk_counters, _last_disk_time = counters, now
+
+    # keep the same names tuple as long as the set of disks doesn't change
+    if snap.disk_names is None or len(snap.disk_names) != len(counters) or \
+            any(a != b for a, b in zip(snap.disk_names, counters)):
+        snap.disk_names = tuple(counters)
+    read = snap.disk_read = resize(snap.disk_read, len(counters))
+    write = snap.disk_write = resize(snap.disk_write, len(counters))
+    for i, (device, (read_bytes, write_bytes)) in enumerate(counters.items()):
+        before = previous.get(device) if previous else None
+        if before is None:
+            # first sample for this device, no rate yet
+            read[i] = write[i] = 0.0
         else:
-            network_usage = None
-
-        print("network usage")
-        print(network_usage)
-    except:
-        network_usage = None
+            read[i] = _rate_mbps(read_bytes, before[0], elapsed)
+            write[i] = _rate_mbps(write_bytes, before[1], elapsed)
+
+def _sample_net(snap):
+    global _last_net_counters, _last_net_time
+    backend = get_backend()
+    now = backend.monotonic()
+    current = backend.net_counters()
+    previous, elapsed = _last_net_counters, now - _last_net_time
+    _last_net_counters, _last_net_time = current, now
+
+    if not current:
+        snap.clear("net")
+    elif previous is None:
+        snap.net_up = snap.net_down = 0.0
+    else:
+        snap.net_up = _rate_mbps(current[0], previous[0], elapsed)
+        snap.net_down = _rate_mbps(current[1], previous[1], elapsed)
+
+def _sample_battery(snap):
+    battery = get_backend().battery()
+    if battery is None:
+        snap.clear("battery")
+        return
+
+    percent, plugged_in, secs_left = battery
+    snap.battery_percent = percent
+    snap.battery_plugged = plugged_in
+    snap.battery_mins = secs_left // 60 if secs_left != TIME_UNLIMITED else UNLIMITED_MINS
+
+def _collect(name, sampler, snap):
+    # run one usage collector, timing it and counting failures instead of raising
+    start = time.perf_counter()
+    try:
+        sampler(snap)
+    except Exception as e:
+        _latency.record(name, time.perf_counter() - start, e)
+        logger.warning("%s collector failed: %s", name, e)
+        snap.clear(name)
+        return
+    _latency.record(name, time.perf_counter() - start)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("%s usage: %s", name, snap.part(name))
+
+def _check_metrics(metrics):
+    if metrics is None:
+        return USAGE_METRICS
+    unknown = set(metrics) - set(USAGE_METRICS)
+    if unknown:
+        raise ValueError(f"Unknown metric(s) {', '.join(sorted(unknown))}, expected some of {', '.join(USAGE_METRICS)}")
+    return [metric for metric in USAGE_METRICS if metric in metrics]
+
+def get_snapshot(metrics=None, out=None):
+    '''
+    Get real-time usage data as a Snapshot (see snapshot.py): flat typed fields,
+    per-core usage in an array('f') and the disks in parallel arrays.
+    GPU Usage is **not** supported due to lack of a Python binding for AMD and Intel GPUs.\n
+    The numbers come from the collector backend, see get_backend() and set_backend().
+    This function never blocks. Disk and network speeds are computed from the
+    counters seen on the previous call of that metric and the time that has passed
+    since then, so they are correct for any polling interval and every metric can be
+    polled at its own interval (see scheduler.AdaptiveScheduler). The very first call
+    has nothing to compare against and reports 0 for those speeds.\n
+    metrics limits which collectors run (some of "cpu", "ram", "disk", "net", "battery", all by default).
+    Pass out to refill an existing Snapshot in place: its arrays are reused and the
+    metrics that weren't asked for keep their previous values. Without out, a new
+    Snapshot is returned with those fields set to None.\n
+    snapshot.as_usage() turns it into the list of dicts the dashboard was first written against.
+    '''
+    metrics = _check_metrics(metrics)
+    snap = Snapshot() if out is None else out
+    snap.time = time.time()
+    for metric in metrics:
+        _collect(metric, _USAGE_SAMPLERS[metric], snap)
+    return snap
+
+def get_device_usage():
+    '''
+    Get the read/write speed of every physical disk and the up/down speed of every physical network adapter.\n
+    Partitions and virtual devices (loop, device mapper, loopback, docker, VPN...) are left out.
+    Speeds are measured since the previous call, in one vectorized step per device type
+    (see device_rates.CounterRates); the first call and counter resets report 0.
 
+    Returns a dict of (names, speeds) pairs, where speeds is an (n, 2) NumPy array:\n
+    { "disks": (disk_names, [[read_MBps, write_MBps], ...]), "nics": (adapter_names, [[up_mbps, down_mbps], ...]) }
+    '''
+    global _device_rates
+    # numpy is only loaded by the views that need every device
+    from device_rates import CounterRates
+    backend = get_backend()
+    if _device_rates is None:
+        _device_rates = (CounterRates(backend.is_physical_disk), CounterRates(backend.is_physical_nic))
+    disk_rates, nic_rates = _device_rates
+    start = time.perf_counter()
     try:
-        # battery stats
-        battery = psutil.sensors_battery()
-        if battery is not None:
-            battery_usage = {
-                "percent": battery.percent,
-                "pluggedIn": battery.power_plugged,
-                "timeLeftMins": battery.secsleft // 60 if battery.secsleft != psutil.POWER_TIME_UNLIMITED else 2147483640
-            }
-        else:
-            battery_usage = None
+        disks = disk_rates.update(backend.disk_counters(), backend.monotonic())
+        nics = nic_rates.update(backend.nic_counters(), backend.monotonic())
+    except Exception as e:
+        _latency.record("devices", time.perf_counter() - start, e)
+        raise
+    _latency.record("devices", time.perf_counter() - start)
+    return {"disks": disks, "nics": nics}
+
+def get_top_processes(n=10, key="cpu"):
+    '''
+    Get the top n processes by "cpu", "rss" (RAM) or "io" (disk reads + writes).\n
+    Each call scans part of the process table (see processes.ProcessTable), so call it
+    about once per tick. CPU and disk rates are measured between calls; a process seen
+    for the first time reports 0 for them.
 
-        print("battery usage")
-        print(battery_usage)
-    except:
-        battery_usage = None
+    Returns a list of dicts, highest first:\n
+    { "pid": pid, "name": process_name, "cpu": percent_of_one_core, "rssMB": MB, "ioMBps": MBps }
+    '''
+    global _process_table
+    if _process_table is None:
+        _process_table = ProcessTable()
+    start = time.perf_counter()
+    _process_table.scan()
+    _latency.record("processes", time.perf_counter() - start)
+    return _process_table.top(n, key)
+
+def get_collector_stats():
+    '''
+    Get call counts, error counts and latencies of every collector.\n
+    Keys are the usage collectors ("cpu", "ram", "disk", "net", "battery", "processes")
+    and the WMI classes queried for specs ("Win32_Processor", ...). Each value is:\n
+    { "calls": n, "errors": n, "p50Ms": ms, "p95Ms": ms, "maxMs": ms, "meanMs": ms, "lastError": message or None }\n
+    Percentiles come from a log-bucket histogram and are accurate to about 20%.
+    '''
+    return _latency.snapshot()
 
-    return [cpu_usage, ram_usage, disk_usages, network_usage, battery_usage]
+def reset_collector_stats():
+    '''Start counting get_collector_stats() from zero again.'''
+    _latency.reset()
 
 def get_specs():
     '''
@@ -209,151 +321,277 @@ def get_specs():
     ### Notes:
     * If anything returns None, it means it could not be found.\n
     * For the GPU, RAM, Storage, and Network Adapters, it will return a list with all of your hardware of that category.\n
+    * The six categories are queried concurrently. Use get_specs_async() to get each one as soon as it is ready.\n
+    * Specs are cached on disk and reused until the machine reboots or its hardware fingerprint changes.
+      The battery charge and status are re-queried after DYNAMIC_SPEC_TTL seconds.\n
+    * A query that fails or times out is not cached on disk, it is tried again after SPEC_RETRY_INTERVAL seconds.\n
     '''
-    global _hardware_cache, _cache_timestamp
-    current_time = time.time()
-    
     # Return cached data if still valid
-    if current_time - _cache_timestamp < CACHE_DURATION and _hardware_cache:
-        return _hardware_cache
-    # main system component
-    c = wmi.WMI()
+    _load_spec_cache()
+    if all(_spec_is_fresh(category) for category in SPEC_CATEGORIES):
+        return [_hardware_cache[category] for category in SPEC_CATEGORIES]
 
-    try:
-        # get cpu info
-        cpu_data = {}
-        for cpu in c.Win32_Processor():
-            cpu_data["name"] = cpu.Name
-            cpu_data["manufacturer"] = cpu.Manufacturer
-            cpu_data["description"] = cpu.Description
-            cpu_data["coreCount"] = cpu.NumberOfCores
-            cpu_data["clockSpeed"] = cpu.MaxClockSpeed
-
-        print("cpu info")
-        print(cpu_data)
-    except:
-        cpu_data = None
+    # every category is queried at the same time on its own thread
+    futures = get_specs_async()
+    return [future.result() for future in futures]
 
+def get_spec(category):
+    '''
+    Collect one category of get_specs() on the calling thread.\n
+    category is one of SPEC_CATEGORIES ("cpu", "gpu", "ram", "storage", "network", "battery"),
+    the result has the same shape as the matching item of get_specs(), or None if it could not be found.
+    '''
+    global _specs_dirty
+    _load_spec_cache()
+    if _spec_is_fresh(category):
+        return _hardware_cache[category]
+    if time.time() - _spec_failed.get(category, 0) < SPEC_RETRY_INTERVAL:
+        # failed a moment ago, don't hammer WMI: keep serving whatever we had
+        return _hardware_cache.get(category)
+
+    # only fetch the properties we actually read
+    wmi_class, properties, where = _SPEC_QUERIES[category]
+    start = time.perf_counter()
     try:
-        # get gpu info (list)
-        gpu_data_list = []
-        for gpu in c.Win32_VideoController():
-            gpu_data = {
-                "name": gpu.Name,
-                "driverVersion": gpu.DriverVersion,
-                "videoProcessor": gpu.Description,
-                "videoModeDesc": gpu.VideoModeDescription,
-                "VRAM": int(gpu.AdapterRAM) // (1024 ** 2)
-            }
-            gpu_data_list.append(gpu_data)
-        print("gpu info")
-        print(gpu_data_list)
-    except:
-        gpu_data_list = None
-
-    try:
-        # get ram info (list)
-        ram_data_list = []
-        for ram in c.Win32_PhysicalMemory():
-            ram_data = {
-                "capacity": int(ram.Capacity) // (1024 ** 2),
-                "speed": ram.Speed,
-                "manufacturer": ram.Manufacturer.strip(),
-                "partNumber": ram.PartNumber.strip()
-            }
-            ram_data_list.append(ram_data)
-        print("ram info")
-        print(ram_data_list)
-    except:
-        ram_data_list = None
-
-    try:
-        # get storage info (list)
-        storage_data_list = []
-        for disk in c.Win32_DiskDrive():
-            storage_data = {
-                "model": disk.Model,
-                "interfaceType": disk.InterfaceType,
-                "mediaType": getattr(disk, "MediaType", "Unknown"),
-                "size": int(disk.Size) // (1024**3) if disk.Size else None,
-                "serialNumber": disk.SerialNumber.strip() if disk.SerialNumber else "N/A"
-            }
-            storage_data_list.append(storage_data)
-        print("disk info")
-        print(storage_data_list)
-    except:
-        storage_data_list = None
-    
-    try:
-        # get network/wifi info
-        network_data = {}
-        for nic in c.Win32_NetworkAdapter():
-            if nic.PhysicalAdapter and nic.NetEnabled:
-                network_data["name"] = nic.Name
-                network_data["macAddress"] = nic.MACAddress
-                network_data["manufacturer"] = nic.Manufacturer
-                network_data["adapterType"] = nic.AdapterType
-                network_data["speed"] = int(nic.Speed) / 1000000
-        
-        print("network info")
-        print(network_data)
-    except:
-        network_data = None
-
+        rows = _get_wmi_pool().query(wmi_class, properties, **where)
+        data = _SPEC_COLLECTORS[category](rows)
+    except Exception as e:
+        _latency.record(wmi_class, time.perf_counter() - start, e)
+        logger.warning("%s query failed: %s", wmi_class, e)
+        # only remembered in memory, so it is retried later and never cached as None
+        _spec_failed[category] = time.time()
+        return _hardware_cache.get(category)
+    _latency.record(wmi_class, time.perf_counter() - start)
+    logger.debug("%s info: %s", category, data)
+
+    _spec_failed.pop(category, None)
+    _hardware_cache[category] = data
+    _hardware_cache_time[category] = time.time()
+    _specs_dirty = True
+    return data
+
+def get_specs_async(callback=None):
+    '''
+    Collect every get_specs() category concurrently, off the calling thread.\n
+    callback(category, data) is called from a worker thread as soon as each category is done,
+    so one slow WMI class only holds up its own result. If the cache has out of date data for
+    a category, the callback gets that right away and is called again with the fresh data.
+    Returns one future per category, in get_specs() order.
+    '''
+    remaining = [len(SPEC_CATEGORIES)]
+    lock = threading.Lock()
+
+    def run(category):
+        _load_spec_cache()
+        if callback is not None and category in _hardware_cache and not _spec_is_fresh(category):
+            callback(category, _hardware_cache[category])
+        data = get_spec(category)
+        with lock:
+            remaining[0] -= 1
+            if remaining[0] == 0:
+                _save_spec_cache()
+        if callback is not None:
+            callback(category, data)
+        return data
+
+    return [_get_spec_executor().submit(run, category) for category in SPEC_CATEGORIES]
+
+def preload_specs():
+    '''
+    Load the on-disk spec cache in the background and, only if the boot time or hardware
+    fingerprint changed since it was written, refresh it from WMI. Returns immediately.
+    '''
+    def run():
+        _load_spec_cache()
+        if not all(_spec_is_fresh(category) for category in SPEC_CATEGORIES if category not in DYNAMIC_SPEC_TTL):
+            get_specs_async()
+
+    _get_spec_executor().submit(run)
+
+def _load_spec_cache():
+    global _spec_key, _spec_key_checked, _specs_valid_since
+    with _spec_lock:
+        if _spec_key is not None:
+            if time.time() - _spec_key_checked > SPEC_KEY_CHECK_INTERVAL:
+                _check_spec_key()
+            return
+        try:
+            _spec_key = spec_cache.hardware_key(get_backend())
+        except Exception:
+            _spec_key = {}
+        _spec_key_checked = time.time()
+        cached_key, specs = spec_cache.load()
+        for category, data in specs.items():
+            if category in SPEC_CATEGORIES and category not in _hardware_cache:
+                _hardware_cache[category] = data
+                _hardware_cache_time[category] = 0
+        if not spec_cache.same_key(cached_key, _spec_key):
+            # rebooted or the hardware changed, serve the old specs until they are refreshed
+            _specs_valid_since = time.time()
+
+def _check_spec_key():
+    # called with _spec_lock held
+    global _spec_key, _spec_key_checked, _specs_valid_since
+    _spec_key_checked = time.time()
     try:
-        # get battery info
-        battery_data = {}
-        for batt in c.Win32_Battery():
-            battery_data["name"] = batt.Name
-            battery_data["estimatedChargeRemaining"] = batt.EstimatedChargeRemaining
-
-            # interpret battery status
-            match int(batt.BatteryStatus):
-                case 1:
-                    battery_data["batteryStatus"] = "Discharging"
-                case 2:
-                    battery_data["batteryStatus"] = "Plugged In, Fully Charged"
-                case 3:
-                    battery_data["batteryStatus"] = "Fully Charged"
-                case 4:
-                    battery_data["batteryStatus"] = "Low Battery"
-                case 5:
-                    battery_data["batteryStatus"] = "Critical Battery"
-                case 6:
-                    battery_data["batteryStatus"] = "Charging"
-                case 7:
-                    battery_data["batteryStatus"] = "Charging (High)"
-                case 8:
-                    battery_data["batteryStatus"] = "Charging (Low)"
-                case 9:
-                    battery_data["batteryStatus"] = "Charging (Critical)"
-                case 10:
-                    battery_data["batteryStatus"] = "Unknown"
-                case 11:
-                    battery_data["batteryStatus"] = "Partially Charged"
-                case _:
-                    battery_data["batteryStatus"] = "Unknown"
-                
-            battery_data["designCapacity"] = getattr(batt, "DesignCapacity", "N/A")
-            battery_data["fullChargeCapacity"] = getattr(batt, "FullChargeCapacity", "N/A")
-
-        
-        print("battery_info")
-        print(battery_data)
-    except:
-        battery_data = None
-
-    # return everything
-    specs = [cpu_data, gpu_data_list, ram_data_list, storage_data_list, network_data, battery_data]
-    
-    # Update cache
-    _hardware_cache = specs
-    _cache_timestamp = current_time
-    
-    return specs
+        key = spec_cache.hardware_key(get_backend())
+    except Exception:
+        return
+    if not spec_cache.same_key(key, _spec_key):
+        _spec_key = key
+        _specs_valid_since = time.time()
+
+def _spec_is_fresh(category):
+    if _hardware_cache.get(category) is None:
+        # never queried, or a None from a spec cache written before failures were kept out of it
+        return False
+    ttl = DYNAMIC_SPEC_TTL.get(category)
+    if ttl is not None:
+        return time.time() - _hardware_cache_time[category] < ttl
+    return _hardware_cache_time[category] >= _specs_valid_since
+
+def _save_spec_cache():
+    global _specs_dirty
+    with _spec_lock:
+        if not _specs_dirty:
+            return
+        _specs_dirty = False
+        try:
+            spec_cache.save(_spec_key, {category: _hardware_cache[category] for category in SPEC_CATEGORIES
+                                        if _hardware_cache.get(category) is not None})
+        except Exception as e:
+            logger.warning("Could not save the specs cache: %s", e)
+
+def _get_spec_executor():
+    global _spec_executor
+    if _spec_executor is None:
+        _spec_executor = ThreadPoolExecutor(max_workers=len(SPEC_CATEGORIES), thread_name_prefix="specs")
+    return _spec_executor
+
+def _get_wmi_pool():
+    global _wmi_pool
+    if _wmi_pool is None:
+        _wmi_pool = WMIPool(get_backend().wmi, workers=len(SPEC_CATEGORIES), timeout=WMI_QUERY_TIMEOUT)
+    return _wmi_pool
+
+def _get_cpu_specs(rows):
+    cpu_data = {}
+    for cpu in rows:
+        cpu_data["name"] = cpu["Name"]
+        cpu_data["manufacturer"] = cpu["Manufacturer"]
+        cpu_data["description"] = cpu["Description"]
+        cpu_data["coreCount"] = cpu["NumberOfCores"]
+        cpu_data["clockSpeed"] = cpu["MaxClockSpeed"]
+    return cpu_data
+
+def _get_gpu_specs(rows):
+    gpu_data_list = []
+    for gpu in rows:
+        gpu_data = {
+            "name": gpu["Name"],
+            "driverVersion": gpu["DriverVersion"],
+            "videoProcessor": gpu["Description"],
+            "videoModeDesc": gpu["VideoModeDescription"],
+            "VRAM": int(gpu["AdapterRAM"]) // (1024 ** 2)
+        }
+        gpu_data_list.append(gpu_data)
+    return gpu_data_list
+
+def _get_ram_specs(rows):
+    ram_data_list = []
+    for ram in rows:
+        ram_data = {
+            "capacity": int(ram["Capacity"]) // (1024 ** 2),
+            "speed": ram["Speed"],
+            "manufacturer": ram["Manufacturer"].strip(),
+            "partNumber": ram["PartNumber"].strip()
+        }
+        ram_data_list.append(ram_data)
+    return ram_data_list
+
+def _get_storage_specs(rows):
+    storage_data_list = []
+    for disk in rows:
+        storage_data = {
+            "model": disk["Model"],
+            "interfaceType": disk["InterfaceType"],
+            "mediaType": disk.get("MediaType") or "Unknown",
+            "size": int(disk["Size"]) // (1024**3) if disk["Size"] else None,
+            "serialNumber": disk["SerialNumber"].strip() if disk["SerialNumber"] else "N/A"
+        }
+        storage_data_list.append(storage_data)
+    return storage_data_list
+
+def _get_network_specs(rows):
+    network_data = {}
+    # only physical, enabled adapters are returned by the query
+    for nic in rows:
+        network_data["name"] = nic["Name"]
+        network_data["macAddress"] = nic["MACAddress"]
+        network_data["manufacturer"] = nic["Manufacturer"]
+        network_data["adapterType"] = nic["AdapterType"]
+        network_data["speed"] = int(nic["Speed"]) / 1000000
+    return network_data
+
+BATTERY_STATUSES = {
+    1: "Discharging",
+    2: "Plugged In, Fully Charged",
+    3: "Fully Charged",
+    4: "Low Battery",
+    5: "Critical Battery",
+    6: "Charging",
+    7: "Charging (High)",
+    8: "Charging (Low)",
+    9: "Charging (Critical)",
+    10: "Unknown",
+    11: "Partially Charged",
+}
+
+def _get_battery_specs(rows):
+    battery_data = {}
+    for batt in rows:
+        battery_data["name"] = batt["Name"]
+        battery_data["estimatedChargeRemaining"] = batt["EstimatedChargeRemaining"]
+        battery_data["batteryStatus"] = BATTERY_STATUSES.get(int(batt["BatteryStatus"]), "Unknown")
+        battery_data["designCapacity"] = batt.get("DesignCapacity") or "N/A"
+        battery_data["fullChargeCapacity"] = batt.get("FullChargeCapacity") or "N/A"
+    return battery_data
+
+# get_snapshot() metrics, in the order Snapshot.as_usage() returns them
+USAGE_METRICS = ("cpu", "ram", "disk", "net", "battery")
+_USAGE_SAMPLERS = {
+    "cpu": _sample_cpu,
+    "ram": _sample_ram,
+    "disk": _sample_disk,
+    "net": _sample_net,
+    "battery": _sample_battery,
+}
+
+# get_specs() categories, in the order get_specs() returns them
+SPEC_CATEGORIES = ("cpu", "gpu", "ram", "storage", "network", "battery")
+# WMI class, the properties we read and a WHERE filter for each category
+_SPEC_QUERIES = {
+    "cpu": ("Win32_Processor", ("Name", "Manufacturer", "Description", "NumberOfCores", "MaxClockSpeed"), {}),
+    "gpu": ("Win32_VideoController", ("Name", "DriverVersion", "Description", "VideoModeDescription", "AdapterRAM"), {}),
+    "ram": ("Win32_PhysicalMemory", ("Capacity", "Speed", "Manufacturer", "PartNumber"), {}),
+    "storage": ("Win32_DiskDrive", ("Model", "InterfaceType", "MediaType", "Size", "SerialNumber"), {}),
+    # filtering in the query skips marshalling every virtual adapter
+    "network": ("Win32_NetworkAdapter", ("Name", "MACAddress", "Manufacturer", "AdapterType", "Speed"),
+                {"PhysicalAdapter": True, "NetEnabled": True}),
+    "battery": ("Win32_Battery", ("Name", "EstimatedChargeRemaining", "BatteryStatus", "DesignCapacity", "FullChargeCapacity"), {}),
+}
+_SPEC_COLLECTORS = {
+    "cpu": _get_cpu_specs,
+    "gpu": _get_gpu_specs,
+    "ram": _get_ram_specs,
+    "storage": _get_storage_specs,
+    "network": _get_network_specs,
+    "battery": _get_battery_specs,
+}
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.DEBUG)
     get_specs()
     print("------------------------------------------------------------------------------------------------")
-    get_usage()
+    print(get_snapshot().as_usage())
 
@@ -0,0 +1,91 @@
+import logging
+
+logger = logging.getLogger(__name__)
+
+class TickScheduler:
+    '''
+    The one refresh loop of the dashboard.\n
+    Each tick runs collect() on a worker and then apply(result) on the Tk thread.
+    There is never more than one collection in flight: the next tick is only
+    armed once the previous result has been applied, after next_delay() seconds.
+    request() asks for a refresh now; requests made while a collection is running
+    are merged into a single tick that starts as soon as it finishes, and that
+    collection's result is dropped because it was started before the request.
+    So collect() should only read, and leave every change of state to apply().
+
+    ### Usage
+    - ticker = TickScheduler(root, executor, collect, apply, next_delay)\n
+    - ticker.start()\n
+    - ticker.request()  # e.g. the selected disk changed\n
+    '''
+
+    def __init__(self, root, executor, collect, apply, next_delay=lambda: 1.0):
+        self.root = root
+        self.executor = executor
+        self.collect = collect
+        self.apply = apply
+        self.next_delay = next_delay
+        self.ticks = 0
+        self.dropped = 0
+        self._in_flight = False
+        self._requested = False
+        self._timer = None
+        self._stopped = False
+
+    def start(self):
+        self._arm(0)
+
+    def stop(self):
+        self._stopped = True
+        if self._timer is not None:
+            self.root.after_cancel(self._timer)
+            self._timer = None
+
+    def request(self):
+        '''Refresh as soon as possible, without starting a second loop.'''
+        if self._in_flight:
+            self._requested = True
+        else:
+            self._arm(0)
+
+    def _arm(self, delay):
+        if self._stopped:
+            return
+        if self._timer is not None:
+            self.root.after_cancel(self._timer)
+        self._timer = self.root.after(max(int(delay * 1000), 1), self._tick)
+
+    def _tick(self):
+        self._timer = None
+        if self._in_flight or self._stopped:
+            return
+        self._in_flight = True
+        self._requested = False
+        self.ticks += 1
+        self.executor.submit(self._run)
+
+    def _run(self):
+        try:
+            result, error = self.collect(), None
+        except Exception as e:
+            result, error = None, e
+        try:
+            self.root.after(0, lambda: self._finish(result, error))
+        except RuntimeError:
+            # the window is gone (Tk raises RuntimeError from other threads after destroy)
+            pass
+
+    def _finish(self, result, error):
+        self._in_flight = False
+        if self._stopped:
+            return
+        if self._requested:
+            # something changed while collecting, this result is already stale
+            self.dropped += 1
+            self._arm(0)
+            return
+        if error is not None:
+            logger.error("Error collecting usage", exc_info=error)
+        else:
+            self.apply(result)
+        self._arm(self.next_delay())
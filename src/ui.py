@@ -1,58 +1,154 @@
 from ui_functions import *
+import os
+import sys
 import threading
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from collections import deque
 import time
 from concurrent.futures import ThreadPoolExecutor
-
-# Performance constants
-MAX_DATA_POINTS = 50  # Limit data history to save memory
-
-# Thread pool for better performance
-executor = ThreadPoolExecutor(max_workers=2)
+from history import MetricStore
+from history_file import HistoryWriter, default_path
+from paths import get_app_dir
+from latency import format_table
+from scheduler import AdaptiveScheduler
+from alerts import AlertEngine, parse_rules
+from snapshot import Snapshot
+from ticker import TickScheduler
+
+# Worker for the ticker's collections (one at a time, see ticker.py)
+executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="collect")
 
 selected_disk_idx = 0
 window_bg = "#242424"
 
-# Performance-optimized data storage using deque
-cpu_data = deque(maxlen=MAX_DATA_POINTS)
-ram_data = deque(maxlen=MAX_DATA_POINTS)
-disk_data = deque(maxlen=MAX_DATA_POINTS)
-network_data = deque(maxlen=MAX_DATA_POINTS)
+# Fixed-memory history of cpu, ram, disk and network usage.
+# Charts and exporters read from this instead of keeping their own copies.
+history = MetricStore()
+
+# Persistent on-disk history, opened by build_main_ui
+history_writer = None
+
+# Startup benchmark: when set, startup stages are appended to this file and
+# the app quits once the first sample is on screen (see benchmarks/startup.py)
+STARTUP_BENCH_FILE = os.environ.get("WINSTATZ_STARTUP_BENCH")
+
+# Every metric is sampled on its own interval: faster while it is changing
+# (down to SAMPLE_FLOOR), slower while it is flat. Battery starts at 10 s.
+SAMPLE_FLOOR = 0.1  # seconds
+scheduler = AdaptiveScheduler(floor=SAMPLE_FLOOR)
+# the metrics on screen; each collection fills a new Snapshot and update_plot
+# copies the metrics it collected into this one on the Tk thread
+latest_usage = Snapshot()
+
+# WINSTATZ_METRICS=127.0.0.1:9779 serves every sample on an OpenMetrics endpoint (see openmetrics.py)
+METRICS_LISTEN = os.environ.get("WINSTATZ_METRICS")
+metrics_exporter = None
+
+# alert rules (see alerts.py), checked on every sample; a firing rule turns its chart's title and frame red
+DEFAULT_ALERTS = "cpu > 90 for 30s; ram.free < 500; disk.write > 200 for 10s"
+ALERT_COLOR = "#e74c3c"
+alert_engine = None
+_highlighted = None  # metrics drawn highlighted right now
+
+# battery percent the icon shows, it is only redrawn when this changes
+_battery_shown = None
+
+# the on-disk history gets at most one record per second, however fast we sample
+HISTORY_WRITE_INTERVAL = 1.0
+_last_history_write = 0
+# same for the in-memory history: its raw tier keeps one hour of 1 s samples,
+# a point per 0.1 s tick would fill it in six minutes
+HISTORY_APPEND_INTERVAL = 1.0
+_last_history_append = 0
+
+def _record_startup(stage, root=None):
+    if not STARTUP_BENCH_FILE:
+        return
+    with open(STARTUP_BENCH_FILE, "a") as f:
+        f.write(f"{stage} {time.time():.6f}\n")
+    if stage == "first_data" and root is not None:
+        root.after(0, root.destroy)
+
+def _set_app_icon(root):
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    icon_path = os.path.join(script_dir, "..", "assets", "icon.png")
+    ico_path = os.path.join(script_dir, "..", "assets", "icon.ico")
+    try:
+        if sys.platform.startswith("win") and os.path.exists(ico_path):
+            root.iconbitmap(ico_path)
+        elif os.path.exists(icon_path):
+            # PIL is only needed (and only imported) for the png icon
+            from PIL import Image, ImageTk
+            img = Image.open(icon_path)
+            # keep a reference on the window so Tk doesn't lose the image
+            root._icon_img = ImageTk.PhotoImage(img)
+            root.iconphoto(True, root._icon_img)
+    except Exception as e:
+        print(f"Could not set app icon: {e}")
+
+def _print_alert(alert):
+    state = "firing" if alert.firing else "resolved"
+    print(f"Alert {state}: {alert.rule.name} ({alert.value:.1f})")
+
+def update_alert_highlights(force=False):
+    '''Color the title and frame of each chart whose metric has a firing rule, only when that changes.'''
+    global _highlighted
+    if alert_engine is None or axs is None:
+        return
+    firing = alert_engine.firing_metrics()
+    if firing == _highlighted and not force:
+        return
+    _highlighted = firing
+    for metric, ax in (("cpu", axs[0,0]), ("ram", axs[0,1]), ("disk", axs[1,0]), ("net", axs[1,1])):
+        color = ALERT_COLOR if metric in firing else graph_text_color
+        ax.title.set_color(color)
+        for spine in ax.spines.values():
+            spine.set_edgecolor(color)
+            spine.set_linewidth(2 if metric in firing else 0.8)
+    if renderer is not None:
+        renderer.invalidate()
+
+def export_history(root):
+    '''Write the history the charts keep (raw samples, up to the last hour) to a file in the app folder.'''
+    from export import available_formats, store_rows, write_file
+    fmt = available_formats()[-1]  # parquet when pyarrow is there, csv otherwise
+    folder = os.path.join(get_app_dir(), "exports")
+    os.makedirs(folder, exist_ok=True)
+    path = os.path.join(folder, time.strftime(f"history-%Y%m%d-%H%M%S.{fmt}"))
+
+    # copied here on the Tk thread, which is the one that appends to the history
+    columns, rows = store_rows(history)
+
+    def run():
+        try:
+            write_file(path, columns, rows, fmt)
+        except Exception as e:
+            root.after(0, lambda: messagebox.showerror("Export History", f"Could not export history: {e}"))
+            return
+        root.after(0, lambda: messagebox.showinfo("Export History", f"Exported {len(rows)} samples to {path}"))
 
-# Update frequency optimization
-_last_battery_update = 0
-BATTERY_UPDATE_INTERVAL = 10.0  # Update battery every 10 seconds
+    # its own thread, a slow disk must not hold up the sampler's pool
+    threading.Thread(target=run, daemon=True).start()
 
 def on_closing(root):
     if messagebox.askokcancel("Quit", "Do you want to quit?"):
+        if history_writer is not None:
+            history_writer.close()
+        if metrics_exporter is not None:
+            metrics_exporter.close()
         root.destroy()
         exit(0)
 
 def update_usage_labels(cpuLabel, ramLabel, diskLabel, networkLabel):
-    def fetch_and_update():
-        usage = get_usage()
-
-        # cpu usage
-        cpu_total_usage = sum(usage[0].values())
-        cpu_average_usage = round(cpu_total_usage / len(usage[0]), 1)
-
-        cpuLabel.after(0, lambda: cpuLabel.configure(text=f"CPU Usage = {cpu_average_usage}%"))
-
-        # ram usage
-        used_ram = usage[1]['used']
-        ramLabel.after(0, lambda: ramLabel.configure(text=f"RAM Usage = {used_ram} MB"))
-
-        # disk usage
-        disk_usage = [usage[2][1]["readSpeed"], usage[2][1]["writeSpeed"]]
-        diskLabel.after(0, lambda: diskLabel.configure(text=f"Disk Usage = {disk_usage[0]} MBps (Read), {disk_usage[1]} MBps (Write)"))
-
-        # network usage
-        network_usage = usage[3]
-        networkLabel.after(0, lambda: networkLabel.configure(text=f"Network Usage = {network_usage['up']} Mbps (Up), {network_usage['down']} Mbps (Down)"))
-
-    threading.Thread(target=fetch_and_update, daemon=True).start()
+    '''Show the latest sample in text labels. Call it from the Tk thread; it reads what the ticker collected and never samples itself.'''
+    snap = latest_usage
+    if snap.has("cpu"):
+        cpuLabel.configure(text=f"CPU Usage = {snap.cpu_average:.1f}%")
+    if snap.has("ram"):
+        ramLabel.configure(text=f"RAM Usage = {snap.ram_used:.1f} MB")
+    if snap.disk_names:
+        disk_idx = selected_disk_idx % len(snap.disk_names)
+        diskLabel.configure(text=f"Disk Usage = {snap.disk_read[disk_idx]:.2f} MBps (Read), {snap.disk_write[disk_idx]:.2f} MBps (Write)")
+    if snap.has("net"):
+        networkLabel.configure(text=f"Network Usage = {snap.net_up:.2f} Mbps (Up), {snap.net_down:.2f} Mbps (Down)")
 
 fig = None
 axs = None
@@ -60,9 +156,37 @@ battery_fig = None
 battery_ax = None
 canvas = None
 battery_canvas = None
+renderer = None
+history_window = None
+process_window = None
+core_window = None
+devices_window = None
+debug_overlay = None
+graph_text_color = "white"
+
+# bar color of the CPU chart for each color theme, it follows the buttons
+THEME_ACCENTS = {"blue": "#3498db", "green": "#2ecc71"}
+color_theme = "blue"
+cpu_bar = None
+usage_chart = None
+
+def update_graph_accent(theme):
+    '''Recolor the chart artists that follow the color theme, in place.'''
+    global color_theme
+    color_theme = theme
+    accent = THEME_ACCENTS.get(theme, THEME_ACCENTS["blue"])
+    if cpu_bar is not None:
+        for bar in cpu_bar:
+            bar.set_facecolor(accent)
+    if history_window is not None and history_window.is_open():
+        history_window.set_line_color("cpu", accent)
+    if renderer is not None:
+        # the bars are blitted, the next tick draws them in the new color
+        renderer.update()
 
 def update_graph_theme(bg_color, text_color="white"):
-    global fig, axs, battery_fig, battery_ax, canvas, battery_canvas
+    global fig, axs, battery_fig, battery_ax, canvas, battery_canvas, window_bg, graph_text_color
+    window_bg, graph_text_color = bg_color, text_color
     # other graphs color
     if fig is not None:
         fig.patch.set_facecolor(bg_color)
@@ -75,6 +199,8 @@ def update_graph_theme(bg_color, text_color="white"):
                 ax.set_title(ax.get_title(), color=text_color)
             else:
                 ax.title.set_color(text_color)
+        # the theme colors just replaced any alert highlight, put it back
+        update_alert_highlights(force=True)
         if canvas is not None:
             canvas.draw()
     # battery color
@@ -86,37 +212,104 @@ def update_graph_theme(bg_color, text_color="white"):
                 text.set_color(text_color)
         if battery_canvas is not None:
             battery_canvas.draw()
+    # history charts
+    if history_window is not None and history_window.is_open():
+        history_window.set_theme(bg_color, text_color)
+        history_window.refresh()
+    # all disks and network adapters
+    if devices_window is not None and devices_window.is_open():
+        devices_window.set_theme(bg_color, text_color)
+    # per-core heatmap
+    if core_window is not None and core_window.is_open():
+        core_window.set_theme(bg_color, text_color)
+        core_window.renderer.update()
+
+def open_history(root):
+    global history_window
+    if history_window is not None and history_window.is_open():
+        history_window.window.focus()
+        return
+    from history_view import HistoryWindow
+    history_window = HistoryWindow(root, history, window_bg, graph_text_color)
+    history_window.set_line_color("cpu", THEME_ACCENTS.get(color_theme, THEME_ACCENTS["blue"]))
+
+def open_cores(root):
+    global core_window
+    if core_window is not None and core_window.is_open():
+        core_window.window.focus()
+        return
+    from core_view import CoreHeatmapWindow
+    core_window = CoreHeatmapWindow(root, window_bg, graph_text_color)
+
+def open_devices(root):
+    global devices_window
+    if devices_window is not None and devices_window.is_open():
+        devices_window.window.focus()
+        return
+    from devices_view import DevicesWindow
+    devices_window = DevicesWindow(root, window_bg, graph_text_color)
+
+def open_processes(root):
+    global process_window
+    if process_window is not None and process_window.is_open():
+        process_window.window.focus()
+        return
+    from process_view import ProcessWindow
+    process_window = ProcessWindow(root)
+
+def toggle_debug_overlay(root):
+    '''Show or hide the collector latency table (F12).'''
+    global debug_overlay
+    if debug_overlay is not None:
+        debug_overlay.destroy()
+        debug_overlay = None
+        return
+    debug_overlay = CTkLabel(root, text="", justify="left", anchor="nw", fg_color=("gray85", "gray17"),
+                             corner_radius=6, font=("Courier", 12))
+    debug_overlay.place(relx=0.01, rely=0.01, anchor="nw")
+    update_debug_overlay()
+
+def update_debug_overlay():
+    if debug_overlay is not None:
+        debug_overlay.configure(text=format_table(get_collector_stats()))
+        debug_overlay.lift()
 
 def build_main_ui():
-    import os
-    import sys
-    from PIL import Image, ImageTk
-
     root = CTk()
     root.geometry("1000x1000")
     root.title("WinStatz")
     root.protocol("WM_DELETE_WINDOW", lambda: on_closing(root))
     root.resizable(False, False)
 
-    # Set app icon
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    icon_path = os.path.join(script_dir, "..", "assets", "icon.png")
-    if os.path.exists(icon_path):
+    # keep every sample on disk so it survives closing the window
+    global history_writer
+    if history_writer is None:
         try:
-            if sys.platform.startswith("win"):
-                ico_path = os.path.join(script_dir, "..", "assets", "icon.ico")
-                if os.path.exists(ico_path):
-                    root.iconbitmap(ico_path)
-                else:
-                    img = Image.open(icon_path)
-                    icon_img = ImageTk.PhotoImage(img)
-                    root.iconphoto(True, icon_img)
-            else:
-                img = Image.open(icon_path)
-                icon_img = ImageTk.PhotoImage(img)
-                root.iconphoto(True, icon_img)
+            history_writer = HistoryWriter(default_path())
+        except Exception as e:
+            print(f"Could not open history file: {e}")
+
+    global alert_engine
+    if alert_engine is None:
+        try:
+            alert_engine = AlertEngine(parse_rules(os.environ.get("WINSTATZ_ALERTS", DEFAULT_ALERTS)), on_alert=_print_alert)
+        except ValueError as e:
+            print(f"Invalid alert rule: {e}")
+            alert_engine = AlertEngine()
+
+    global metrics_exporter
+    if METRICS_LISTEN and metrics_exporter is None:
+        from openmetrics import MetricsExporter
+        host, _, port = METRICS_LISTEN.rpartition(":")
+        try:
+            metrics_exporter = MetricsExporter()
+            metrics_exporter.serve(host or "127.0.0.1", int(port))
+            get_specs_async(callback=metrics_exporter.set_spec)
         except Exception as e:
-            print(f"Could not set app icon: {e}")
+            print(f"Could not start the metrics endpoint: {e}")
+            metrics_exporter = None
+
+    _set_app_icon(root)
 
     # title label
     titleLabel = CTkLabel(root, text="WinStatz", font=("Poppins", 48, "bold"))
@@ -130,29 +323,24 @@ def build_main_ui():
     threeDotsButton = CTkButton(root, text="⋮", command=open_3_dots_details, width=40, height=40, bg_color="transparent", fg_color="transparent", hover_color="gray")
     threeDotsButton.place(relx=0.95, rely=0.02, anchor="ne")
 
+    # placeholder until matplotlib is loaded and the first sample is in
+    loadingLabel = CTkLabel(root, text="CPU --%    RAM -- MB    Disk -- MBps    Network -- Mbps\n\nLoading charts...", font=("Poppins", 16))
+    loadingLabel.place(relx=0.5, rely=0.5, anchor="center")
+
+    # paint the window now, before the slow matplotlib import
+    root.update()
+    _record_startup("first_paint")
+
+    import matplotlib.pyplot as plt
+    from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+    from usage_view import UsageChart
+
     # style
     plt.style.use('dark_background')
-    global fig, axs
-    fig, axs = plt.subplots(2, 2, figsize=(10, 8))
-    fig.patch.set_facecolor(window_bg)
-    plt.tight_layout(pad=6.0)
-
-    # create the graphs
-    axs[0,0].set_title("CPU Usage (%)", color='white')
-    axs[0,1].set_title("RAM Usage (MB)", color='white')
-    axs[1,0].set_title("Disk Usage (MBps)", color='white')
-    axs[1,1].set_title("Network Usage (Mbps)", color='white')
-
-    for ax in axs.flat:
-        ax.set_facecolor(window_bg)
-        ax.tick_params(colors='white')
-        ax.yaxis.label.set_color('white')
-        ax.xaxis.label.set_color('white')
-
-    cpu_bar = axs[0,0].bar(["Avg"], [0], color="#3498db")
-    ram_bar = axs[0,1].bar(["Used", "Free"], [0,0], color=["#27ae60", "#7f8c8d"])
-    disk_bar = axs[1,0].bar(["Read", "Write"], [0,0], color=["#9b59b6", "#e67e22"])
-    net_bar = axs[1,1].bar(["Up", "Down"], [0,0], color=["#e74c3c", "#1abc9c"])
+    global fig, axs, cpu_bar, usage_chart
+    usage_chart = UsageChart(lambda figure: FigureCanvasTkAgg(figure, master=root), window_bg, graph_text_color,
+                             THEME_ACCENTS.get(color_theme, THEME_ACCENTS["blue"]))
+    fig, axs, cpu_bar = usage_chart.fig, usage_chart.axs, usage_chart.cpu_bar
 
     import matplotlib.patches as mpatches
     global battery_fig, battery_ax
@@ -170,126 +358,117 @@ def build_main_ui():
     battery_ax.set_ylim(0, 1)
     battery_ax.text(0.5, 0.5, "Battery", color='white', fontsize=14, ha='center', va='center')
 
-    global canvas, battery_canvas
-    canvas = FigureCanvasTkAgg(fig, master=root)
+    global canvas, battery_canvas, renderer
+    canvas, renderer = usage_chart.canvas, usage_chart.renderer
     canvas.get_tk_widget().place(relx=0.5, rely=0.5, anchor="center")
     battery_canvas = FigureCanvasTkAgg(battery_fig, master=root)
     battery_canvas.get_tk_widget().place(relx=0.5, rely=0.95, anchor="center")
-
-    # update the bar graphs
-    def update_bars_threaded():
-        def fetch_and_update():
+    loadingLabel.destroy()
+    _record_startup("charts_ready")
+
+    # have the hardware specs ready before Advanced Specifications is opened
+    preload_specs()
+
+    # One refresh loop for everything (see ticker.py): collect() runs on a worker,
+    # update_plot() draws its result on the Tk thread, then the next tick is armed
+    def collect():
+        # runs on the worker and only reads: a stale result is dropped by the ticker,
+        # so the scheduler, alerts and exporter are only updated in update_plot.
+        # Only the metrics that are due are collected, the rest keep their last value
+        collected = scheduler.due()
+        sample = Snapshot()
+        try:
+            get_snapshot(collected, out=sample)
+        except Exception as e:
+            print(f"Error getting usage data: {e}")
+            collected = []
+        # every disk and adapter, only while that window is open or something scrapes them
+        devices = None
+        if (devices_window is not None and devices_window.is_open()) or metrics_exporter is not None:
             try:
-                usage = get_usage()
-                if not usage:
-                    return
+                devices = get_device_usage()
             except Exception as e:
-                print(f"Error getting usage data: {e}")
-                return
-                
-            def update_plot():
-                global _last_battery_update
-                current_time = time.time()
-                
-                try:
-                    # Always update CPU, RAM, disk, network (basic stats)
-                    # CPU
-                    if usage[0] and len(usage[0]) > 0:
-                        cpu_total_usage = sum(usage[0].values())
-                        cpu_average_usage = round(cpu_total_usage / len(usage[0]), 1)
-                        cpu_data.append(cpu_average_usage)
-                    else:
-                        cpu_average_usage = 0
-                        cpu_data.append(0)
-                    cpu_bar[0].set_height(cpu_average_usage)
-                    axs[0,0].set_ylim(0, 100)
-
-                    # RAM
-                    if usage[1]:
-                        used_ram = usage[1].get('used', 0)
-                        free_ram = usage[1].get('free', 0)
-                        total_ram = usage[1].get('total', used_ram + free_ram)
-                        ram_data.append(used_ram)
-                        ram_bar[0].set_height(used_ram)
-                        ram_bar[1].set_height(free_ram)
-                        axs[0,1].set_ylim(0, total_ram)
-                    else:
-                        ram_data.append(0)
-                        ram_bar[0].set_height(0)
-                        ram_bar[1].set_height(0)
-                        axs[0,1].set_ylim(0, 100)
-
-                    # Disk
-                    disk_title = f"Disk {selected_disk_idx + 1} Usage (MBps)"
-                    axs[1,0].set_title(disk_title)  # Only update the text, not the color
-                    if usage[2] and len(usage[2]) > 0:
-                        disk = usage[2][selected_disk_idx % len(usage[2])]
-                        disk_read = disk.get("readSpeed", 0)
-                        disk_write = disk.get("writeSpeed", 0)
-                        disk_data.append(disk_read + disk_write)
-                    else:
-                        disk_read = 0
-                        disk_write = 0
-                        disk_data.append(0)
-                    disk_bar[0].set_height(disk_read)
-                    disk_bar[1].set_height(disk_write)
-                    axs[1,0].set_ylim(0, max(100, disk_read, disk_write))
-
-                    # Network
-                    net_up = usage[3].get("up", 0) if usage[3] else 0
-                    net_down = usage[3].get("down", 0) if usage[3] else 0
-                    network_data.append(net_up + net_down)
-                    net_bar[0].set_height(net_up)
-                    net_bar[1].set_height(net_down)
-                    axs[1,1].set_ylim(0, max(100, net_up, net_down))
-
-                    # Battery - update less frequently
-                    if current_time - _last_battery_update > BATTERY_UPDATE_INTERVAL:
-                        battery_percent = usage[4].get("percent", 0) if usage[4] else 0
-                        battery_icon.set_width(0.6 * (battery_percent / 100))
-                        if battery_percent > 20:
-                            battery_icon.set_facecolor("#27ae60")  # green
-                        else:
-                            battery_icon.set_facecolor("#e74c3c")  # red for low battery
-                        battery_canvas.draw()
-                        _last_battery_update = current_time
-
-                    # Single canvas draw for all main plots
-                    canvas.draw()
-                except Exception as e:
-                    print(f"Error updating plots: {e}")
-            root.after(0, update_plot)
-            root.after(1000, update_bars_threaded)
-        # Use thread pool instead of creating new threads
-        executor.submit(fetch_and_update)
+                print(f"Error getting device usage: {e}")
+        # the process table is only scanned while someone is looking at it
+        processes = None
+        if process_window is not None and process_window.is_open():
+            try:
+                processes = get_top_processes(process_window.rows, process_window.sort_key)
+            except Exception as e:
+                print(f"Error getting processes: {e}")
+        return collected, sample, devices, processes
+
+    def update_plot(result):
+        global _last_history_write, _last_history_append, _battery_shown
+        collected, sample, devices, processes = result
+        snap = latest_usage
+        current_time = time.time()
 
-    def show_disk(idx):
-        global selected_disk_idx
         try:
-            selected_disk_idx = idx
-            update_bars_threaded()
+            # the sample is current (the ticker drops stale ones), take it in
+            snap.update(sample, collected)
+            for metric in collected:
+                scheduler.observe(metric, snap.value(metric))
+            alert_engine.observe(snap, collected)
+            if metrics_exporter is not None and collected:
+                # encoded once per sample, so a scrape is only a buffer write
+                metrics_exporter.publish(snap, devices["nics"] if devices else None)
+
+            # Always update CPU, RAM, disk, network (basic stats)
+            drawn = usage_chart.show(snap, selected_disk_idx)
+
+            if collected and current_time - _last_history_append >= HISTORY_APPEND_INTERVAL:
+                history.append(current_time, drawn)
+                _last_history_append = current_time
+            if history_writer is not None and current_time - _last_history_write >= HISTORY_WRITE_INTERVAL:
+                history_writer.append_snapshot(snap)
+                _last_history_write = current_time
+
+            # Battery - only redrawn when it changed (a dropped tick may have read it)
+            if snap.has("battery") and snap.battery_percent != _battery_shown:
+                _battery_shown = snap.battery_percent
+                battery_percent = snap.battery_percent or 0
+                battery_icon.set_width(0.6 * (battery_percent / 100))
+                if battery_percent > 20:
+                    battery_icon.set_facecolor("#27ae60")  # green
+                else:
+                    battery_icon.set_facecolor("#e74c3c")  # red for low battery
+                battery_canvas.draw()
+
+            update_alert_highlights()
+            # Blit the bars, full redraw only if a limit, title or highlight changed
+            renderer.update()
+            if history_window is not None and history_window.is_open():
+                history_window.refresh()
+            if "cpu" in collected and core_window is not None and core_window.is_open():
+                core_window.push(snap.cpu, snap.time)
+            if devices is not None and devices_window is not None:
+                devices_window.show(devices)
+            if processes is not None and process_window is not None:
+                process_window.show(processes)
+            update_debug_overlay()
+            _record_startup("first_data", root)
         except Exception as e:
-            print(f"Error showing disk {idx}: {e}")
+            print(f"Error updating plots: {e}")
 
-    def next_disk():
+    ticker = TickScheduler(root, executor, collect, update_plot, scheduler.sleep_time)
+
+    # switching disks only asks the ticker for a refresh, it never starts another loop
+    # or reads counters on the Tk thread: the disk count comes from the last sample
+    def show_disk(idx):
         global selected_disk_idx
-        try:
-            usage = get_usage()
-            if usage and usage[2] and len(usage[2]) > 0:
-                selected_disk_idx = (selected_disk_idx + 1) % len(usage[2])
-            update_bars_threaded()
-        except Exception as e:
-            print(f"Error switching to next disk: {e}")
+        selected_disk_idx = idx
+        ticker.request()
+
+    def next_disk():
+        disk_count = len(latest_usage.disk_names or ())
+        if disk_count > 0:
+            show_disk((selected_disk_idx + 1) % disk_count)
 
     def prev_disk():
-        global selected_disk_idx
-        try:
-            usage = get_usage()
-            if usage and usage[2] and len(usage[2]) > 0:
-                selected_disk_idx = (selected_disk_idx - 1) % len(usage[2])
-            update_bars_threaded()
-        except Exception as e:
-            print(f"Error switching to previous disk: {e}")
+        disk_count = len(latest_usage.disk_names or ())
+        if disk_count > 0:
+            show_disk((selected_disk_idx - 1) % disk_count)
 
     # buttons for going to next disk and previous disk
     nextDiskBtn = CTkButton(root, text="Next Disk", command=next_disk)
@@ -297,5 +476,28 @@ def build_main_ui():
     prevDiskBtn = CTkButton(root, text="Prev Disk", command=prev_disk)
     prevDiskBtn.place(relx=0.12, rely=0.83)
 
-    update_bars_threaded()
+    # every disk and network adapter at once
+    devicesBtn = CTkButton(root, text="All Devices", command=lambda: open_devices(root))
+    devicesBtn.place(relx=0.12, rely=0.88)
+
+    # export the chart history to a csv/parquet file
+    exportBtn = CTkButton(root, text="Export History", command=lambda: export_history(root))
+    exportBtn.place(relx=0.3, rely=0.88)
+
+    # scrolling history charts
+    historyBtn = CTkButton(root, text="History", command=lambda: open_history(root))
+    historyBtn.place(relx=0.6, rely=0.83)
+
+    # per-core heatmap
+    coresBtn = CTkButton(root, text="Cores", command=lambda: open_cores(root))
+    coresBtn.place(relx=0.455, rely=0.83)
+
+    # top processes
+    processesBtn = CTkButton(root, text="Processes", command=lambda: open_processes(root))
+    processesBtn.place(relx=0.78, rely=0.83)
+
+    # collector call counts and latencies
+    root.bind("<F12>", lambda event: toggle_debug_overlay(root))
+
+    ticker.start()
     root.mainloop()
\ No newline at end of file
@@ -28,17 +28,49 @@ def open_settings(root):
     colorThemeOption.place(relx=0.5, rely=0.2, anchor="w")
 
 def set_color_theme(theme, root):
-    # ask the user to confirm the app restart
-    confirm = messagebox.askyesno("Change Theme", f"Do you want to change the theme to {theme.capitalize()}? The app will restart.")
-
-    if confirm:
-        root.destroy()
-        set_default_color_theme(theme)
-        # Import here to avoid circular import
-        from ui import build_main_ui
-        build_main_ui()
-    else:
-        messagebox.showinfo("Change Theme", "Theme change cancelled.")
+    """
+    Switch the color theme in place, without restarting the app.
+    :param theme: "blue" or "green"
+    Sampling, history and open windows carry on; only colors change.
+    """
+    apply_color_theme(root, theme)
+    # Import here to avoid circular import
+    from ui import update_graph_accent
+    update_graph_accent(theme)
+
+def _walk_widgets(widget):
+    yield widget
+    for child in widget.winfo_children():
+        yield from _walk_widgets(child)
+
+def apply_color_theme(root, theme):
+    '''
+    Load a CustomTkinter color theme and recolor every existing widget with it.\n
+    A widget only gets the new color for a setting that still has the old theme's
+    value, so colors that were passed explicitly (like the transparent ⋮ button)
+    are kept. Toplevel windows are children of root, so they are included.
+    '''
+    old = ThemeManager.theme
+    set_default_color_theme(theme)
+    new = ThemeManager.theme
+
+    for widget in _walk_widgets(root):
+        # CTkToplevel and subclasses of CTk widgets use their base class' theme entry
+        name = next((cls.__name__ for cls in type(widget).__mro__ if cls.__name__ in new), None)
+        if name is None:
+            continue
+        changes = {}
+        for key, value in new[name].items():
+            if not key.endswith("color") or old.get(name, {}).get(key) in (None, value):
+                continue
+            try:
+                if widget.cget(key) == old[name][key]:
+                    changes[key] = value
+            except Exception:
+                # not every theme key is a configure() option of every widget
+                continue
+        if changes:
+            widget.configure(**changes)
 
 def my_set_appearance_mode(mode):
     """
@@ -56,6 +88,40 @@ def my_set_appearance_mode(mode):
     else:
         messagebox.showerror("Error", "Invalid appearance mode selected.")
 
+def _spec_pager(window, heading, relx, title_rely, label_rely, format_item):
+    '''
+    Title, text and </> buttons for a spec category with several devices (GPU, RAM, disks).\n
+    Returns a function that fills the section in once the data is available.
+    '''
+    index = [0]
+    items = []
+
+    title = CTkLabel(window, text=f"{heading} Specifications", font=("Poppins", 20, "bold"))
+    title.place(relx=relx, rely=title_rely, anchor="center")
+    label = CTkLabel(window, text="Loading...", font=("Poppins", 12))
+    label.place(relx=relx, rely=label_rely, anchor="center")
+
+    def update_label():
+        label.configure(text=format_item(items[index[0]]))
+        title.configure(text=f"{heading} Specifications ({index[0]+1}/{len(items)})")
+        prev_btn.configure(state="normal" if index[0] > 0 else "disabled")
+        next_btn.configure(state="normal" if index[0] < len(items)-1 else "disabled")
+
+    prev_btn = CTkButton(window, text="<", width=30, state="disabled", command=lambda: (index.__setitem__(0, index[0]-1), update_label()))
+    prev_btn.place(relx=relx-0.12, rely=title_rely, anchor="center")
+    next_btn = CTkButton(window, text=">", width=30, state="disabled", command=lambda: (index.__setitem__(0, index[0]+1), update_label()))
+    next_btn.place(relx=relx+0.12, rely=title_rely, anchor="center")
+
+    def fill(data):
+        if not data:
+            label.configure(text="Could not be found" if data is None else "None found")
+            return
+        items[:] = data
+        index[0] = 0
+        update_label()
+
+    return fill
+
 def open_3_dots_details():
     # open the window
     three_dots_details = CTkToplevel()
@@ -71,126 +137,111 @@ def open_3_dots_details():
     title_label = CTkLabel(three_dots_details, text="Advanced Specifications", font=("Poppins", 30, "bold"))
     title_label.place(relx=0.5, rely=0.1, anchor="center")
 
-    # some specs and information
-    specs_list = get_specs()
+    # every section starts out as "Loading..." and is filled in as its query finishes
 
     # cpu
     cpu_title = CTkLabel(three_dots_details, text="CPU Specifications", font=("Poppins", 20, "bold"))
     cpu_title.place(relx=0.15, rely=0.22, anchor="center")
-    cpu_text = f"CPU Name: {specs_list[0]['name']}\n" \
-                f"Manufacturer: {specs_list[0]['manufacturer']}\n" \
-                f"Description: {specs_list[0]['description']}\n" \
-                f"Cores: {specs_list[0]['coreCount']}\n" \
-                f"Clock Speed: {specs_list[0]['clockSpeed']} MHz"
-    cpu_label = CTkLabel(three_dots_details, text=cpu_text, font=("Poppins", 12))
+    cpu_label = CTkLabel(three_dots_details, text="Loading...", font=("Poppins", 12))
     cpu_label.place(relx=0.15, rely=0.35, anchor="center")
 
+    def fill_cpu(cpu):
+        if not cpu:
+            cpu_label.configure(text="Could not be found")
+            return
+        cpu_label.configure(text=f"CPU Name: {cpu['name']}\n"
+                                 f"Manufacturer: {cpu['manufacturer']}\n"
+                                 f"Description: {cpu['description']}\n"
+                                 f"Cores: {cpu['coreCount']}\n"
+                                 f"Clock Speed: {cpu['clockSpeed']} MHz")
+
     # gpu
-    gpu_index = [0]
-    gpu_list = specs_list[1]
-
-    def update_gpu_label():
-        gpu = gpu_list[gpu_index[0]]
-        gpu_text = f"GPU Name: {gpu['name']}\n" \
-                   f"Driver Version: {gpu['driverVersion']}\n" \
-                   f"Video Processor: {gpu['videoProcessor']}\n" \
-                   f"VRAM: {gpu['VRAM']} MB"
-        gpu_label.configure(text=gpu_text)
-        gpu_title.configure(text=f"GPU Specifications ({gpu_index[0]+1}/{len(gpu_list)})")
-        prev_gpu_btn.configure(state="normal" if gpu_index[0] > 0 else "disabled")
-        next_gpu_btn.configure(state="normal" if gpu_index[0] < len(gpu_list)-1 else "disabled")
-
-    gpu_title = CTkLabel(three_dots_details, text=f"GPU Specifications (1/{len(gpu_list)})", font=("Poppins", 20, "bold"))
-    gpu_title.place(relx=0.15, rely=0.6, anchor="center")
-    gpu_label = CTkLabel(three_dots_details, text="", font=("Poppins", 12))
-    gpu_label.place(relx=0.15, rely=0.71, anchor="center")
-
-    prev_gpu_btn = CTkButton(three_dots_details, text="<", width=30, command=lambda: (gpu_index.__setitem__(0, gpu_index[0]-1), update_gpu_label()))
-    prev_gpu_btn.place(relx=0.03, rely=0.6, anchor="center")
-    next_gpu_btn = CTkButton(three_dots_details, text=">", width=30, command=lambda: (gpu_index.__setitem__(0, gpu_index[0]+1), update_gpu_label()))
-    next_gpu_btn.place(relx=0.27, rely=0.6, anchor="center")
-    update_gpu_label()
+    fill_gpu = _spec_pager(three_dots_details, "GPU", 0.15, 0.6, 0.71, lambda gpu:
+        f"GPU Name: {gpu['name']}\n"
+        f"Driver Version: {gpu['driverVersion']}\n"
+        f"Video Processor: {gpu['videoProcessor']}\n"
+        f"VRAM: {gpu['VRAM']} MB")
 
     # ram
-    ram_index = [0]
-    ram_list = specs_list[2]
-
-    def update_ram_label():
-        ram = ram_list[ram_index[0]]
-        ram_text = f"Capacity: {ram['capacity']} GB\n" \
-                   f"Speed: {ram['speed']} MHz\n" \
-                   f"Manufacturer ID: {ram['manufacturer']}\n" \
-                   f"Part Number: {ram['partNumber']}"
-        ram_label.configure(text=ram_text)
-        ram_title.configure(text=f"RAM Specifications ({ram_index[0]+1}/{len(ram_list)})")
-        prev_ram_btn.configure(state="normal" if ram_index[0] > 0 else "disabled")
-        next_ram_btn.configure(state="normal" if ram_index[0] < len(ram_list)-1 else "disabled")
-
-    ram_title = CTkLabel(three_dots_details, text=f"RAM Specifications (1/{len(ram_list)})", font=("Poppins", 20, "bold"))
-    ram_title.place(relx=0.5, rely=0.22, anchor="center")
-    ram_label = CTkLabel(three_dots_details, text="", font=("Poppins", 12))
-    ram_label.place(relx=0.5, rely=0.33, anchor="center")
-
-    prev_ram_btn = CTkButton(three_dots_details, text="<", width=30, command=lambda: (ram_index.__setitem__(0, ram_index[0]-1), update_ram_label()))
-    prev_ram_btn.place(relx=0.38, rely=0.22, anchor="center")
-    next_ram_btn = CTkButton(three_dots_details, text=">", width=30, command=lambda: (ram_index.__setitem__(0, ram_index[0]+1), update_ram_label()))
-    next_ram_btn.place(relx=0.62, rely=0.22, anchor="center")
-    update_ram_label()
+    fill_ram = _spec_pager(three_dots_details, "RAM", 0.5, 0.22, 0.33, lambda ram:
+        f"Capacity: {ram['capacity']} GB\n"
+        f"Speed: {ram['speed']} MHz\n"
+        f"Manufacturer ID: {ram['manufacturer']}\n"
+        f"Part Number: {ram['partNumber']}")
 
     # disk
-    disk_index = [0]
-    disk_list = specs_list[3]
-
-    def update_disk_label():
-        disk = disk_list[disk_index[0]]
-        disk_text = f"Model: {disk['model']}\n" \
-                    f"Interface Type: {disk['interfaceType']}\n" \
-                    f"Media Type: {disk['mediaType']}\n" \
-                    f"Size: {disk['size']} GB\n" \
-                    f"Serial Number: {disk['serialNumber']}"
-        disk_label.configure(text=disk_text)
-        disk_title.configure(text=f"Disk Specifications ({disk_index[0]+1}/{len(disk_list)})")
-        prev_disk_btn.configure(state="normal" if disk_index[0] > 0 else "disabled")
-        next_disk_btn.configure(state="normal" if disk_index[0] < len(disk_list)-1 else "disabled")
-
-    disk_title = CTkLabel(three_dots_details, text=f"Disk Specifications (1/{len(disk_list)})", font=("Poppins", 20, "bold"))
-    disk_title.place(relx=0.5, rely=0.6, anchor="center")
-    disk_label = CTkLabel(three_dots_details, text="", font=("Poppins", 12))
-    disk_label.place(relx=0.5, rely=0.73, anchor="center")
-
-    prev_disk_btn = CTkButton(three_dots_details, text="<", width=30, command=lambda: (disk_index.__setitem__(0, disk_index[0]-1), update_disk_label()))
-    prev_disk_btn.place(relx=0.38, rely=0.6, anchor="center")
-    next_disk_btn = CTkButton(three_dots_details, text=">", width=30, command=lambda: (disk_index.__setitem__(0, disk_index[0]+1), update_disk_label()))
-    next_disk_btn.place(relx=0.62, rely=0.6, anchor="center")
-    update_disk_label()
+    fill_disk = _spec_pager(three_dots_details, "Disk", 0.5, 0.6, 0.73, lambda disk:
+        f"Model: {disk['model']}\n"
+        f"Interface Type: {disk['interfaceType']}\n"
+        f"Media Type: {disk['mediaType']}\n"
+        f"Size: {disk['size']} GB\n"
+        f"Serial Number: {disk['serialNumber']}")
 
     # network card
     network_title = CTkLabel(three_dots_details, text=f"Network Card Specifications", font=("Poppins", 20, "bold"))
     network_title.place(relx=0.85, rely=0.22, anchor="center")
-
-    network_text = (
-    f"Name: {specs_list[4]['name']}\n"
-    f"MAC Address: {specs_list[4]['macAddress']}\n"
-    f"Manufacturer: {specs_list[4].get('manufacturer', 'N/A')}\n"
-    f"Adapter Type: {specs_list[4].get('adapterType', 'N/A')}\n"
-    f"Speed: {specs_list[4].get('speed', 'N/A')} Mbps"
-    )
-
-    network_label = CTkLabel(three_dots_details, text=network_text, font=("Poppins", 12))
+    network_label = CTkLabel(three_dots_details, text="Loading...", font=("Poppins", 12))
     network_label.place(relx=0.85, rely=0.35, anchor="center")
 
+    def fill_network(network):
+        if not network:
+            network_label.configure(text="Could not be found")
+            return
+        network_label.configure(text=
+            f"Name: {network['name']}\n"
+            f"MAC Address: {network['macAddress']}\n"
+            f"Manufacturer: {network.get('manufacturer', 'N/A')}\n"
+            f"Adapter Type: {network.get('adapterType', 'N/A')}\n"
+            f"Speed: {network.get('speed', 'N/A')} Mbps")
+
     # battery
     battery_title = CTkLabel(three_dots_details, text=f"Battery Specifications", font=("Poppins", 20, "bold"))
     battery_title.place(relx=0.85, rely=0.6, anchor="center")
-
-    battery_text = (
-        f"Name: {specs_list[5]['name']}\n"
-        f"Estimated Charge Remaining: {specs_list[5]['estimatedChargeRemaining']}%\n"
-        f"Status: {specs_list[5]['batteryStatus']}\n"
-        f"Design Capacity: {specs_list[5]['designCapacity']} mAh\n"
-        f"Full Charge Capacity: {specs_list[5]['fullChargeCapacity']} mAh"
-    )
-
-    battery_label = CTkLabel(three_dots_details, text=battery_text, font=("Poppins", 12))
+    battery_label = CTkLabel(three_dots_details, text="Loading...", font=("Poppins", 12))
     battery_label.place(relx=0.85, rely=0.73, anchor="center")
 
+    def fill_battery(battery):
+        if not battery:
+            battery_label.configure(text="Could not be found")
+            return
+        battery_label.configure(text=
+            f"Name: {battery['name']}\n"
+            f"Estimated Charge Remaining: {battery['estimatedChargeRemaining']}%\n"
+            f"Status: {battery['batteryStatus']}\n"
+            f"Design Capacity: {battery['designCapacity']} mAh\n"
+            f"Full Charge Capacity: {battery['fullChargeCapacity']} mAh")
+
+    fillers = {
+        "cpu": fill_cpu,
+        "gpu": fill_gpu,
+        "ram": fill_ram,
+        "storage": fill_disk,
+        "network": fill_network,
+        "battery": fill_battery,
+    }
+
+    # after() callbacks not run yet, cancelled when the window is closed
+    pending = []
+
+    def show_spec(category, data):
+        # the window may have been closed after this was scheduled
+        if three_dots_details.winfo_exists():
+            fillers[category](data)
+
+    def on_spec(category, data):
+        # runs on a worker thread, hand the result over to the Tk thread
+        try:
+            pending.append(three_dots_details.after(0, lambda: show_spec(category, data)))
+        except Exception:
+            pass  # the window was closed before this query finished
+
+    def close():
+        for after_id in pending:
+            three_dots_details.after_cancel(after_id)
+        pending.clear()
+        three_dots_details.destroy()
+
+    three_dots_details.protocol("WM_DELETE_WINDOW", close)
+
+    # query every category concurrently so the window doesn't freeze
+    get_specs_async(on_spec)
@@ -0,0 +1,81 @@
+import matplotlib.pyplot as plt
+from render import BlitRenderer, nice_limit
+
+class UsageChart:
+    '''
+    The main window's CPU, RAM, disk and network bars, 2x2.\n
+    Only the bars are animated and blitted; limits and titles go through the
+    renderer, so the whole figure is only redrawn when one of them changes.
+    make_canvas(figure) gives the canvas, as in core_view.CoreHeatmap.
+    '''
+
+    def __init__(self, make_canvas, bg_color="#242424", text_color="white", accent="#3498db"):
+        self.fig, self.axs = plt.subplots(2, 2, figsize=(10, 8))
+        self.fig.patch.set_facecolor(bg_color)
+        self.fig.tight_layout(pad=6.0)
+
+        axs = self.axs
+        axs[0,0].set_title("CPU Usage (%)", color=text_color)
+        axs[0,1].set_title("RAM Usage (MB)", color=text_color)
+        axs[1,0].set_title("Disk Usage (MBps)", color=text_color)
+        axs[1,1].set_title("Network Usage (Mbps)", color=text_color)
+        for ax in axs.flat:
+            ax.set_facecolor(bg_color)
+            ax.tick_params(colors=text_color)
+            ax.yaxis.label.set_color(text_color)
+            ax.xaxis.label.set_color(text_color)
+
+        self.cpu_bar = axs[0,0].bar(["Avg"], [0], color=accent)
+        self.ram_bar = axs[0,1].bar(["Used", "Free"], [0,0], color=["#27ae60", "#7f8c8d"])
+        self.disk_bar = axs[1,0].bar(["Read", "Write"], [0,0], color=["#9b59b6", "#e67e22"])
+        self.net_bar = axs[1,1].bar(["Up", "Down"], [0,0], color=["#e74c3c", "#1abc9c"])
+
+        self.canvas = make_canvas(self.fig)
+        # the bars are the only thing that changes every tick, blit just those
+        self.renderer = BlitRenderer(self.canvas, [*self.cpu_bar, *self.ram_bar, *self.disk_bar, *self.net_bar])
+
+    def show(self, snap, disk_idx=0):
+        '''
+        Set the bars from a Snapshot, disk_idx picks the disk that is shown.\n
+        Returns the values drawn ({"cpu", "ram", "disk", "net"}) for the history.
+        Call renderer.update() to put them on screen.
+        '''
+        axs, renderer = self.axs, self.renderer
+        # CPU
+        cpu_average_usage = round(snap.cpu_average, 1)
+        self.cpu_bar[0].set_height(cpu_average_usage)
+        renderer.set_ylim(axs[0,0], 0, 100)
+
+        # RAM
+        if snap.has("ram"):
+            used_ram = snap.ram_used
+            self.ram_bar[0].set_height(used_ram)
+            self.ram_bar[1].set_height(snap.ram_free)
+            renderer.set_ylim(axs[0,1], 0, snap.ram_total)
+        else:
+            used_ram = 0
+            self.ram_bar[0].set_height(0)
+            self.ram_bar[1].set_height(0)
+            renderer.set_ylim(axs[0,1], 0, 100)
+
+        # Disk
+        renderer.set_title(axs[1,0], f"Disk {disk_idx + 1} Usage (MBps)")  # Only update the text, not the color
+        if snap.disk_names:
+            disk_idx %= len(snap.disk_names)
+            disk_read = snap.disk_read[disk_idx]
+            disk_write = snap.disk_write[disk_idx]
+        else:
+            disk_read = 0
+            disk_write = 0
+        self.disk_bar[0].set_height(disk_read)
+        self.disk_bar[1].set_height(disk_write)
+        renderer.set_ylim(axs[1,0], 0, nice_limit(max(disk_read, disk_write)))
+
+        # Network
+        net_up = snap.net_up or 0
+        net_down = snap.net_down or 0
+        self.net_bar[0].set_height(net_up)
+        self.net_bar[1].set_height(net_down)
+        renderer.set_ylim(axs[1,1], 0, nice_limit(max(net_up, net_down)))
+
+        return {"cpu": cpu_average_usage, "ram": used_ram, "disk": disk_read + disk_write, "net": net_up + net_down}
@@ -0,0 +1,73 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+class WMIUnavailable(Exception):
+    '''The backend has no WMI (not Windows, or the wmi package is missing).'''
+
+class WMIPool:
+    '''
+    Runs WMI queries on a few worker threads that each keep one connection.\n
+    COM is initialized once per worker thread, the connection is opened on
+    first use and reused for every query after that, so a spec refresh
+    doesn't pay for connection setup again. Queries are projected (only the
+    properties we read are fetched) and every query has a timeout.
+
+    ### Usage
+    - pool = WMIPool(connect=backend.wmi)\n
+    - pool.query("Win32_Processor", ("Name", "NumberOfCores"))  # [{"Name": ..., "NumberOfCores": ...}]\n
+    - pool.query("Win32_NetworkAdapter", ("Name",), timeout=5, NetEnabled=True)\n
+    '''
+
+    def __init__(self, connect, workers=6, timeout=15.0):
+        self._connect = connect
+        self.timeout = timeout
+        self._local = threading.local()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="wmi",
+                                            initializer=self._init_thread)
+
+    def _init_thread(self):
+        # WMI is COM based, and COM has to be initialized on every thread that uses it
+        try:
+            import pythoncom
+            pythoncom.CoInitialize()
+        except ImportError:
+            pass
+
+    def _connection(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = self._connect()
+            if connection is None:
+                raise WMIUnavailable("no WMI connection available")
+            self._local.connection = connection
+        return connection
+
+    def _run(self, wmi_class, properties, where):
+        try:
+            rows = getattr(self._connection(), wmi_class)(list(properties), **where)
+            # COM objects must not leave the thread that initialized COM, so
+            # the properties are read here and only plain dicts are returned
+            return [{name: getattr(row, name, None) for name in properties} for row in rows]
+        except WMIUnavailable:
+            raise
+        except Exception:
+            # the connection may be broken, open a new one next time
+            self._local.connection = None
+            raise
+
+    def query(self, wmi_class, properties=(), timeout=None, **where):
+        '''
+        Return the instances of wmi_class as dicts of the given properties (None if missing).\n
+        Keyword arguments become a WHERE filter. Raises TimeoutError if the query
+        takes longer than timeout seconds (the pool default if not given).
+        '''
+        future = self._executor.submit(self._run, wmi_class, properties, where)
+        timeout = self.timeout if timeout is None else timeout
+        try:
+            return future.result(timeout)
+        except FutureTimeoutError:
+            # the worker stays busy until WMI answers, the other workers carry on
+            raise TimeoutError(f"{wmi_class} query took longer than {timeout} s")
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
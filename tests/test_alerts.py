@@ -0,0 +1,89 @@
+import os
+import sys
+import unittest
+from array import array
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from alerts import AlertEngine, Rule, SlidingWindow
+from snapshot import Snapshot
+
+def cpu_snapshot(percent):
+    snap = Snapshot()
+    snap.cpu = array("f", [percent, percent])
+    return snap
+
+class SlidingWindowTest(unittest.TestCase):
+
+    def test_matches_brute_force(self):
+        window = SlidingWindow(10)
+        values = [(t * 0.7, (t * 37) % 23 - 5.0) for t in range(200)]
+        for i, (t, value) in enumerate(values):
+            window.push(t, value)
+            inside = [v for u, v in values[:i + 1] if u >= t - 10]
+            self.assertAlmostEqual(window.sum(), sum(inside))
+            self.assertEqual(window.min(), min(inside))
+            self.assertEqual(window.max(), max(inside))
+
+class RuleTest(unittest.TestCase):
+
+    def feed(self, rule, samples):
+        '''Feed (t, cpu) pairs, returns the times the rule was firing at.'''
+        firing = []
+        for t, percent in samples:
+            rule.update(cpu_snapshot(percent), t)
+            if rule.firing:
+                firing.append(t)
+        return firing
+
+    def test_for_rule_fires_once_the_window_is_full(self):
+        rule = Rule("cpu > 90 for 30s")
+        firing = self.feed(rule, [(t, 95) for t in range(40)])
+        self.assertEqual(firing[0], 29)
+
+    def test_for_rule_needs_every_sample_above(self):
+        rule = Rule("cpu > 90 for 30s")
+        samples = [(t, 50 if t == 20 else 95) for t in range(60)]
+        # the dip at t=20 holds it off until it has left the window
+        self.assertEqual(self.feed(rule, samples)[0], 51)
+
+    def test_gap_longer_than_the_window_starts_over(self):
+        rule = Rule("cpu > 90 for 30s")
+        # one sample, then nothing for two minutes (suspended, paused UI...)
+        self.assertEqual(self.feed(rule, [(0, 95), (120, 95)]), [])
+        # it fires again only after a whole window of samples since the gap
+        firing = self.feed(rule, [(t, 95) for t in range(121, 160)])
+        self.assertEqual(firing[0], 149)
+
+    def test_gap_resolves_a_firing_rule(self):
+        rule = Rule("avg(cpu) > 90 over 10s")
+        self.assertTrue(self.feed(rule, [(t, 95) for t in range(12)]))
+        self.assertEqual(self.feed(rule, [(100, 95)]), [])
+
+    def test_instant_rule(self):
+        rule = Rule("ram.free < 500")
+        snap = Snapshot()
+        snap.ram_total, snap.ram_used, snap.ram_free, snap.ram_percent = 8000.0, 7600.0, 400.0, 95.0
+        self.assertTrue(rule.update(snap, 0))
+        self.assertTrue(rule.firing)
+
+    def test_bad_rules(self):
+        for text in ("cpu >", "gpu > 50", "median(cpu) > 5 over 10s"):
+            with self.assertRaises(ValueError):
+                Rule(text)
+
+class AlertEngineTest(unittest.TestCase):
+
+    def test_only_collected_metrics_are_updated(self):
+        alerts = []
+        engine = AlertEngine(["cpu > 90 for 5s"], on_alert=alerts.append)
+        for t in range(10):
+            engine.observe(cpu_snapshot(95), ["cpu"] if t < 3 else [], t)
+        self.assertEqual(alerts, [])
+        for t in range(10, 20):
+            engine.observe(cpu_snapshot(95), ["cpu"], t)
+        self.assertEqual([(alert.firing, alert.time) for alert in alerts], [(True, 15)])
+        self.assertEqual(engine.firing_metrics(), {"cpu"})
+
+if __name__ == "__main__":
+    unittest.main()
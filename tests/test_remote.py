@@ -0,0 +1,155 @@
+import asyncio
+import os
+import sys
+import unittest
+from array import array
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from remote import (AgentServer, Aggregator, FrameDecoder, FrameEncoder, FRAME, KEY, SCHEMA,
+                    PROTOCOL_VERSION, format_address)
+from snapshot import Snapshot, UNLIMITED_MINS
+from backends import FakeBackend
+import stats
+
+def make_snapshot(t, cpu=(10.0, 20.0), battery_mins=90):
+    snap = Snapshot()
+    snap.time = t
+    snap.cpu = array("f", cpu)
+    snap.ram_total, snap.ram_used, snap.ram_free, snap.ram_percent = 16384.0, 4096.0, 12288.0, 25.0
+    snap.disk_names = ("sda", "nvme0n1")
+    snap.disk_read, snap.disk_write = array("f", [1.5, 0.0]), array("f", [0.25, 3.0])
+    snap.net_up, snap.net_down = 0.5, 12.75
+    snap.battery_percent, snap.battery_plugged, snap.battery_mins = 80, False, battery_mins
+    return snap
+
+def decode(decoder, data):
+    '''Feed every frame in data, returns the last snapshot.'''
+    snap, offset = None, 0
+    while offset < len(data):
+        kind, length = FRAME.unpack_from(data, offset)
+        offset += FRAME.size
+        snap = decoder.feed(kind, data[offset:offset + length]) or snap
+        offset += length
+    return snap
+
+class FrameTest(unittest.TestCase):
+
+    def test_round_trip(self):
+        encoder, decoder = FrameEncoder("test"), FrameDecoder()
+        for i, cpu in enumerate([(10.0, 20.0), (10.0, 20.0), (55.5, 0.0), (100.0, 3.1)]):
+            sent = make_snapshot(1000.0 + i, cpu)
+            received = decode(decoder, encoder.encode(sent))
+            self.assertEqual(received.as_usage(), sent.as_usage())
+            self.assertAlmostEqual(received.time, sent.time)
+        self.assertEqual(decoder.host, "test")
+
+    def test_new_subscriber_gets_the_current_state(self):
+        encoder = FrameEncoder("test")
+        for i in range(3):
+            encoder.encode(make_snapshot(1000.0 + i, (i * 10.0, 5.0)))
+        received = decode(FrameDecoder(), encoder.keyframes())
+        self.assertEqual(received.as_usage(), make_snapshot(1002.0, (20.0, 5.0)).as_usage())
+
+    def test_battery_unknown_and_unlimited_stay_apart(self):
+        encoder, decoder = FrameEncoder("test"), FrameDecoder()
+        for mins in (-1, UNLIMITED_MINS, 0, -1, 42):
+            received = decode(decoder, encoder.encode(make_snapshot(1000.0, battery_mins=mins)))
+            self.assertEqual(received.battery_mins, mins)
+
+    def test_failed_metric_is_cleared(self):
+        encoder, decoder = FrameEncoder("test"), FrameDecoder()
+        decode(decoder, encoder.encode(make_snapshot(1000.0)))
+        failed = make_snapshot(1001.0)
+        failed.clear("net")
+        received = decode(decoder, encoder.encode(failed))
+        self.assertFalse(received.has("net"))
+        self.assertTrue(received.has("ram"))
+        # and it comes back once it is collected again
+        received = decode(decoder, encoder.encode(make_snapshot(1002.0)))
+        self.assertEqual(received.net_down, 12.75)
+
+    def test_malformed_frames_raise_value_error(self):
+        decoder = FrameDecoder()
+        decode(decoder, FrameEncoder("test").encode(make_snapshot(1000.0)))
+        for payload in (b"", b"\x01", b"\x1f\x00\x80"):
+            with self.assertRaises(ValueError):
+                decoder.feed(KEY, payload)
+        # a schema without its fields
+        decoder = FrameDecoder()
+        decoder.feed(SCHEMA, b'{"version": %d}' % PROTOCOL_VERSION)
+        with self.assertRaises(ValueError):
+            decoder.feed(KEY, b"\x01\x00\x00\x00")
+
+class LoopbackTest(unittest.TestCase):
+
+    def setUp(self):
+        # the agents sample through stats like the real one does; the fake
+        # backend's rates don't depend on how far apart two samples are, so
+        # both agents sharing the sampler still see the same numbers
+        stats.set_backend(FakeBackend(cores=4, disks=("sda", "nvme0n1")))
+        stats.get_snapshot()  # the first sample has no deltas yet
+
+    def tearDown(self):
+        stats.set_backend(FakeBackend())
+
+    def assert_fake_rates(self, snap):
+        '''The rates FakeBackend(cores=4, disks=("sda", "nvme0n1")) is defined to produce.'''
+        self.assertEqual(snap.part("cpu"), {"core1": 10.0, "core2": 30.0, "core3": 50.0, "core4": 70.0})
+        self.assertEqual(snap.part("ram"), {"total": 16384.0, "used": 6144.0, "free": 10240.0, "percent": 37.5})
+        self.assertEqual(snap.part("disk"), [{"device": "sda", "readSpeed": 1.0, "writeSpeed": 0.5},
+                                             {"device": "nvme0n1", "readSpeed": 2.0, "writeSpeed": 1.0}])
+        self.assertEqual(snap.part("net"), {"up": 0.5, "down": 2.0})
+        self.assertEqual(snap.part("battery"), {"percent": 80, "pluggedIn": True, "timeLeftMins": UNLIMITED_MINS})
+
+    def test_aggregator_survives_a_broken_agent(self):
+        asyncio.run(self._run())
+
+    async def _run(self):
+        agents = []
+        for name in ("agent-a", "agent-b"):
+            agent = AgentServer(("tcp", ("127.0.0.1", 0)), interval=0.02, host=name)
+            agents.append((agent, await agent.start()))
+
+        async def broken(reader, writer):
+            # a valid schema followed by a truncated key frame
+            schema = b'{"version": %d, "host": "broken", "cores": 2, "disks": []}' % PROTOCOL_VERSION
+            writer.write(FRAME.pack(SCHEMA, len(schema)) + schema + FRAME.pack(KEY, 1) + b"\x01")
+            await writer.drain()
+            await reader.read()
+            writer.close()
+        broken_server = await asyncio.start_server(broken, "127.0.0.1", 0)
+        broken_address = ("tcp", broken_server.sockets[0].getsockname()[:2])
+
+        addresses = [address for _, address in agents] + [broken_address]
+        aggregator = Aggregator(addresses)
+        tasks = [asyncio.ensure_future(agent.run()) for agent, _ in agents]
+        aggregated = asyncio.ensure_future(aggregator.run())
+        try:
+            a, b, bad = aggregator.connections
+            for _ in range(250):
+                if a.snapshot and b.snapshot and bad.error:
+                    break
+                await asyncio.sleep(0.02)
+            self.assertEqual((a.host, b.host), ("agent-a", "agent-b"))
+            self.assert_fake_rates(a.snapshot)
+            self.assert_fake_rates(b.snapshot)
+            self.assertTrue(bad.error.startswith("malformed frame"), bad.error)
+            self.assertEqual(bad.name, format_address(broken_address))
+            self.assertFalse(aggregated.done())
+            # the good agents keep streaming after the broken one failed
+            updated = a.updated
+            await asyncio.sleep(0.1)
+            self.assertGreater(a.updated, updated)
+            self.assertTrue(a.connected and b.connected)
+        finally:
+            for task in tasks + [aggregated]:
+                task.cancel()
+            await asyncio.gather(*tasks, aggregated, return_exceptions=True)
+            for agent, _ in agents:
+                await agent.close()
+            broken_server.close()
+            await broken_server.wait_closed()
+
+if __name__ == "__main__":
+    unittest.main()